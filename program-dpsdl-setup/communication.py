@@ -2,6 +2,7 @@ import socket
 import time
 from utils import calculate_checksum
 import protocol as ptcl
+from frame_capture import RX, TX, capture_frame
 
 def _should_wait_for_etx(command: str) -> bool:
     """
@@ -61,7 +62,9 @@ def send_command(command: str, ip: str, port: int ) -> str:
 
             sock.connect( (ip, port ) )
 
-            sock.sendall( (command + "\n").encode("utf-8"))
+            command_bytes = (command + "\n").encode("utf-8")
+            capture_frame(TX, command_bytes)
+            sock.sendall(command_bytes)
 
             response_bytes = b""
             start_time = time.time()
@@ -110,6 +113,8 @@ def send_command(command: str, ip: str, port: int ) -> str:
             except:
                 pass  # 이미 연결이 끊어진 경우 무시
 
+            capture_frame(RX, response_bytes)
+
             # 응답 처리 및 유효성 검사
             response_str = response_bytes.decode('utf-8', errors='ignore').strip()
 
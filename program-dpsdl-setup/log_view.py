@@ -0,0 +1,221 @@
+"""
+로그 뷰 모듈
+
+로그 줄을 고정 크기 링 버퍼 모델에 모으고, 가상화된 QListView로 화면에
+보이는 줄만 그립니다. 추가된 줄은 타이머로 모아 한 번에 모델과 회전 로그
+파일에 반영하므로 로그가 아무리 많아도 메모리와 UI 비용이 일정합니다.
+"""
+import logging
+import logging.handlers
+import os
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView
+
+# 메시지 타입별 글자색
+LOG_COLORS: Dict[str, str] = {
+    "SEND": "blue",
+    "RECV": "green",
+    "ERROR": "red",
+    "PREVIEW": "purple",
+    "PARSED": "darkgreen",
+    "INFO": "black",
+}
+
+TYPE_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class LogModel(QAbstractListModel):
+    """최근 max_lines 줄만 보관하는 링 버퍼 로그 모델"""
+
+    def __init__(self, max_lines: int = 10000, parent=None):
+        """
+        로그 모델을 초기화합니다.
+
+        Args:
+            max_lines: 보관할 최대 줄 수 (넘으면 오래된 줄부터 삭제)
+            parent: 부모 QObject
+        """
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self._lines: List[Optional[Tuple[str, str]]] = [None] * max_lines  # (타입, 텍스트)
+        self._start = 0
+        self._count = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def line(self, row: int) -> Tuple[str, str]:
+        """row번째 (타입, 텍스트)를 반환합니다."""
+        return self._lines[(self._start + row) % self.max_lines]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._count:
+            return None
+        msg_type, text = self.line(index.row())
+        if role == Qt.ItemDataRole.DisplayRole:
+            return text
+        if role == TYPE_ROLE:
+            return msg_type
+        return None
+
+    def append_lines(self, lines: List[Tuple[str, str]]) -> None:
+        """
+        여러 줄을 한 번에 추가합니다 (행 삭제/추가 알림도 한 번씩만 발생).
+
+        Args:
+            lines: (타입, 텍스트) 목록
+        """
+        if not lines:
+            return
+        if len(lines) > self.max_lines:
+            lines = lines[-self.max_lines:]
+
+        overflow = self._count + len(lines) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._start = (self._start + overflow) % self.max_lines
+            self._count -= overflow
+            self.endRemoveRows()
+
+        first = self._count
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        for offset, item in enumerate(lines):
+            self._lines[(self._start + first + offset) % self.max_lines] = item
+        self._count += len(lines)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        """모든 줄을 지웁니다."""
+        self.beginResetModel()
+        self._lines = [None] * self.max_lines
+        self._start = 0
+        self._count = 0
+        self.endResetModel()
+
+    def to_plain_text(self) -> str:
+        """보관 중인 모든 줄을 하나의 문자열로 반환합니다."""
+        return "\n".join(self.line(row)[1] for row in range(self._count))
+
+
+class LogDelegate(QStyledItemDelegate):
+    """메시지 타입에 따라 글자색을 정하는 델리게이트"""
+
+    def __init__(self, colors: Dict[str, str], parent=None):
+        super().__init__(parent)
+        # 색상 객체는 한 번만 생성
+        self._colors = {msg_type: QColor(name) for msg_type, name in colors.items()}
+        self._default = QColor("black")
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        color = self._colors.get(index.data(TYPE_ROLE), self._default)
+        option.palette.setColor(option.palette.ColorRole.Text, color)
+
+
+class LogView(QListView):
+    """링 버퍼 모델과 배치 추가, 회전 파일 기록을 갖춘 로그 뷰"""
+
+    def __init__(self, max_lines: int = 10000, flush_interval_ms: int = 100,
+                 colors: Optional[Dict[str, str]] = None, parent=None):
+        """
+        로그 뷰를 초기화합니다.
+
+        Args:
+            max_lines: 화면에 보관할 최대 줄 수
+            flush_interval_ms: 모아 둔 줄을 반영하는 주기 (밀리초)
+            colors: 메시지 타입별 글자색 (None이면 LOG_COLORS)
+            parent: 부모 위젯
+        """
+        super().__init__(parent)
+        self.log_model = LogModel(max_lines, self)
+        self.setModel(self.log_model)
+        self.setItemDelegate(LogDelegate(colors or LOG_COLORS, self))
+
+        # 모든 줄 높이가 같으므로 보이는 줄만 배치/그리기
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        self._pending: List[Tuple[str, str]] = []
+        self._file_logger: Optional[logging.Logger] = None
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def set_log_file(self, path: str, max_bytes: int = 5 * 1024 * 1024,
+                     backup_count: int = 5) -> None:
+        """
+        로그를 회전 파일에도 기록하도록 설정합니다.
+
+        Args:
+            path: 로그 파일 경로
+            max_bytes: 파일 하나의 최대 크기 (바이트)
+            backup_count: 보관할 이전 파일 수
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 뷰마다 별도 로거를 두어 다른 로그와 섞이지 않도록 함
+        logger = logging.getLogger(f"log_view.{id(self)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        self._file_logger = logger
+
+    def append_line(self, text: str, msg_type: str = "INFO") -> None:
+        """
+        한 줄을 추가합니다 (다음 flush 때 화면/파일에 반영).
+
+        Args:
+            text: 표시할 줄
+            msg_type: 메시지 타입 (색상 결정)
+        """
+        self._pending.append((msg_type, text))
+
+    def flush(self) -> None:
+        """모아 둔 줄을 모델과 파일에 한 번에 반영합니다."""
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+
+        if self._file_logger is not None:
+            self._file_logger.info("\n".join(text for _, text in lines))
+
+        # 사용자가 위쪽을 보고 있으면 스크롤 위치 유지
+        scroll_bar = self.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        self.log_model.append_lines(lines)
+        if at_bottom:
+            self.scrollToBottom()
+
+    def clear(self) -> None:
+        """화면의 로그를 지웁니다 (파일 기록은 유지)."""
+        self._pending = []
+        self.log_model.clear()
+
+    def to_plain_text(self) -> str:
+        """화면에 보관 중인 로그를 문자열로 반환합니다."""
+        self.flush()
+        return self.log_model.to_plain_text()
+
+    def close_log_file(self) -> None:
+        """남은 줄을 기록하고 로그 파일을 닫습니다."""
+        self.flush()
+        if self._file_logger is not None:
+            for handler in list(self._file_logger.handlers):
+                self._file_logger.removeHandler(handler)
+                handler.close()
+            self._file_logger = None
@@ -1,8 +1,9 @@
+import os
 import sys
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QFormLayout, QLineEdit, QPushButton, QTabWidget, QPlainTextEdit, 
-    QSplitter, QLabel, QGroupBox
+    QFormLayout, QLineEdit, QPushButton, QTabWidget, 
+    QSplitter, QLabel, QGroupBox, QFileDialog, QMessageBox
 )
 from PyQt6.QtCore import Qt, QDateTime, QTimer, pyqtSignal, QSettings
 
@@ -20,10 +21,17 @@ from utils import *
 import protocol as ptcl
 from server_pure import SMDAQServerPure
 from company import CompanyTab
+from log_view import LogView
+from frame_capture import ReplayDevice, is_capturing, start_capture, stop_capture
 
 import threading
 
 
+def log_type(message: str) -> str:
+    """로그 메시지의 색상 타입을 정합니다 (오류/실패 메시지는 ERROR)."""
+    return "ERROR" if ("오류" in message or "실패" in message) else "INFO"
+
+
 class MainWindow(QMainWindow):
     # 스레드 안전한 로깅을 위한 시그널 정의
     log_signal = pyqtSignal(str)
@@ -92,6 +100,7 @@ class MainWindow(QMainWindow):
         
         # 서버 관련 변수 초기화
         self.server = None
+        self.replay_device = None  # 캡처 재생 중이면 장비 대신 응답
         self.local_ip = local_ip
         self.pending_response = None
         
@@ -161,8 +170,9 @@ class MainWindow(QMainWindow):
         splitter.addWidget(self.tabs)
 
         # 4-2. 로그 출력창 생성
-        self.log_output = QPlainTextEdit()
-        self.log_output.setReadOnly(True)
+        # 최근 줄만 화면에 보관하고 전체 로그는 회전 파일에 기록
+        self.log_output = LogView(max_lines=20000)
+        self.log_output.set_log_file(os.path.join("logs", "dpsdl_setup.log"))
         splitter.addWidget(self.log_output)
         
         splitter.setSizes([400, 200])
@@ -182,6 +192,15 @@ class MainWindow(QMainWindow):
         clear_log_button.clicked.connect(self.clear_log)
         bottom_layout.addWidget(clear_log_button)
 
+        # 송수신 프레임 캡처/재생 버튼
+        self.capture_button = QPushButton("캡처 시작")
+        self.capture_button.clicked.connect(self.toggle_capture)
+        bottom_layout.addWidget(self.capture_button)
+
+        self.replay_button = QPushButton("재생...")
+        self.replay_button.clicked.connect(self.toggle_replay)
+        bottom_layout.addWidget(self.replay_button)
+
         # 가운데 공간
         bottom_layout.addStretch(1)
 
@@ -222,13 +241,58 @@ class MainWindow(QMainWindow):
     def add_log(self, message):
         now = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
         log_message = f"[{now}] {message}"
-        self.log_output.appendPlainText(log_message)
-        self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
+        # 화면 반영과 스크롤은 로그 뷰가 타이머로 모아서 처리
+        self.log_output.append_line(log_message, log_type(message))
 
     def clear_log(self):
         """로그 창을 클리어합니다."""
         self.log_output.clear()
         self.log_signal.emit("로그가 클리어되었습니다.")
+
+    def toggle_capture(self):
+        """송수신 프레임 캡처를 시작/종료합니다."""
+        if is_capturing():
+            capture = stop_capture()
+            self.capture_button.setText("캡처 시작")
+            self.log_signal.emit(f"캡처 저장: {capture.path} ({capture.count} 프레임)")
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "캡처 시작", QDateTime.currentDateTime().toString("'capture_'yyyyMMdd_hhmmss'.fcap'"),
+            "Capture Files (*.fcap);;All Files (*)")
+        if not filename:
+            return
+        try:
+            start_capture(filename)
+        except OSError as e:
+            self.log_signal.emit(f"캡처 시작 실패: {e}")
+            return
+        self.capture_button.setText("캡처 중지")
+        self.log_signal.emit(f"캡처 시작: {filename}")
+
+    def toggle_replay(self):
+        """캡처 파일 재생을 시작/종료합니다 (재생 중에는 장비 대신 기록된 응답 사용)."""
+        if self.replay_device is not None:
+            self.replay_device = None
+            self.replay_button.setText("재생...")
+            self.log_signal.emit("캡처 재생 종료")
+            return
+
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "캡처 재생", "", "Capture Files (*.fcap);;All Files (*)")
+        if not filename:
+            return
+        realtime = QMessageBox.question(
+            self, "캡처 재생", "기록된 응답 시간을 그대로 재현할까요?\n(아니오: 최대 속도로 재생)"
+        ) == QMessageBox.StandardButton.Yes
+        try:
+            self.replay_device = ReplayDevice(filename, realtime=realtime)
+        except (OSError, ValueError) as e:
+            self.log_signal.emit(f"캡처 재생 실패: {e}")
+            return
+        self.replay_button.setText("재생 중지")
+        self.log_signal.emit(f"캡처 재생: {filename} ({len(self.replay_device.exchanges)}개 질의, "
+                             f"{'원래 속도' if realtime else '최대 속도'})")
     
     def save_settings(self):
         """현재 설정을 저장합니다."""
@@ -351,7 +415,10 @@ class MainWindow(QMainWindow):
 
         #self.log_signal.emit(f"명령 전송: {command}")
 
-        if self.server and self.server.is_running:
+        if self.replay_device is not None:
+            # 재생 모드: 캡처 파일의 응답을 반환
+            return self.replay_device.send_command(command)
+        elif self.server and self.server.is_running:
             # 서버 모드: query 메서드를 사용하여 동기식으로 응답을 받음
             response = self.server.query(command)
             #if log : self.log_signal.emit(f"서버 응답: {response}")
@@ -372,6 +439,8 @@ class MainWindow(QMainWindow):
             self.log_signal.emit("프로그램 종료 - 서버를 중지합니다.")
         
         self.log_signal.emit("설정이 저장되었습니다.")
+        stop_capture()
+        self.log_output.close_log_file()
         event.accept()
 
 
@@ -2,6 +2,7 @@ import socket
 import threading
 import time
 from typing import Optional, Callable
+from frame_capture import RX, TX, capture_frame
 
 class SMDAQServerPure:
     """
@@ -196,8 +197,9 @@ class SMDAQServerPure:
                 self.client_socket.settimeout(timeout)
 
                 # 2. 명령 전송
-                full_command = command + '''\n'''
-                self.client_socket.sendall(full_command.encode('utf-8'))
+                full_command = (command + '''\n''').encode('utf-8')
+                capture_frame(TX, full_command)
+                self.client_socket.sendall(full_command)
                 self.log(f"명령 전송: '{command}' -> {self.client_address}")
 
                 # 3. 응답 수신
@@ -215,6 +217,7 @@ class SMDAQServerPure:
                     if buffer.endswith(b'Q'):
                         break
 
+                capture_frame(RX, bytes(buffer))
                 response = buffer.decode('utf-8', errors='ignore').strip()
                 self.log(f"응답 수신: '{response}' <- {self.client_address}")
                 return response
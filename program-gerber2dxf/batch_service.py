@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Gerber to DXF Converter - Headless Batch Service
+입력 폴더 (보드별 ZIP 또는 하위 폴더)를 감시하거나 ZIP 목록을 받아 보드마다 병합 DXF를 만들고
+작업별 소요 시간을 기록 (Qt/tkinter 없이 실행)
+"""
+
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from functools import partial
+import ezdxf
+from conversion_cache import parse_gerber_layer_cached, pop_cache_option, prune_cache
+from dxf_stream import DXFStreamWriter
+from gerber2dxf_merged import LAYER_COLORS
+from gerber_geometry import add_geometry_to_dxf, stream_geometry_to_dxf
+from gerber_sources import find_gerber_sources, layer_name_of, source_name
+from parallel_convert import default_workers, pop_jobs_option
+from trace_simplify import pop_simplify_option
+
+# 감시 모드의 폴더 확인 간격 (초)
+DEFAULT_INTERVAL = 5.0
+# 작업별 소요 시간 기록 파일 (출력 폴더 안)
+TIMINGS_FILE = "batch_timings.jsonl"
+
+
+def _ignore_signals():
+    """작업 프로세스 초기화: Ctrl+C/SIGTERM은 부모만 처리 (실행 중인 변환은 끝까지 진행)"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+def convert_board(board_path, dxf_path, stream=False, cache_dir=None, options=None):
+    """
+    Convert one board (ZIP archive or folder of Gerber files) into a merged DXF
+    (worker process entry)
+
+    The output file only appears once it is complete (written to a .tmp file
+    and renamed).
+
+    Args:
+        board_path: ZIP file or directory
+        dxf_path: Output DXF file path
+        stream: Use the streaming DXF writer
+        cache_dir: Conversion cache directory (None = always parse)
+        options: parse_gerber_layer options (e.g. {'instance_flashes': False})
+
+    Returns:
+        dict: Layer/object counts, failed layers and timings in seconds
+            (scan_s, parse_s, write_s, total_s)
+
+    Raises:
+        Exception: If the board has no usable Gerber files or the DXF cannot be written
+    """
+    start = time.perf_counter()
+    sources = find_gerber_sources(board_path)
+    if not sources:
+        raise ValueError(f"No Gerber files found in {board_path}")
+    scanned = time.perf_counter()
+
+    if stream:
+        writer = DXFStreamWriter(dxf_path)
+        add_layer = partial(stream_geometry_to_dxf, writer)
+    else:
+        doc = ezdxf.new('R2010')
+        msp = doc.modelspace()
+        add_layer = partial(add_geometry_to_dxf, doc, msp)
+
+    result = {'layers': 0, 'converted': 0, 'total': 0, 'cached': 0, 'failed': []}
+    parse_s = write_s = 0.0
+    try:
+        for source in sources:
+            layer_name = layer_name_of(source)
+            parse_start = time.perf_counter()
+            try:
+                geometry = parse_gerber_layer_cached(source, layer_name, cache_dir, options)
+                write_start = time.perf_counter()
+                parse_s += write_start - parse_start
+                add_layer(geometry, LAYER_COLORS.get(layer_name, 7))
+                write_s += time.perf_counter() - write_start
+            except Exception as e:
+                result['failed'].append(f"{source_name(source)}: {e}")
+                continue
+            result['layers'] += 1
+            result['converted'] += geometry.converted_count
+            result['total'] += geometry.total_count
+            result['cached'] += geometry.from_cache
+
+        if not result['layers']:
+            raise ValueError(f"No layer could be converted: {'; '.join(result['failed'])}")
+
+        write_start = time.perf_counter()
+        if stream:
+            writer.close()
+        else:
+            _save_atomic(doc, dxf_path)
+        write_s += time.perf_counter() - write_start
+    except BaseException:
+        if stream:
+            writer.abort()
+        raise
+
+    result['scan_s'] = round(scanned - start, 4)
+    result['parse_s'] = round(parse_s, 4)
+    result['write_s'] = round(write_s, 4)
+    result['total_s'] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def _save_atomic(doc, dxf_path):
+    """ezdxf 문서를 임시 파일에 저장한 뒤 출력 파일로 교체"""
+    tmp_path = dxf_path + ".tmp"
+    try:
+        doc.saveas(tmp_path)
+        os.replace(tmp_path, dxf_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def board_signature(board_path):
+    """
+    Size/modification signature of a board (changes while it is still being copied)
+
+    Args:
+        board_path: ZIP file or directory
+
+    Returns:
+        tuple: (file count, total bytes, latest mtime), or None if it cannot be read
+    """
+    try:
+        if os.path.isfile(board_path):
+            stat = os.stat(board_path)
+            return 1, stat.st_size, stat.st_mtime
+        count = size = 0
+        latest = os.stat(board_path).st_mtime
+        for root, _, files in os.walk(board_path):
+            for name in files:
+                stat = os.stat(os.path.join(root, name))
+                count += 1
+                size += stat.st_size
+                latest = max(latest, stat.st_mtime)
+        return count, size, latest
+    except OSError:
+        return None
+
+
+class BatchService:
+    """
+    Convert boards with a bounded pool of worker processes
+
+    Boards come from a queue of explicit paths and/or watched inbox
+    directories, where every ZIP file or subdirectory is one board. Each board
+    becomes <output_dir>/<board name>.dxf, and one JSON line per job is
+    appended to the timings file.
+    """
+
+    def __init__(self, output_dir, workers=None, stream=False, cache_dir=None, options=None,
+                 timings_path=None):
+        """
+        Args:
+            output_dir: Directory for output DXF files
+            workers: Number of boards converted at once (None = CPU cores)
+            stream: Use the streaming DXF writer
+            cache_dir: Conversion cache directory (None = always parse)
+            options: parse_gerber_layer options
+            timings_path: JSON lines file for per-job records (default: in output_dir)
+        """
+        self.output_dir = os.path.abspath(output_dir)
+        self.workers = max(1, workers or default_workers())
+        self.stream = stream
+        self.cache_dir = cache_dir
+        self.options = options or {}
+        self.timings_path = timings_path or os.path.join(self.output_dir, TIMINGS_FILE)
+        self.succeeded = 0
+        self.failed = 0
+        # 감시 중인 보드의 직전 서명 / 처리한 서명 (같은 내용은 다시 변환하지 않음)
+        self._seen = {}
+        self._handled = {}
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def output_path(self, board_path):
+        """보드의 출력 DXF 경로 (ZIP은 확장자를 뺀 이름)"""
+        name = os.path.basename(os.path.normpath(board_path))
+        if name.lower().endswith(".zip"):
+            name = name[:-4]
+        return os.path.join(self.output_dir, name + ".dxf")
+
+    def scan(self, inbox, require_stable=True):
+        """
+        Find boards in an inbox directory that are ready to convert
+
+        A board is ready when it has not been handled with its current
+        signature and its DXF is missing or older than the board. With
+        require_stable, the signature must also be unchanged since the previous
+        scan (the board is no longer being copied).
+
+        Args:
+            inbox: Watched directory
+            require_stable: Wait for an unchanged signature
+
+        Returns:
+            list: Board paths
+        """
+        ready = []
+        try:
+            entries = sorted(os.scandir(inbox), key=lambda entry: entry.name)
+        except OSError:
+            return ready
+        for entry in entries:
+            path = entry.path
+            if entry.name.startswith(".") or os.path.abspath(path) == self.output_dir:
+                continue
+            if not (entry.is_dir() or entry.name.lower().endswith(".zip")):
+                continue
+
+            signature = board_signature(path)
+            previous = self._seen.get(path)
+            self._seen[path] = signature
+            if signature is None or self._handled.get(path) == signature:
+                continue
+            if require_stable and signature != previous:
+                continue
+            self._handled[path] = signature
+            try:
+                if os.path.getmtime(self.output_path(path)) >= signature[2]:
+                    continue
+            except OSError:
+                pass
+            ready.append(path)
+        return ready
+
+    def run(self, boards=(), inboxes=(), watch=False, interval=DEFAULT_INTERVAL):
+        """
+        Convert queued boards and inbox contents
+
+        Args:
+            boards: Board paths to convert (ZIP files or directories)
+            inboxes: Directories whose ZIP files / subdirectories are boards
+            watch: Keep polling the inboxes until interrupted
+            interval: Polling interval in seconds
+        """
+        queue = deque((path, time.time()) for path in boards)
+        if not watch:
+            # 한 번만 실행하면 복사 완료를 기다리지 않음
+            for inbox in inboxes:
+                queue.extend((path, time.time()) for path in self.scan(inbox, require_stable=False))
+        next_scan = 0.0
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_signals) as executor:
+            running = {}
+            try:
+                while True:
+                    if watch and time.monotonic() >= next_scan:
+                        queued = {path for path, _ in queue} | {job[0] for job in running.values()}
+                        for inbox in inboxes:
+                            queue.extend((path, time.time()) for path in self.scan(inbox) if path not in queued)
+                        next_scan = time.monotonic() + interval
+
+                    # 작업 프로세스 수만큼만 제출 (나머지는 대기열에 남김)
+                    while queue and len(running) < self.workers:
+                        path, detected = queue.popleft()
+                        dxf_path = self.output_path(path)
+                        print(f"Converting: {path} → {dxf_path}")
+                        future = executor.submit(convert_board, path, dxf_path, self.stream,
+                                                 self.cache_dir, self.options)
+                        running[future] = (path, dxf_path, detected, time.time())
+
+                    if not running:
+                        if not watch:
+                            break
+                        time.sleep(max(0.0, next_scan - time.monotonic()))
+                        continue
+
+                    timeout = max(0.0, next_scan - time.monotonic()) if watch else None
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record(future, *running.pop(future))
+                    if done:
+                        prune_cache(self.cache_dir)
+            except KeyboardInterrupt:
+                print("\nStopping: waiting for running jobs...")
+                for future, job in running.items():
+                    self._record(future, *job)
+
+    def _record(self, future, board_path, dxf_path, detected, submitted):
+        """작업 결과를 출력하고 소요 시간 기록 파일에 한 줄 추가"""
+        record = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'input': board_path,
+            'output': dxf_path,
+        }
+        # 작업 쪽 예외는 종류와 관계없이 (BaseException 포함) 실패로 기록
+        error = future.exception()
+        if error is not None:
+            record['status'] = 'error'
+            record['error'] = str(error) or type(error).__name__
+            self.failed += 1
+            print(f"✗ Error converting {board_path}: {record['error']}")
+        else:
+            result = future.result()
+            record['status'] = 'ok'
+            record.update(result)
+            self.succeeded += 1
+            cached = f", {result['cached']} cached" if self.cache_dir is not None else ""
+            print(f"✓ Saved: {dxf_path} ({result['layers']} layers, "
+                  f"{result['converted']}/{result['total']} objects{cached}, {result['total_s']:.2f}s)")
+            for failure in result['failed']:
+                print(f"  ✗ Layer skipped: {failure}")
+        finished = time.time()
+        record['queued_s'] = round(submitted - detected, 4)
+        record['wall_s'] = round(finished - submitted, 4)
+
+        try:
+            with open(self.timings_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"✗ Cannot write timings to {self.timings_path}: {e}")
+
+
+def _pop_value(args, flag, convert=str):
+    """Remove 'flag VALUE' from args and return the converted value (None if absent)"""
+    if flag not in args:
+        return None
+    index = args.index(flag)
+    try:
+        value = convert(args[index + 1])
+    except (IndexError, ValueError):
+        raise ValueError(f"{flag} requires a value")
+    del args[index:index + 2]
+    return value
+
+
+def main():
+    """Main entry point"""
+    args = sys.argv[1:]
+    try:
+        workers = pop_jobs_option(args)
+        cache_dir = pop_cache_option(args)
+        simplify_tolerance = pop_simplify_option(args)
+        output_dir = _pop_value(args, "-o") or _pop_value(args, "--output")
+        interval = _pop_value(args, "--interval", float)
+        timings_path = _pop_value(args, "--timings")
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    flags = {}
+    for flag in ("--watch", "--stream", "--no-blocks"):
+        flags[flag] = flag in args
+        if flags[flag]:
+            args.remove(flag)
+    options = {}
+    if flags["--no-blocks"]:
+        options['instance_flashes'] = False
+    if simplify_tolerance is not None:
+        options['simplify_tolerance'] = simplify_tolerance
+
+    if not args or output_dir is None:
+        print("Usage:")
+        print("  python batch_service.py <inbox_dir | board.zip>... -o <output_dir> [--watch] [--interval SEC]")
+        print("                          [-j N] [--stream] [--cache DIR | --no-cache] [--no-blocks] [--simplify TOL] [--timings FILE]")
+        print("\nInputs:")
+        print("  ZIP file       One board (queued in the given order)")
+        print("  Directory      Inbox: every ZIP file and subdirectory in it is one board")
+        print("\nOptions:")
+        print("  -o, --output DIR  Output directory (<board name>.dxf per board)")
+        print(f"  --watch           Keep watching the inbox directories (poll every {DEFAULT_INTERVAL:g}s)")
+        print("  --interval SEC    Polling interval for --watch")
+        print(f"  -j, --jobs N      Boards converted at once (default: {default_workers()})")
+        print("  --stream          Stream entities to disk (flat memory for very large boards)")
+        print("  --cache DIR       Conversion cache directory (default: user cache folder)")
+        print("  --no-cache        Always reparse every layer")
+        print("  --no-blocks       Write every pad as plain entities instead of block references")
+        print("  --simplify TOL    Chain connected traces into polylines and drop vertices within TOL")
+        print(f"  --timings FILE    Per-job JSON lines log (default: <output_dir>/{TIMINGS_FILE})")
+        print("\nExample:")
+        print("  python batch_service.py /mnt/share/inbox -o /mnt/share/dxf --watch -j 4")
+        sys.exit(1)
+
+    boards = []
+    inboxes = []
+    for path in args:
+        if os.path.isdir(path):
+            inboxes.append(path)
+        elif os.path.isfile(path):
+            boards.append(path)
+        else:
+            print(f"Error: Input '{path}' does not exist")
+            sys.exit(1)
+
+    # 서비스 관리자의 종료 요청 (SIGTERM)도 Ctrl+C와 같이 실행 중인 작업을 마치고 종료
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    service = BatchService(output_dir, workers, flags["--stream"], cache_dir, options, timings_path)
+    print(f"Output: {service.output_dir} ({service.workers} worker processes)")
+    if flags["--watch"]:
+        print(f"Watching: {', '.join(inboxes) or '(no inbox)'} (Ctrl+C to stop)")
+    print("-" * 60)
+
+    service.run(boards, inboxes, flags["--watch"], interval or DEFAULT_INTERVAL)
+
+    print("-" * 60)
+    print(f"Batch complete: {service.succeeded} boards converted, {service.failed} failed")
+    print(f"  Timings: {service.timings_path}")
+    if service.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Gerber to DXF conversion benchmark
+객체 루프 처리 속도 (objects/s)를 이전 방식 (객체별 분기 후 바로 엔티티 생성)과
+공유 변환 코어 (배열 변환 후 일괄 기록)로 비교
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import ezdxf
+from gerbonara import GerberFile
+from gerbonara.graphic_objects import Line, Arc, Region, Flash
+from gerber_geometry import add_geometry_to_dxf, lower_objects
+
+
+def reference_add_objects(msp, objects, layer_name):
+    """
+    Previous per-object conversion loop (baseline for comparison)
+
+    Args:
+        msp: modelspace
+        objects: gerbonara graphic objects
+        layer_name: Layer name in DXF
+
+    Returns:
+        Number of converted objects
+    """
+    converted_count = 0
+    for obj in objects:
+        try:
+            if isinstance(obj, Line):
+                msp.add_line((obj.x1, obj.y1), (obj.x2, obj.y2), dxfattribs={'layer': layer_name})
+                converted_count += 1
+
+            elif isinstance(obj, Arc):
+                center_x, center_y = obj.x1 + obj.cx, obj.y1 + obj.cy
+                radius = math.sqrt(obj.cx**2 + obj.cy**2)
+                start_angle = math.degrees(math.atan2(obj.y1 - center_y, obj.x1 - center_x))
+                end_angle = math.degrees(math.atan2(obj.y2 - center_y, obj.x2 - center_x))
+                if obj.clockwise:
+                    start_angle, end_angle = end_angle, start_angle
+                msp.add_arc(center=(center_x, center_y), radius=radius, start_angle=start_angle,
+                            end_angle=end_angle, dxfattribs={'layer': layer_name})
+                converted_count += 1
+
+            elif isinstance(obj, Region):
+                vertices = []
+                for segment in obj.outline:
+                    if isinstance(segment, tuple) and len(segment) >= 2:
+                        vertices.append((segment[0], segment[1]))
+                    elif hasattr(segment, 'x1') and hasattr(segment, 'y1'):
+                        vertices.append((segment.x1, segment.y1))
+                        if hasattr(segment, 'x2') and hasattr(segment, 'y2'):
+                            vertices.append((segment.x2, segment.y2))
+                unique_vertices = []
+                for v in vertices:
+                    if not unique_vertices or abs(v[0] - unique_vertices[-1][0]) > 0.001 or abs(v[1] - unique_vertices[-1][1]) > 0.001:
+                        unique_vertices.append(v)
+                if len(unique_vertices) >= 3:
+                    if abs(unique_vertices[0][0] - unique_vertices[-1][0]) > 0.001 or abs(unique_vertices[0][1] - unique_vertices[-1][1]) > 0.001:
+                        unique_vertices.append(unique_vertices[0])
+                    msp.add_lwpolyline(unique_vertices, dxfattribs={'layer': layer_name})
+                    converted_count += 1
+
+            elif isinstance(obj, Flash):
+                aperture = obj.aperture
+                aperture_type = type(aperture).__name__
+                if aperture_type == 'CircleAperture':
+                    msp.add_circle(center=(obj.x, obj.y), radius=aperture.diameter / 2,
+                                   dxfattribs={'layer': layer_name})
+                    converted_count += 1
+                elif aperture_type in ('RectangleAperture', 'ObroundAperture'):
+                    w = aperture.w / 2
+                    h = getattr(aperture, 'h', aperture.w) / 2
+                    msp.add_lwpolyline([(obj.x - w, obj.y - h), (obj.x + w, obj.y - h), (obj.x + w, obj.y + h),
+                                        (obj.x - w, obj.y + h), (obj.x - w, obj.y - h)],
+                                       dxfattribs={'layer': layer_name})
+                    converted_count += 1
+                elif aperture_type == 'ApertureMacroInstance':
+                    for prim in aperture.flash(obj.x, obj.y, obj.unit, obj.polarity_dark):
+                        prim_type = type(prim).__name__
+                        if prim_type == 'Circle':
+                            msp.add_circle(center=(prim.x, prim.y), radius=prim.r, dxfattribs={'layer': layer_name})
+                        elif prim_type == 'Rectangle':
+                            w, h = prim.w / 2, prim.h / 2
+                            cos_r = math.cos(math.radians(prim.rotation))
+                            sin_r = math.sin(math.radians(prim.rotation))
+                            msp.add_lwpolyline([(prim.x + x * cos_r - y * sin_r, prim.y + x * sin_r + y * cos_r)
+                                                for x, y in [(-w, -h), (w, -h), (w, h), (-w, h), (-w, -h)]],
+                                               dxfattribs={'layer': layer_name})
+                    converted_count += 1
+        except Exception:
+            pass
+    return converted_count
+
+
+def generate_copper_layer(path, count, seed=0):
+    """
+    Write a synthetic dense copper layer (traces, arcs, pads, macro pads, regions)
+
+    Args:
+        path: Output Gerber file path
+        count: Approximate number of graphic objects
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+
+    def coord(value):
+        return int(round(value * 1e6))
+
+    out = ["%FSLAX46Y46*%", "%MOMM*%", "%LPD*%",
+           "%AMRRECT*21,1,$1,$2,0,0,$3*1,1,0.3,0,0*%",
+           "%ADD10C,0.200*%", "%ADD11C,1.000*%", "%ADD12R,1.500X0.800*%",
+           "%ADD13O,2.000X1.000*%", "%ADD14RRECT,1.2X0.6X30*%", "G75*"]
+    produced = 0
+    while produced < count:
+        kind = rng.randrange(10)
+        x, y = rng.uniform(0, 100), rng.uniform(0, 80)
+        if kind < 5:
+            # 3구간 배선
+            out += ["D10*", f"X{coord(x)}Y{coord(y)}D02*"]
+            for _ in range(3):
+                x += rng.uniform(-3, 3)
+                y += rng.uniform(-3, 3)
+                out.append(f"X{coord(x)}Y{coord(y)}D01*")
+            produced += 3
+        elif kind == 5:
+            out += ["D10*", f"X{coord(x)}Y{coord(y)}D02*",
+                    f"G0{rng.choice('23')}X{coord(x + 2)}Y{coord(y)}I{coord(1)}J0D01*", "G01*"]
+            produced += 1
+        elif kind < 9:
+            out += [f"D{rng.choice((11, 12, 13, 14))}*", f"X{coord(x)}Y{coord(y)}D03*"]
+            produced += 1
+        else:
+            out += ["G36*", f"X{coord(x)}Y{coord(y)}D02*", f"X{coord(x + 2)}Y{coord(y)}D01*",
+                    f"X{coord(x + 2)}Y{coord(y + 1.5)}D01*", f"X{coord(x)}Y{coord(y + 1.5)}D01*",
+                    f"X{coord(x)}Y{coord(y)}D01*", "G37*"]
+            produced += 1
+    out.append("M02*")
+    with open(path, 'w') as f:
+        f.write("\n".join(out) + "\n")
+
+
+def best_time(func, repeat):
+    """repeat번 실행 중 가장 짧은 시간 (초)과 마지막 결과"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_benchmark(gerber_path, repeat=3):
+    """
+    Benchmark the object loop of one Gerber layer
+
+    Args:
+        gerber_path: Gerber file to convert
+        repeat: Number of runs per measurement (best time is reported)
+    """
+    parse_time, gerber = best_time(lambda: GerberFile.open(gerber_path), 1)
+    objects = gerber.objects
+    count = len(objects)
+    layer_name = 'GTL'
+
+    def before():
+        doc = ezdxf.new('R2010')
+        msp = doc.modelspace()
+        doc.layers.add(layer_name, color=1)
+        return reference_add_objects(msp, objects, layer_name), len(msp)
+
+    def after():
+        doc = ezdxf.new('R2010')
+        msp = doc.modelspace()
+        geometry = lower_objects(objects, layer_name)
+        add_geometry_to_dxf(doc, msp, geometry, 1)
+        return geometry.converted_count, len(msp)
+
+    before_time, (before_converted, before_entities) = best_time(before, repeat)
+    lower_time, geometry = best_time(lambda: lower_objects(objects, layer_name), repeat)
+    after_time, (after_converted, after_entities) = best_time(after, repeat)
+
+    print(f"File: {gerber_path}")
+    print(f"Objects: {count} (parse {parse_time:.3f}s)")
+    print("-" * 60)
+    print(f"Before (per-object):   {before_time:.3f}s  {count / before_time:10.0f} objects/s  "
+          f"({before_converted} converted, {before_entities} entities)")
+    print(f"After  (lower + emit): {after_time:.3f}s  {count / after_time:10.0f} objects/s  "
+          f"({after_converted} converted, {after_entities} entities)")
+    print(f"  lower only:          {lower_time:.3f}s  {count / lower_time:10.0f} objects/s")
+    print(f"  emit only:           {after_time - lower_time:.3f}s")
+    print("-" * 60)
+    print(f"Speedup: {before_time / after_time:.2f}x")
+
+
+def main():
+    """Main entry point"""
+    args = sys.argv[1:]
+    if not args:
+        print("Usage:")
+        print("  python benchmark.py <gerber_file> [repeat]")
+        print("  python benchmark.py --generate <object_count> [repeat]")
+        print("\nExample:")
+        print("  python benchmark.py ./Gerber/board.GTL")
+        print("  python benchmark.py --generate 50000")
+        sys.exit(1)
+
+    if args[0] == "--generate":
+        count = int(args[1]) if len(args) > 1 else 50000
+        repeat = int(args[2]) if len(args) > 2 else 3
+        fd, path = tempfile.mkstemp(suffix=".GTL")
+        os.close(fd)
+        try:
+            generate_copper_layer(path, count)
+            run_benchmark(path, repeat)
+        finally:
+            os.remove(path)
+    else:
+        run_benchmark(args[0], int(args[1]) if len(args) > 1 else 3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Content-hash cache for parsed Gerber layers
+파일 내용 해시 + 변환기/gerbonara 버전 + 옵션을 키로 LayerGeometry 배열을 .npz 파일로 저장하여
+바뀌지 않은 레이어는 다시 파싱하지 않음
+"""
+
+import hashlib
+import json
+import os
+import gerbonara
+import numpy as np
+from gerber_geometry import GEOMETRY_VERSION, LayerGeometry, parse_gerber_layer
+from gerber_sources import open_source
+
+# 캐시 폴더 크기 상한 (초과하면 오래 사용하지 않은 항목부터 삭제)
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def default_cache_dir():
+    """기본 캐시 폴더 (GERBER2DXF_CACHE 환경 변수 > 사용자 캐시 폴더)"""
+    path = os.environ.get("GERBER2DXF_CACHE")
+    if path:
+        return path
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "gerber2dxf")
+
+
+def pop_cache_option(args):
+    """
+    Remove --cache DIR / --no-cache options from a command-line argument list
+
+    Args:
+        args: Argument list (modified in place)
+
+    Returns:
+        Cache directory, or None if caching is disabled
+
+    Raises:
+        ValueError: If --cache has no directory
+    """
+    cache_dir = default_cache_dir()
+    if "--cache" in args:
+        index = args.index("--cache")
+        if index + 1 >= len(args):
+            raise ValueError("--cache requires a directory")
+        cache_dir = args[index + 1]
+        del args[index:index + 2]
+    if "--no-cache" in args:
+        args.remove("--no-cache")
+        cache_dir = None
+    return cache_dir
+
+
+def cache_key(gerber_path, options=None):
+    """
+    Cache key of a Gerber file
+
+    Args:
+        gerber_path: Path to input Gerber file or gerber_sources.ZipMember
+        options: Conversion options that change the geometry (dict)
+
+    Returns:
+        Hex digest of (file content, converter and gerbonara versions, options)
+    """
+    digest = hashlib.sha256()
+    with open_source(gerber_path) as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    # gerbonara가 바뀌면 같은 파일도 파싱 결과가 달라질 수 있음
+    digest.update(f"\0v{GEOMETRY_VERSION}\0gerbonara {gerbonara.__version__}\0".encode())
+    digest.update(json.dumps(options or {}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_geometry(path, layer_name):
+    """
+    Load cached geometry
+
+    Args:
+        path: Cache entry (.npz)
+        layer_name: Layer name to assign (not part of the cached content)
+
+    Returns:
+        LayerGeometry, or None if the entry is missing or unreadable
+        (an unreadable entry is deleted so it is parsed and stored again)
+    """
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            geometry = LayerGeometry(layer_name)
+            for name in data.files:
+                if name != "counts":
+                    setattr(geometry, name, data[name])
+            geometry.converted_count, geometry.total_count = data["counts"].tolist()
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # 잘리거나 손상된 항목 (BadZipFile, EOFError 등)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    geometry.from_cache = True
+    return geometry
+
+
+def store_geometry(path, geometry):
+    """
+    Store geometry as a cache entry (atomic; concurrent writers of the same key are safe)
+
+    Args:
+        path: Cache entry (.npz)
+        geometry: LayerGeometry to store
+    """
+    arrays = {name: value for name, value in vars(geometry).items() if isinstance(value, np.ndarray)}
+    arrays["counts"] = np.array([geometry.converted_count, geometry.total_count], dtype=np.int64)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def parse_gerber_layer_cached(gerber_path, layer_name, cache_dir=None, options=None):
+    """
+    Parse a Gerber file, reusing cached geometry when the file is unchanged
+    (worker process entry)
+
+    Args:
+        gerber_path: Path to input Gerber file or gerber_sources.ZipMember
+        layer_name: Layer name in DXF
+        cache_dir: Cache directory (None = no caching)
+        options: Conversion options passed to parse_gerber_layer (part of the key)
+
+    Returns:
+        LayerGeometry: Parsed geometry (from_cache is True on a cache hit)
+
+    Raises:
+        Exception: If the Gerber file cannot be read
+    """
+    options = options or {}
+    if cache_dir is None:
+        return parse_gerber_layer(gerber_path, layer_name, **options)
+
+    path = os.path.join(cache_dir, cache_key(gerber_path, options) + ".npz")
+    geometry = load_geometry(path, layer_name)
+    if geometry is not None:
+        # 최근 사용 시각 갱신 (정리 순서용)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return geometry
+
+    geometry = parse_gerber_layer(gerber_path, layer_name, **options)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        store_geometry(path, geometry)
+    except OSError:
+        # 캐시에 쓸 수 없어도 변환은 계속
+        pass
+    return geometry
+
+
+def prune_cache(cache_dir, max_bytes=MAX_CACHE_BYTES):
+    """
+    Delete least recently used cache entries until the cache fits in max_bytes
+
+    Args:
+        cache_dir: Cache directory (None = nothing to do)
+        max_bytes: Size limit in bytes
+
+    Returns:
+        Number of deleted entries
+    """
+    if cache_dir is None or not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.name.endswith(".npz"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Streaming DXF R2010 writer
+엔티티를 만들자마자 디스크의 임시 파일로 흘려보내고, 닫을 때 헤더/테이블 + 엔티티 + 끝부분을
+순서대로 이어 붙여 출력 파일을 만듦 (엔티티 수와 관계없이 메모리 사용량 일정)
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import ezdxf
+import numpy as np
+
+# 엔티티 핸들 시작 값 (헤더/테이블/블록 정의가 쓰는 핸들과 겹치지 않도록 높은 범위 사용)
+ENTITY_HANDLE_BASE = 0x100000
+# 한 번에 임시 파일로 내보낼 엔티티 수
+FLUSH_ENTITIES = 10000
+
+_ENTITIES_SECTION = "  0\nSECTION\n  2\nENTITIES\n"
+_END_SECTION = "  0\nENDSEC\n"
+
+_LINE = ("  0\nLINE\n  5\n%X\n330\n%s\n100\nAcDbEntity\n  8\n%s\n100\nAcDbLine\n"
+         " 10\n%r\n 20\n%r\n 30\n0.0\n 11\n%r\n 21\n%r\n 31\n0.0\n")
+_CIRCLE = ("  0\nCIRCLE\n  5\n%X\n330\n%s\n100\nAcDbEntity\n  8\n%s\n100\nAcDbCircle\n"
+           " 10\n%r\n 20\n%r\n 30\n0.0\n 40\n%r\n")
+_ARC = ("  0\nARC\n  5\n%X\n330\n%s\n100\nAcDbEntity\n  8\n%s\n100\nAcDbCircle\n"
+        " 10\n%r\n 20\n%r\n 30\n0.0\n 40\n%r\n100\nAcDbArc\n 50\n%r\n 51\n%r\n")
+_LWPOLYLINE = ("  0\nLWPOLYLINE\n  5\n%X\n330\n%s\n100\nAcDbEntity\n  8\n%s\n100\nAcDbPolyline\n"
+               " 90\n%d\n 70\n%d\n")
+_VERTEX = " 10\n%r\n 20\n%r\n"
+_BULGE_VERTEX = " 10\n%r\n 20\n%r\n 42\n%r\n"
+_INSERT = ("  0\nINSERT\n  5\n%X\n330\n%s\n100\nAcDbEntity\n  8\n%s\n100\nAcDbBlockReference\n"
+           "  2\n%s\n 10\n%r\n 20\n%r\n 30\n0.0\n")
+
+
+class DXFStreamWriter:
+    """
+    DXF R2010 writer that streams modelspace entities to disk
+
+    Layers, block definitions (and other table entries) live in a small ezdxf
+    document; modelspace entities are formatted directly as DXF text and spooled
+    to a temporary file.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Output DXF file path (written atomically on close)
+        """
+        self.path = path
+        self.doc = ezdxf.new('R2010')
+        self.owner = self.doc.modelspace().layout_key
+        self.entity_count = 0
+        self._next_handle = ENTITY_HANDLE_BASE
+        self._pending = []
+        self._spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def add_layer(self, layer_name, color=7):
+        """
+        Add a layer to the layer table
+
+        Raises:
+            Exception: If the layer already exists
+        """
+        self.doc.layers.add(layer_name, color=color)
+
+    def _emit(self, text):
+        self._pending.append(text)
+        self.entity_count += 1
+        if len(self._pending) >= FLUSH_ENTITIES:
+            self.flush()
+
+    def _handle(self):
+        handle = self._next_handle
+        self._next_handle += 1
+        return handle
+
+    def add_lines(self, lines, layer_name):
+        """(n, 4) x1, y1, x2, y2 배열을 LINE으로 기록"""
+        owner = self.owner
+        for x1, y1, x2, y2 in lines.tolist():
+            self._emit(_LINE % (self._handle(), owner, layer_name, x1, y1, x2, y2))
+
+    def add_arcs(self, arcs, layer_name):
+        """(n, 5) cx, cy, r, start, end 배열을 ARC로 기록"""
+        owner = self.owner
+        for cx, cy, radius, start_angle, end_angle in arcs.tolist():
+            self._emit(_ARC % (self._handle(), owner, layer_name, cx, cy, radius, start_angle, end_angle))
+
+    def add_circles(self, circles, layer_name):
+        """(n, 3) cx, cy, r 배열을 CIRCLE로 기록"""
+        owner = self.owner
+        for cx, cy, radius in circles.tolist():
+            self._emit(_CIRCLE % (self._handle(), owner, layer_name, cx, cy, radius))
+
+    def add_lwpolylines(self, points, offsets, layer_name, bulges=None):
+        """
+        Write polylines stored as one point array plus start offsets
+
+        Args:
+            points: (m, 2) x, y of all vertices
+            offsets: (k + 1,) start vertex index of each polyline plus the end index
+            layer_name: Layer name
+            bulges: Optional (m,) bulge of the segment starting at each vertex
+        """
+        owner = self.owner
+        offsets = offsets.tolist()
+        if bulges is not None and bulges.any():
+            # bulge가 0인 꼭짓점은 42 코드를 생략 (ezdxf와 같은 출력)
+            points = np.column_stack((points, bulges)).tolist()
+            vertex = lambda x, y, bulge: _BULGE_VERTEX % (x, y, bulge) if bulge else _VERTEX % (x, y)
+        else:
+            points = points.tolist()
+            vertex = lambda x, y: _VERTEX % (x, y)
+        for start, end in zip(offsets, offsets[1:]):
+            vertices = "".join([vertex(*point) for point in points[start:end]])
+            self._emit(_LWPOLYLINE % (self._handle(), owner, layer_name, end - start, 0) + vertices)
+
+    def add_inserts(self, names, blocks, points, layer_name):
+        """
+        Write block references (blocks must already be defined in self.doc)
+
+        Args:
+            names: Block names by block index
+            blocks: (n,) block index of each reference
+            points: (n, 2) x, y of each reference
+            layer_name: Layer name
+        """
+        owner = self.owner
+        for index, (x, y) in zip(blocks.tolist(), points.tolist()):
+            self._emit(_INSERT % (self._handle(), owner, layer_name, names[index], x, y))
+
+    def flush(self):
+        """대기 중인 엔티티를 임시 파일에 기록"""
+        if self._pending:
+            self._spool.writelines(self._pending)
+            self._pending = []
+
+    def close(self):
+        """헤더/테이블, 엔티티, 끝부분 순서로 출력 파일을 완성"""
+        self.flush()
+
+        template = io.StringIO()
+        self.doc.write(template)
+        text = template.getvalue()
+        split = text.index(_ENTITIES_SECTION) + len(_ENTITIES_SECTION)
+        if not text.startswith(_END_SECTION, split):
+            raise ValueError("Unexpected DXF template: ENTITIES section is not empty")
+        header = text[:split]
+        footer = text[split:]
+
+        # 다음에 할당될 핸들 값을 엔티티 범위 뒤로 설정
+        if int(str(self.doc.entitydb.handles), 16) >= ENTITY_HANDLE_BASE:
+            raise ValueError("Too many table entries for the reserved entity handle range")
+        seed_marker = "  9\n$HANDSEED\n  5\n"
+        seed_start = header.index(seed_marker) + len(seed_marker)
+        seed_end = header.index("\n", seed_start)
+        header = header[:seed_start] + f"{self._next_handle:X}" + header[seed_end:]
+
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='\n') as out:
+                out.write(header)
+                self._spool.seek(0)
+                shutil.copyfileobj(self._spool, out, 1024 * 1024)
+                out.write(footer)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            self._spool.close()
+
+    def abort(self):
+        """출력 파일을 만들지 않고 임시 파일을 정리"""
+        self._pending = []
+        self._spool.close()
@@ -8,14 +8,13 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
 import os
-import math
 import zipfile
-import tempfile
-import shutil
 from pathlib import Path
 import ezdxf
-from gerbonara import GerberFile
-from gerbonara.graphic_objects import Line, Arc, Region, Flash
+from conversion_cache import default_cache_dir, parse_gerber_layer_cached, prune_cache
+from dxf_stream import DXFStreamWriter
+from gerber_geometry import add_geometry_to_dxf, stream_geometry_to_dxf
+from gerber_sources import find_dir_gerbers, find_zip_gerbers, layer_name_of, source_name
 
 
 
@@ -37,176 +36,22 @@ LAYER_COLORS = {
 }
 
 
-def add_gerber_to_dxf(doc, msp, gerber_path, layer_name):
+def add_gerber_to_dxf(doc, msp, gerber_path, layer_name, cache_dir=None):
     """Add Gerber file content to existing DXF document"""
     try:
-        gerber = GerberFile.open(gerber_path)
-
-        layer_color = LAYER_COLORS.get(layer_name.upper(), 7)
-        doc.layers.add(layer_name, color=layer_color)
+        geometry = parse_gerber_layer_cached(gerber_path, layer_name, cache_dir)
+        add_geometry_to_dxf(doc, msp, geometry, LAYER_COLORS.get(layer_name.upper(), 7))
+        return geometry.converted_count, geometry.total_count
+    except Exception as e:
+        return 0, 0
 
-        converted_count = 0
-        for obj in gerber.objects:
-            try:
-                if isinstance(obj, Line):
-                    msp.add_line(
-                        (obj.x1, obj.y1),
-                        (obj.x2, obj.y2),
-                        dxfattribs={'layer': layer_name}
-                    )
-                    converted_count += 1
-
-                elif isinstance(obj, Arc):
-                    center = obj.center
-                    center_x = center.x if hasattr(center, 'x') else (obj.x1 + obj.cx)
-                    center_y = center.y if hasattr(center, 'y') else (obj.y1 + obj.cy)
-                    radius = math.sqrt(obj.cx**2 + obj.cy**2)
-
-                    start_angle = math.degrees(math.atan2(obj.y1 - center_y, obj.x1 - center_x))
-                    end_angle = math.degrees(math.atan2(obj.y2 - center_y, obj.x2 - center_x))
-
-                    if obj.clockwise:
-                        start_angle, end_angle = end_angle, start_angle
-
-                    msp.add_arc(
-                        center=(center_x, center_y),
-                        radius=radius,
-                        start_angle=start_angle,
-                        end_angle=end_angle,
-                        dxfattribs={'layer': layer_name}
-                    )
-                    converted_count += 1
-
-                elif isinstance(obj, Region):
-                    vertices = []
-                    for segment in obj.outline:
-                        if isinstance(segment, tuple) and len(segment) >= 2:
-                            vertices.append((segment[0], segment[1]))
-                        elif hasattr(segment, 'x1') and hasattr(segment, 'y1'):
-                            vertices.append((segment.x1, segment.y1))
-                            if hasattr(segment, 'x2') and hasattr(segment, 'y2'):
-                                vertices.append((segment.x2, segment.y2))
-
-                    unique_vertices = []
-                    for v in vertices:
-                        if not unique_vertices or abs(v[0] - unique_vertices[-1][0]) > 0.001 or abs(v[1] - unique_vertices[-1][1]) > 0.001:
-                            unique_vertices.append(v)
-
-                    if len(unique_vertices) >= 3:
-                        if abs(unique_vertices[0][0] - unique_vertices[-1][0]) > 0.001 or abs(unique_vertices[0][1] - unique_vertices[-1][1]) > 0.001:
-                            unique_vertices.append(unique_vertices[0])
-
-                        msp.add_lwpolyline(
-                            unique_vertices,
-                            dxfattribs={'layer': layer_name}
-                        )
-                        converted_count += 1
-
-                elif isinstance(obj, Flash):
-                    aperture = obj.aperture
-                    aperture_type = type(aperture).__name__
-
-                    if aperture_type == 'CircleAperture':
-                        if hasattr(aperture, 'diameter'):
-                            radius = aperture.diameter / 2
-                            msp.add_circle(
-                                center=(obj.x, obj.y),
-                                radius=radius,
-                                dxfattribs={'layer': layer_name}
-                            )
-                            converted_count += 1
-
-                    elif aperture_type == 'RectangleAperture':
-                        if hasattr(aperture, 'w'):
-                            w = aperture.w / 2
-                            h = getattr(aperture, 'h', aperture.w) / 2
-                            points = [
-                                (obj.x - w, obj.y - h),
-                                (obj.x + w, obj.y - h),
-                                (obj.x + w, obj.y + h),
-                                (obj.x - w, obj.y + h),
-                                (obj.x - w, obj.y - h)
-                            ]
-                            msp.add_lwpolyline(
-                                points,
-                                dxfattribs={'layer': layer_name}
-                            )
-                            converted_count += 1
-
-                    elif aperture_type == 'ObroundAperture':
-                        if hasattr(aperture, 'w'):
-                            w = aperture.w / 2
-                            h = getattr(aperture, 'h', aperture.w) / 2
-                            points = [
-                                (obj.x - w, obj.y - h),
-                                (obj.x + w, obj.y - h),
-                                (obj.x + w, obj.y + h),
-                                (obj.x - w, obj.y + h),
-                                (obj.x - w, obj.y - h)
-                            ]
-                            msp.add_lwpolyline(
-                                points,
-                                dxfattribs={'layer': layer_name}
-                            )
-                            converted_count += 1
-
-                    elif aperture_type == 'ApertureMacroInstance':
-                        primitives = aperture.flash(obj.x, obj.y, obj.unit, obj.polarity_dark)
-                        for prim in primitives:
-                            prim_type = type(prim).__name__
-
-                            if prim_type == 'Circle':
-                                msp.add_circle(
-                                    center=(prim.x, prim.y),
-                                    radius=prim.r,
-                                    dxfattribs={'layer': layer_name}
-                                )
-                            elif prim_type == 'Rectangle':
-                                w = prim.w / 2
-                                h = prim.h / 2
-                                cx, cy = prim.x, prim.y
-
-                                cos_r = math.cos(math.radians(prim.rotation))
-                                sin_r = math.sin(math.radians(prim.rotation))
-
-                                corners = [
-                                    (-w, -h), (w, -h), (w, h), (-w, h), (-w, -h)
-                                ]
-
-                                points = []
-                                for x, y in corners:
-                                    rx = cx + x * cos_r - y * sin_r
-                                    ry = cy + x * sin_r + y * cos_r
-                                    points.append((rx, ry))
-
-                                msp.add_lwpolyline(
-                                    points,
-                                    dxfattribs={'layer': layer_name}
-                                )
-
-                        converted_count += 1
-
-                    else:
-                        if hasattr(aperture, 'equivalent_width'):
-                            try:
-                                width = aperture.equivalent_width()
-                                if callable(width):
-                                    width = width()
-                                radius = width / 2
-                                msp.add_circle(
-                                    center=(obj.x, obj.y),
-                                    radius=radius,
-                                    dxfattribs={'layer': layer_name}
-                                )
-                                converted_count += 1
-                            except:
-                                pass
-
-            except Exception:
-                pass
-
-        return converted_count, len(gerber.objects)
 
+def stream_gerber_to_dxf(writer, gerber_path, layer_name, cache_dir=None):
+    """Add Gerber file content through a streaming DXF writer"""
+    try:
+        geometry = parse_gerber_layer_cached(gerber_path, layer_name, cache_dir)
+        stream_geometry_to_dxf(writer, geometry, LAYER_COLORS.get(layer_name.upper(), 7))
+        return geometry.converted_count, geometry.total_count
     except Exception as e:
         return 0, 0
 
@@ -222,7 +67,8 @@ class GerberConverterGUI:
         self.input_type = tk.StringVar(value="folder")  # "folder" or "zip"
         self.output_file = tk.StringVar()
         self.mode = tk.StringVar(value="merged")  # "merged" or "separate"
-        self.temp_dir = None
+        self.stream_output = tk.BooleanVar(value=False)  # 엔티티를 바로 디스크에 기록 (대용량 보드)
+        self.use_cache = tk.BooleanVar(value=True)  # 바뀌지 않은 레이어는 캐시에서 불러옴
 
         # Window close protocol
         self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
@@ -262,6 +108,10 @@ class GerberConverterGUI:
                        variable=self.mode, value="merged").pack(anchor=tk.W)
         ttk.Radiobutton(mode_frame, text="개별 DXF 파일로 분리",
                        variable=self.mode, value="separate").pack(anchor=tk.W)
+        ttk.Checkbutton(mode_frame, text="스트리밍 DXF 출력 (대용량 보드, 메모리 절약)",
+                       variable=self.stream_output).pack(anchor=tk.W)
+        ttk.Checkbutton(mode_frame, text="변환 캐시 사용 (바뀌지 않은 레이어는 다시 파싱하지 않음)",
+                       variable=self.use_cache).pack(anchor=tk.W)
 
         # Output file
         output_frame = ttk.LabelFrame(self.root, text="출력 파일/폴더", padding="10")
@@ -338,7 +188,6 @@ class GerberConverterGUI:
     def quit_app(self):
         """종료 확인 후 프로그램 종료"""
         if messagebox.askyesno("종료", "프로그램을 종료하시겠습니까?"):
-            self.cleanup_temp()
             self.root.quit()
             self.root.destroy()
 
@@ -366,90 +215,82 @@ class GerberConverterGUI:
         self.log_text.delete(1.0, tk.END)
 
         try:
-            # Extract ZIP if needed
-            input_dir = self.prepare_input()
+            # Find Gerber files (ZIP members are read without extraction)
+            gerber_files = self.prepare_input()
 
             if self.mode.get() == "merged":
-                self.convert_merged(input_dir)
+                self.convert_merged(gerber_files)
             else:
-                self.convert_separate(input_dir)
+                self.convert_separate(gerber_files)
         except Exception as e:
             self.log(f"\n❌ 오류 발생: {str(e)}")
             self.status_bar.config(text="변환 실패")
             messagebox.showerror("변환 실패", str(e))
         finally:
-            self.cleanup_temp()
             self.progress.stop()
 
     def prepare_input(self):
-        """Prepare input directory (extract ZIP if needed)"""
+        """Find Gerber files in the input folder (recursive) or ZIP archive"""
+        input_path = self.input_path.get()
         if self.input_type.get() == "zip":
-            # Create temporary directory
-            self.temp_dir = tempfile.mkdtemp()
-            zip_path = self.input_path.get()
-
-            self.log(f"ZIP 파일 압축 해제 중: {zip_path}")
-
+            self.log(f"ZIP 파일 읽는 중: {input_path}")
             try:
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(self.temp_dir)
-
-                self.log(f"✓ 압축 해제 완료: {self.temp_dir}")
-                return self.temp_dir
-            except Exception as e:
-                raise Exception(f"ZIP 파일 압축 해제 실패: {str(e)}")
+                gerber_files = find_zip_gerbers(input_path)
+            except (OSError, zipfile.BadZipFile) as e:
+                raise Exception(f"ZIP 파일 읽기 실패: {str(e)}")
         else:
-            return self.input_path.get()
-
-    def cleanup_temp(self):
-        """Clean up temporary directory"""
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                shutil.rmtree(self.temp_dir)
-                self.temp_dir = None
-            except:
-                pass
-
-    def convert_merged(self, input_dir):
-        input_path = Path(input_dir)
-        output_file = self.output_file.get()
-
-        # Find Gerber files (recursive search for ZIP files)
-        gerber_extensions = [
-            '.gbr', '.gtl', '.gbl', '.gto', '.gbo', '.gts', '.gbs',
-            '.gko', '.g1', '.g2', '.g3', '.g4', '.gd1', '.gg1'
-        ]
-
-        gerber_files = []
-        for ext in gerber_extensions:
-            gerber_files.extend(input_path.rglob(f'*{ext}'))
-            gerber_files.extend(input_path.rglob(f'*{ext.upper()}'))
+            gerber_files = find_dir_gerbers(input_path)
 
         if not gerber_files:
             raise Exception(f"Gerber 파일을 찾을 수 없습니다: {input_path}")
+        return gerber_files
+
+    def cache_dir(self):
+        """변환 캐시 폴더 (사용 안 하면 None)"""
+        return default_cache_dir() if self.use_cache.get() else None
+
+    def convert_merged(self, gerber_files):
+        output_file = self.output_file.get()
 
         self.log(f"발견된 Gerber 파일: {len(gerber_files)}개")
         self.log("-" * 60)
 
-        # Create DXF document
-        doc = ezdxf.new('R2010')
-        msp = doc.modelspace()
+        # Create DXF document (스트리밍이면 레이어마다 바로 디스크에 기록)
+        stream = self.stream_output.get()
+        cache_dir = self.cache_dir()
+        if stream:
+            writer = DXFStreamWriter(output_file)
+        else:
+            doc = ezdxf.new('R2010')
+            msp = doc.modelspace()
 
         total_converted = 0
         total_objects = 0
 
-        for gerber_file in gerber_files:
-            layer_name = gerber_file.suffix[1:].upper()
-            self.log(f"처리 중: {gerber_file.name} → 레이어: {layer_name}")
-
-            converted, total = add_gerber_to_dxf(doc, msp, str(gerber_file), layer_name)
-            total_converted += converted
-            total_objects += total
+        try:
+            for gerber_file in gerber_files:
+                layer_name = layer_name_of(gerber_file)
+                self.log(f"처리 중: {source_name(gerber_file)} → 레이어: {layer_name}")
+
+                if stream:
+                    converted, total = stream_gerber_to_dxf(writer, gerber_file, layer_name, cache_dir)
+                else:
+                    converted, total = add_gerber_to_dxf(doc, msp, gerber_file, layer_name, cache_dir)
+                total_converted += converted
+                total_objects += total
 
-            self.log(f"  ✓ {converted}/{total} 객체 변환")
+                self.log(f"  ✓ {converted}/{total} 객체 변환")
+        except BaseException:
+            if stream:
+                writer.abort()
+            raise
 
         # Save DXF
-        doc.saveas(output_file)
+        if stream:
+            writer.close()
+        else:
+            doc.saveas(output_file)
+        prune_cache(cache_dir)
 
         self.log("-" * 60)
         self.log(f"✅ 변환 완료!")
@@ -463,44 +304,34 @@ class GerberConverterGUI:
                            f"레이어: {len(gerber_files)}개\n"
                            f"객체: {total_converted}/{total_objects}개")
 
-    def convert_separate(self, input_dir):
-        input_path = Path(input_dir)
+    def convert_separate(self, gerber_files):
         output_path = Path(self.output_file.get())
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # Find Gerber files (recursive search for ZIP files)
-        gerber_extensions = [
-            '.gbr', '.gtl', '.gbl', '.gto', '.gbo', '.gts', '.gbs',
-            '.gko', '.g1', '.g2', '.g3', '.g4', '.gd1', '.gg1'
-        ]
-
-        gerber_files = []
-        for ext in gerber_extensions:
-            gerber_files.extend(input_path.rglob(f'*{ext}'))
-            gerber_files.extend(input_path.rglob(f'*{ext.upper()}'))
-
-        if not gerber_files:
-            raise Exception(f"Gerber 파일을 찾을 수 없습니다: {input_path}")
-
         self.log(f"발견된 Gerber 파일: {len(gerber_files)}개")
         self.log("-" * 60)
 
         success_count = 0
         total_converted = 0
         total_objects = 0
+        cache_dir = self.cache_dir()
 
         for gerber_file in gerber_files:
-            dxf_file = output_path / f"{gerber_file.name}.dxf"
-            layer_name = gerber_file.name
+            layer_name = source_name(gerber_file)
+            dxf_file = output_path / f"{layer_name}.dxf"
 
-            self.log(f"변환 중: {gerber_file.name} → {dxf_file.name}")
+            self.log(f"변환 중: {layer_name} → {dxf_file.name}")
 
             try:
-                doc = ezdxf.new('R2010')
-                msp = doc.modelspace()
+                if self.stream_output.get():
+                    with DXFStreamWriter(str(dxf_file)) as writer:
+                        converted, total = stream_gerber_to_dxf(writer, gerber_file, layer_name, cache_dir)
+                else:
+                    doc = ezdxf.new('R2010')
+                    msp = doc.modelspace()
 
-                converted, total = add_gerber_to_dxf(doc, msp, str(gerber_file), layer_name)
-                doc.saveas(str(dxf_file))
+                    converted, total = add_gerber_to_dxf(doc, msp, gerber_file, layer_name, cache_dir)
+                    doc.saveas(str(dxf_file))
 
                 total_converted += converted
                 total_objects += total
@@ -510,6 +341,8 @@ class GerberConverterGUI:
             except Exception as e:
                 self.log(f"  ✗ 실패: {str(e)}")
 
+        prune_cache(cache_dir)
+
         self.log("-" * 60)
         self.log(f"✅ 변환 완료!")
         self.log(f"  출력 폴더: {output_path}")
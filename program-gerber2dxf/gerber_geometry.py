@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Shared Gerber to DXF conversion core
+Gerber 객체를 형식별 NumPy 배열로 변환한 뒤 (호 각도, 회전 사각형 꼭짓점은 배열 연산으로 계산)
+DXF 엔티티를 한꺼번에 기록
+"""
+
+import math
+import re
+import numpy as np
+from gerbonara import graphic_primitives as gp
+from gerbonara.apertures import CircleAperture
+from gerbonara.graphic_objects import Line, Arc, Region, Flash
+from gerber_sources import read_gerber
+from trace_simplify import coalesce_segments, simplify_polyline
+
+# 변환 결과 (LayerGeometry 내용)가 바뀌면 올림 - 변환 캐시 키에 포함되어 이전 캐시를 무효화
+GEOMETRY_VERSION = 6
+
+
+class LayerGeometry:
+    """
+    Geometry of one Gerber layer as typed NumPy arrays
+
+    Attributes:
+        layer_name: Layer name in DXF
+        lines: (n, 4) x1, y1, x2, y2
+        arcs: (n, 5) cx, cy, radius, start_angle, end_angle (degrees)
+        circles: (n, 3) cx, cy, radius
+        polyline_points: (m, 2) x, y of all polyline vertices
+        polyline_bulges: (m,) bulge of the segment starting at each polyline vertex
+        polyline_offsets: (k + 1,) start vertex index of each polyline plus the end index
+        block_circles: (c, 4) block index, cx, cy, radius of circles inside flash blocks
+        block_polyline_blocks: (q,) block index of each polyline inside flash blocks
+        block_points: (p, 2) x, y of all block polyline vertices (relative to the flash position)
+        block_bulges: (p,) bulge of the segment starting at each block polyline vertex
+        block_offsets: (q + 1,) start vertex index of each block polyline plus the end index
+        insert_blocks: (n,) block index of each flash inserted as a block reference
+        insert_points: (n, 2) x, y of each block reference
+        converted_count: Number of Gerber objects converted
+        total_count: Number of Gerber objects in the file
+        from_cache: True if loaded from the conversion cache instead of parsed
+    """
+
+    def __init__(self, layer_name):
+        self.layer_name = layer_name
+        self.lines = np.empty((0, 4))
+        self.arcs = np.empty((0, 5))
+        self.circles = np.empty((0, 3))
+        self.polyline_points = np.empty((0, 2))
+        self.polyline_bulges = np.empty(0)
+        self.polyline_offsets = np.zeros(1, dtype=np.int64)
+        self.block_circles = np.empty((0, 4))
+        self.block_polyline_blocks = np.empty(0, dtype=np.int64)
+        self.block_points = np.empty((0, 2))
+        self.block_bulges = np.empty(0)
+        self.block_offsets = np.zeros(1, dtype=np.int64)
+        self.insert_blocks = np.empty(0, dtype=np.int64)
+        self.insert_points = np.empty((0, 2))
+        self.converted_count = 0
+        self.total_count = 0
+        self.from_cache = False
+
+    def entity_count(self):
+        """DXF 모델 공간 엔티티 수"""
+        return (len(self.lines) + len(self.arcs) + len(self.circles) + len(self.polyline_offsets) - 1
+                + len(self.insert_blocks))
+
+    def block_count(self):
+        """Flash 블록 정의 수"""
+        owners = np.concatenate((self.block_circles[:, 0], self.block_polyline_blocks))
+        return int(owners.max()) + 1 if len(owners) else 0
+
+
+def parse_gerber_layer(gerber_path, layer_name, instance_flashes=True, simplify_tolerance=None):
+    """
+    Parse a Gerber file into layer geometry (worker process entry)
+
+    Args:
+        gerber_path: Path to input Gerber file or gerber_sources.ZipMember
+        layer_name: Layer name in DXF
+        instance_flashes: Write pads as block references (False = plain entities)
+        simplify_tolerance: Chain/simplify traces and region outlines with this
+            tolerance (None = keep every segment)
+
+    Returns:
+        LayerGeometry: Parsed geometry
+
+    Raises:
+        Exception: If the Gerber file cannot be read
+    """
+    gerber = read_gerber(gerber_path)
+    return lower_objects(gerber.objects, layer_name, instance_flashes, simplify_tolerance)
+
+
+def lower_objects(objects, layer_name, instance_flashes=True, simplify_tolerance=None):
+    """
+    Lower gerbonara graphic objects into typed arrays
+
+    Pads that are not plain circles become one block per unique aperture
+    (aperture parameters + rotation, unit and polarity) with one reference per flash.
+    With simplify_tolerance, contiguous trace segments of the same trace width are
+    chained into polylines and polylines are simplified (trace_simplify).
+
+    Args:
+        objects: gerbonara graphic objects (GerberFile.objects)
+        layer_name: Layer name in DXF
+        instance_flashes: Write pads as block references (False = plain entities)
+        simplify_tolerance: Chain/simplify tolerance in drawing units (None = off)
+
+    Returns:
+        LayerGeometry: Lowered geometry
+    """
+    lines = []      # x1, y1, x2, y2
+    line_groups = []  # 선분의 폭 번호 (같은 폭끼리만 연결)
+    width_groups = {}  # 폭 -> 폭 번호
+    aperture_groups = {}  # id(조리개) -> 폭 번호
+    arcs = []       # x1, y1, x2, y2, cx(상대), cy(상대), clockwise
+    circles = []    # x, y, r
+    regions = []    # 꼭짓점 목록
+    blocks = []     # (원 목록, 폴리라인 목록) - 원점 기준 flash 도형
+    inserts = []    # 블록 번호, x, y
+    shape_cache = {}
+    converted_count = 0
+    region_tolerance = 0.001 if simplify_tolerance is None else max(simplify_tolerance, 1e-9)
+
+    for obj in objects:
+        kind = type(obj)
+        try:
+            if kind is Line:
+                lines.append((obj.x1, obj.y1, obj.x2, obj.y2))
+                group = aperture_groups.get(id(obj.aperture))
+                if group is None:
+                    # D 코드가 달라도 폭이 같으면 같은 배선으로 연결
+                    width = _trace_width(obj.aperture, obj.unit)
+                    group = aperture_groups[id(obj.aperture)] = width_groups.setdefault(width, len(width_groups))
+                line_groups.append(group)
+                converted_count += 1
+
+            elif kind is Arc:
+                # NOTE: gerbonara Arc.cx, Arc.cy are RELATIVE to start point
+                arcs.append((obj.x1, obj.y1, obj.x2, obj.y2, obj.cx, obj.cy, obj.clockwise))
+                converted_count += 1
+
+            elif kind is Flash:
+                if _lower_flash(obj, circles, blocks, inserts, shape_cache):
+                    converted_count += 1
+
+            elif kind is Region:
+                vertices = _region_vertices(obj, region_tolerance)
+                if vertices is not None:
+                    regions.append(vertices)
+                    converted_count += 1
+
+        except Exception:
+            pass
+
+    geometry = LayerGeometry(layer_name)
+    geometry.total_count = len(objects)
+    geometry.converted_count = converted_count
+    chains = []
+    if lines:
+        geometry.lines = np.array(lines, dtype=float)
+        if simplify_tolerance is not None:
+            geometry.lines, chains = coalesce_segments(geometry.lines, np.array(line_groups), simplify_tolerance)
+    if simplify_tolerance is not None:
+        regions = [_simplify_region(vertices, simplify_tolerance) for vertices in regions]
+    if arcs:
+        geometry.arcs = _arc_angles(np.array(arcs, dtype=float))
+    if circles:
+        geometry.circles = np.array(circles, dtype=float)
+
+    polylines = [np.array(vertices, dtype=float) for vertices in regions] + chains
+    if polylines:
+        geometry.polyline_points = np.concatenate(polylines)
+        geometry.polyline_bulges = np.zeros(len(geometry.polyline_points))
+        counts = [len(vertices) for vertices in polylines]
+        geometry.polyline_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    if inserts:
+        _pack_blocks(geometry, blocks)
+        geometry.insert_blocks = np.array([index for index, _, _ in inserts], dtype=np.int64)
+        geometry.insert_points = np.array([(x, y) for _, x, y in inserts], dtype=float)
+        if not instance_flashes:
+            _explode_inserts(geometry)
+
+    return geometry
+
+
+def _trace_width(aperture, unit):
+    """선분 조리개의 폭 (반올림, 폭을 알 수 없으면 조리개별로 구분)"""
+    try:
+        return round(aperture.equivalent_width(unit), 6)
+    except Exception:
+        return ('aperture', id(aperture))
+
+
+def _lower_flash(obj, circles, blocks, inserts, shape_cache):
+    """Flash (pad/via) 한 개를 형식별 목록에 추가 (변환했으면 True)"""
+    aperture = obj.aperture
+
+    if type(aperture) is CircleAperture and not aperture.hole_dia:
+        circles.append((obj.x, obj.y, aperture.diameter / 2))
+        return True
+
+    # 그 밖의 조리개는 원점 기준 도형을 한 번만 계산하고 블록으로 정의하여 flash마다 삽입
+    # (조리개는 값으로 비교 - 회전 (LR)은 조리개 매개변수에 포함되고, D 코드가 달라도 같은 모양이면 블록 공유)
+    key = (aperture, obj.unit, obj.polarity_dark)
+    try:
+        shape = shape_cache.get(key)
+    except TypeError:
+        key = (id(aperture), obj.unit, obj.polarity_dark)
+        shape = shape_cache.get(key)
+    if shape is None:
+        shape = shape_cache[key] = _flash_shape(aperture, obj.unit, obj.polarity_dark, blocks)
+
+    kind, value = shape
+    if kind == 'circle':
+        circles.append((obj.x, obj.y, value))
+    elif kind == 'block':
+        inserts.append((value, obj.x, obj.y))
+    else:
+        return False
+    return True
+
+
+def _flash_shape(aperture, unit, polarity_dark, blocks):
+    """
+    Outline of an aperture flashed at the origin
+
+    Args:
+        aperture: gerbonara aperture
+        unit: Unit of the flash
+        polarity_dark: Polarity of the flash
+        blocks: Block definition list (a new block is appended when needed)
+
+    Returns:
+        ('circle', radius), ('block', block index) or (None, None) if not convertible
+    """
+    try:
+        circles, polylines = _primitive_outlines(aperture.flash(0, 0, unit, polarity_dark))
+    except Exception:
+        circles, polylines = [], []
+
+    if not circles and not polylines:
+        if hasattr(aperture, 'equivalent_width'):
+            # Unknown aperture - try equivalent_width
+            try:
+                width = aperture.equivalent_width(unit)
+                return 'circle', width / 2
+            except Exception:
+                pass
+        return None, None
+
+    # 원점의 원 하나면 블록 없이 CIRCLE로 기록
+    if not polylines and len(circles) == 1 and circles[0][0] == 0 and circles[0][1] == 0:
+        return 'circle', circles[0][2]
+
+    blocks.append((circles, polylines))
+    return 'block', len(blocks) - 1
+
+
+def _primitive_outlines(primitives):
+    """
+    Exact outlines of gerbonara graphic primitives
+
+    Args:
+        primitives: Graphic primitives from aperture.flash()
+
+    Returns:
+        tuple: (circles as (x, y, r), polylines as (closed vertex list, bulge list))
+    """
+    circles = []
+    polylines = []
+    for prim in primitives:
+        kind = type(prim)
+        if kind is gp.Circle:
+            # 회전한 사각형 조리개는 매크로로 바뀌며 구멍 자리에 r=0 (clear) 원이 들어 있음
+            if prim.r > 0:
+                circles.append((prim.x, prim.y, prim.r))
+
+        elif kind is gp.Rectangle:
+            # rotation은 라디안 (반시계 방향)
+            cos_r = math.cos(prim.rotation)
+            sin_r = math.sin(prim.rotation)
+            w, h = prim.w / 2, prim.h / 2
+            points = [(prim.x + x * cos_r - y * sin_r, prim.y + x * sin_r + y * cos_r)
+                      for x, y in ((-w, -h), (w, -h), (w, h), (-w, h), (-w, -h))]
+            polylines.append((points, [0.0] * 5))
+
+        elif kind is gp.Line:
+            # 장원형 (양 끝이 반원인 굵은 선) → 반원 구간을 bulge 1로 표현
+            length = math.hypot(prim.x2 - prim.x1, prim.y2 - prim.y1)
+            r = prim.width / 2
+            if length < 1e-9:
+                if r > 0:
+                    circles.append((prim.x1, prim.y1, r))
+                continue
+            nx = -(prim.y2 - prim.y1) / length * r
+            ny = (prim.x2 - prim.x1) / length * r
+            points = [(prim.x1 + nx, prim.y1 + ny), (prim.x1 - nx, prim.y1 - ny),
+                      (prim.x2 - nx, prim.y2 - ny), (prim.x2 + nx, prim.y2 + ny),
+                      (prim.x1 + nx, prim.y1 + ny)]
+            polylines.append((points, [1.0, 0.0, 1.0, 0.0, 0.0]))
+
+        elif kind is gp.ArcPoly:
+            points = []
+            bulges = []
+            for (x1, y1), (x2, y2), (clockwise, (cx, cy)) in prim.segments:
+                points.append((x1, y1))
+                bulges.append(0.0 if clockwise is None else _bulge(x1, y1, x2, y2, cx, cy, clockwise))
+            if len(points) >= 2:
+                points.append(points[0])
+                bulges.append(0.0)
+                polylines.append((points, bulges))
+    return circles, polylines
+
+
+def _bulge(x1, y1, x2, y2, cx, cy, clockwise):
+    """호 구간의 LWPOLYLINE bulge (tan(중심각/4), 시계 방향이면 음수)"""
+    start = math.atan2(y1 - cy, x1 - cx)
+    end = math.atan2(y2 - cy, x2 - cx)
+    if clockwise:
+        return -math.tan(((start - end) % (2 * math.pi)) / 4)
+    return math.tan(((end - start) % (2 * math.pi)) / 4)
+
+
+def _pack_blocks(geometry, blocks):
+    """블록 정의 목록을 배열로 변환"""
+    block_circles = []
+    polyline_blocks = []
+    points = []
+    bulges = []
+    counts = []
+    for index, (circles, polylines) in enumerate(blocks):
+        block_circles.extend((index, x, y, r) for x, y, r in circles)
+        for vertices, vertex_bulges in polylines:
+            polyline_blocks.append(index)
+            points.extend(vertices)
+            bulges.extend(vertex_bulges)
+            counts.append(len(vertices))
+
+    if block_circles:
+        geometry.block_circles = np.array(block_circles, dtype=float)
+    if polyline_blocks:
+        geometry.block_polyline_blocks = np.array(polyline_blocks, dtype=np.int64)
+        geometry.block_points = np.array(points, dtype=float)
+        geometry.block_bulges = np.array(bulges, dtype=float)
+        geometry.block_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+
+def _explode_inserts(geometry):
+    """블록 삽입을 블록 내용을 옮긴 개별 CIRCLE/LWPOLYLINE으로 풀어 씀 (블록별로 한꺼번에 이동)"""
+    circle_parts = [geometry.circles]
+    point_parts = [geometry.polyline_points]
+    bulge_parts = [geometry.polyline_bulges]
+    count_parts = [np.diff(geometry.polyline_offsets)]
+    offsets = geometry.block_offsets
+
+    for index in range(geometry.block_count()):
+        positions = geometry.insert_points[geometry.insert_blocks == index]
+        if not len(positions):
+            continue
+
+        block_circles = geometry.block_circles[geometry.block_circles[:, 0] == index, 1:]
+        if len(block_circles):
+            placed = np.empty((len(positions), len(block_circles), 3))
+            placed[..., :2] = positions[:, None, :] + block_circles[None, :, :2]
+            placed[..., 2] = block_circles[None, :, 2]
+            circle_parts.append(placed.reshape(-1, 3))
+
+        for polyline in np.flatnonzero(geometry.block_polyline_blocks == index):
+            start, end = offsets[polyline], offsets[polyline + 1]
+            vertices = geometry.block_points[start:end]
+            point_parts.append((positions[:, None, :] + vertices[None, :, :]).reshape(-1, 2))
+            bulge_parts.append(np.tile(geometry.block_bulges[start:end], len(positions)))
+            count_parts.append(np.full(len(positions), end - start))
+
+    geometry.circles = np.concatenate(circle_parts)
+    geometry.polyline_points = np.concatenate(point_parts)
+    geometry.polyline_bulges = np.concatenate(bulge_parts)
+    geometry.polyline_offsets = np.concatenate(([0], np.cumsum(np.concatenate(count_parts)))).astype(np.int64)
+
+    empty = LayerGeometry(geometry.layer_name)
+    for name in ('block_circles', 'block_polyline_blocks', 'block_points', 'block_bulges', 'block_offsets',
+                 'insert_blocks', 'insert_points'):
+        setattr(geometry, name, getattr(empty, name))
+
+
+def _region_vertices(obj, tolerance=0.001):
+    """Region 외곽선의 꼭짓점 (tolerance 이내의 연속 중복 제거 후 닫힘, 3점 미만이면 None)"""
+    vertices = []
+    for segment in obj.outline:
+        if isinstance(segment, tuple) and len(segment) >= 2:
+            vertices.append((segment[0], segment[1]))
+        elif hasattr(segment, 'x1') and hasattr(segment, 'y1'):
+            vertices.append((segment.x1, segment.y1))
+            if hasattr(segment, 'x2') and hasattr(segment, 'y2'):
+                vertices.append((segment.x2, segment.y2))
+
+    unique_vertices = []
+    for v in vertices:
+        if not unique_vertices or abs(v[0] - unique_vertices[-1][0]) > tolerance or abs(v[1] - unique_vertices[-1][1]) > tolerance:
+            unique_vertices.append(v)
+
+    if len(unique_vertices) < 3:
+        return None
+    if abs(unique_vertices[0][0] - unique_vertices[-1][0]) > tolerance or abs(unique_vertices[0][1] - unique_vertices[-1][1]) > tolerance:
+        unique_vertices.append(unique_vertices[0])
+    return unique_vertices
+
+
+def _simplify_region(vertices, tolerance):
+    """닫힌 Region 외곽선 단순화 (삼각형보다 작아지면 원래 외곽선 유지)"""
+    simplified = simplify_polyline(np.array(vertices, dtype=float), tolerance)
+    return simplified if len(simplified) >= 4 else vertices
+
+
+def _arc_angles(raw):
+    """(x1, y1, x2, y2, cx, cy, clockwise) 배열 → (cx, cy, r, start, end) 배열"""
+    x1, y1, x2, y2, rel_x, rel_y, clockwise = raw.T
+    center_x = x1 + rel_x
+    center_y = y1 + rel_y
+    radius = np.sqrt(rel_x**2 + rel_y**2)
+
+    start_angle = np.degrees(np.arctan2(y1 - center_y, x1 - center_x))
+    end_angle = np.degrees(np.arctan2(y2 - center_y, x2 - center_x))
+
+    # DXF 호는 반시계 방향이므로 시계 방향 호는 시작/끝을 바꿈
+    clockwise = clockwise != 0
+    start_angle, end_angle = (np.where(clockwise, end_angle, start_angle),
+                              np.where(clockwise, start_angle, end_angle))
+    return np.column_stack((center_x, center_y, radius, start_angle, end_angle))
+
+
+def block_name(layer_name, index):
+    """Flash 블록 이름 (레이어 이름에서 블록 이름에 쓸 수 없는 문자는 _로 바꿈)"""
+    return re.sub(r'[<>/\\":;?*|=`\s]', '_', layer_name) + f"_FLASH{index}"
+
+
+def define_blocks(doc, geometry):
+    """
+    Define the flash blocks of a layer in a DXF document
+
+    Args:
+        doc: ezdxf document
+        geometry: LayerGeometry
+
+    Returns:
+        List of block names by block index
+    """
+    names = [block_name(geometry.layer_name, index) for index in range(geometry.block_count())]
+    layouts = [doc.blocks.new(name) for name in names]
+
+    for index, cx, cy, radius in geometry.block_circles.tolist():
+        layouts[int(index)].add_circle((cx, cy), radius)
+
+    points = np.column_stack((geometry.block_points, geometry.block_bulges)).tolist()
+    offsets = geometry.block_offsets.tolist()
+    for index, start, end in zip(geometry.block_polyline_blocks.tolist(), offsets, offsets[1:]):
+        layouts[index].add_lwpolyline(points[start:end], format='xyb')
+    return names
+
+
+def add_geometry_to_dxf(doc, msp, geometry, layer_color=7):
+    """
+    Create the layer and bulk-insert the geometry
+
+    Args:
+        doc: ezdxf document
+        msp: modelspace
+        geometry: LayerGeometry from parse_gerber_layer / lower_objects
+        layer_color: DXF color index of the layer
+
+    Raises:
+        Exception: If the layer already exists in the document
+    """
+    layer_name = geometry.layer_name
+    doc.layers.add(layer_name, color=layer_color)
+    attribs = {'layer': layer_name}
+
+    add_line = msp.add_line
+    for x1, y1, x2, y2 in geometry.lines.tolist():
+        add_line((x1, y1), (x2, y2), dxfattribs=attribs)
+
+    add_arc = msp.add_arc
+    for cx, cy, radius, start_angle, end_angle in geometry.arcs.tolist():
+        add_arc((cx, cy), radius, start_angle, end_angle, dxfattribs=attribs)
+
+    add_circle = msp.add_circle
+    for cx, cy, radius in geometry.circles.tolist():
+        add_circle((cx, cy), radius, dxfattribs=attribs)
+
+    add_lwpolyline = msp.add_lwpolyline
+    if geometry.polyline_bulges.any():
+        points = np.column_stack((geometry.polyline_points, geometry.polyline_bulges)).tolist()
+        point_format = 'xyb'
+    else:
+        points = geometry.polyline_points.tolist()
+        point_format = 'xy'
+    offsets = geometry.polyline_offsets.tolist()
+    for start, end in zip(offsets, offsets[1:]):
+        add_lwpolyline(points[start:end], format=point_format, dxfattribs=attribs)
+
+    if len(geometry.insert_blocks):
+        names = define_blocks(doc, geometry)
+        add_blockref = msp.add_blockref
+        for index, (x, y) in zip(geometry.insert_blocks.tolist(), geometry.insert_points.tolist()):
+            add_blockref(names[index], (x, y), dxfattribs=attribs)
+
+
+def stream_geometry_to_dxf(writer, geometry, layer_color=7):
+    """
+    Create the layer and stream the geometry through a DXFStreamWriter
+
+    Args:
+        writer: dxf_stream.DXFStreamWriter
+        geometry: LayerGeometry from parse_gerber_layer / lower_objects
+        layer_color: DXF color index of the layer
+
+    Raises:
+        Exception: If the layer already exists in the document
+    """
+    layer_name = geometry.layer_name
+    writer.add_layer(layer_name, layer_color)
+    writer.add_lines(geometry.lines, layer_name)
+    writer.add_arcs(geometry.arcs, layer_name)
+    writer.add_circles(geometry.circles, layer_name)
+    writer.add_lwpolylines(geometry.polyline_points, geometry.polyline_offsets, layer_name,
+                           geometry.polyline_bulges)
+    if len(geometry.insert_blocks):
+        names = define_blocks(writer.doc, geometry)
+        writer.add_inserts(names, geometry.insert_blocks, geometry.insert_points, layer_name)
+
+
+def convert_gerber_file(doc, msp, gerber_path, layer_name, layer_color=7):
+    """
+    Parse a Gerber file and add it to a DXF document
+
+    Args:
+        doc: ezdxf document
+        msp: modelspace
+        gerber_path: Path to input Gerber file or gerber_sources.ZipMember
+        layer_name: Layer name in DXF
+        layer_color: DXF color index of the layer
+
+    Returns:
+        tuple: (converted_count, total_count)
+
+    Raises:
+        Exception: If the Gerber file cannot be read or the layer already exists
+    """
+    geometry = parse_gerber_layer(gerber_path, layer_name)
+    add_geometry_to_dxf(doc, msp, geometry, layer_color)
+    return geometry.converted_count, geometry.total_count
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Gerber input sources (folder files and ZIP archive members)
+ZIP 파일은 압축을 풀지 않고 멤버를 바로 읽으며, Gerber 파일 식별은 목록을 한 번 훑으면서
+확장자 + 파일 앞부분 (%FS / G04 헤더) 확인으로 처리
+"""
+
+import os
+import re
+import zipfile
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import PurePosixPath
+from gerbonara import GerberFile
+
+# 알려진 Gerber 확장자 (발견 순서 = 병합 모드의 레이어 기록 순서)
+GERBER_EXTENSIONS = (
+    '.gbr', '.gtl', '.gbl', '.gto', '.gbo', '.gts', '.gbs',
+    '.gko', '.g1', '.g2', '.g3', '.g4', '.gd1', '.gg1'
+)
+
+# 확장자로 알 수 없는 파일은 앞부분만 읽어 Gerber 헤더인지 확인
+SNIFF_BYTES = 512
+_GERBER_HEADER = re.compile(rb"\A(?:\xef\xbb\xbf)?\s*(?:G04|%FS|%TF|%MO)")
+
+_EXTENSION_ORDER = {ext: index for index, ext in enumerate(GERBER_EXTENSIONS)}
+
+
+class ZipMember(namedtuple('ZipMember', ['zip_path', 'name'])):
+    """
+    Gerber file inside a ZIP archive
+
+    Only the archive path and member name are stored, so the source can be
+    passed to worker processes; each reader opens the archive itself.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.zip_path}:{self.name}"
+
+
+def source_name(source):
+    """입력 소스의 파일 이름 (ZIP 멤버는 폴더 경로를 뺀 이름)"""
+    if isinstance(source, ZipMember):
+        return PurePosixPath(source.name).name
+    return os.path.basename(source)
+
+
+def layer_name_of(source):
+    """병합 모드 레이어 이름 (확장자 대문자, 확장자가 없으면 파일 이름)"""
+    name = source_name(source)
+    root, ext = os.path.splitext(name)
+    return (ext[1:] or root).upper()
+
+
+@contextmanager
+def open_source(source):
+    """
+    Open an input source for binary reading
+
+    Args:
+        source: File path or ZipMember
+
+    Yields:
+        Binary file object
+    """
+    if isinstance(source, ZipMember):
+        with zipfile.ZipFile(source.zip_path) as archive, archive.open(source.name) as f:
+            yield f
+    else:
+        with open(source, 'rb') as f:
+            yield f
+
+
+def read_gerber(source):
+    """
+    Parse a Gerber file from a file path or ZIP member
+
+    Args:
+        source: File path or ZipMember
+
+    Returns:
+        GerberFile
+    """
+    if not isinstance(source, ZipMember):
+        return GerberFile.open(source)
+    with open_source(source) as f:
+        data = f.read()
+    # 파일로 열 때 (텍스트 모드)와 같은 줄바꿈으로 맞춤
+    text = data.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+    return GerberFile.from_string(text, filename=source_name(source))
+
+
+def is_gerber_header(data):
+    """파일 앞부분이 Gerber 헤더 (G04 주석 또는 %FS/%TF/%MO 파라미터)로 시작하는지 확인"""
+    return _GERBER_HEADER.match(data) is not None
+
+
+def _sort_key(name):
+    # 알려진 확장자 순서 → 헤더로 찾은 파일, 같은 확장자는 경로 순
+    ext = os.path.splitext(name)[1].lower()
+    return _EXTENSION_ORDER.get(ext, len(GERBER_EXTENSIONS)), name
+
+
+def find_zip_gerbers(zip_path):
+    """
+    Find Gerber files in a ZIP archive without extracting it
+
+    Args:
+        zip_path: ZIP file path
+
+    Returns:
+        list: ZipMember per Gerber file
+
+    Raises:
+        zipfile.BadZipFile: If the file is not a ZIP archive
+    """
+    names = []
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.file_size == 0:
+                continue
+            if os.path.splitext(info.filename)[1].lower() not in _EXTENSION_ORDER:
+                with archive.open(info) as f:
+                    if not is_gerber_header(f.read(SNIFF_BYTES)):
+                        continue
+            names.append(info.filename)
+    return [ZipMember(str(zip_path), name) for name in sorted(names, key=_sort_key)]
+
+
+def find_dir_gerbers(input_dir, recursive=True):
+    """
+    Find Gerber files in a directory with one walk over the tree
+
+    Args:
+        input_dir: Directory path
+        recursive: Include subdirectories
+
+    Returns:
+        list: Gerber file paths (str)
+    """
+    paths = []
+    for root, dirs, files in os.walk(input_dir):
+        if not recursive:
+            dirs.clear()
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() not in _EXTENSION_ORDER:
+                try:
+                    with open(path, 'rb') as f:
+                        if not is_gerber_header(f.read(SNIFF_BYTES)):
+                            continue
+                except OSError:
+                    continue
+            paths.append(path)
+    return sorted(paths, key=_sort_key)
+
+
+def find_gerber_sources(input_path):
+    """
+    Find Gerber files in a directory (recursive) or ZIP archive
+
+    Args:
+        input_path: Directory or ZIP file path
+
+    Returns:
+        list: File paths or ZipMembers
+
+    Raises:
+        zipfile.BadZipFile: If input_path is a file but not a ZIP archive
+    """
+    if os.path.isfile(input_path):
+        return find_zip_gerbers(input_path)
+    return find_dir_gerbers(input_path)
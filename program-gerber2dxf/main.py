@@ -9,19 +9,21 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QLineEdit, QRadioButton, QTextEdit,
     QFileDialog, QMessageBox, QProgressBar, QGroupBox, QButtonGroup,
-    QFrame
+    QFrame, QSpinBox, QCheckBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QFont
 import os
-import math
+import multiprocessing
 import zipfile
-import tempfile
-import shutil
+from functools import partial
 from pathlib import Path
 import ezdxf
-from gerbonara import GerberFile
-from gerbonara.graphic_objects import Line, Arc, Region, Flash
+from conversion_cache import default_cache_dir, parse_gerber_layer_cached, prune_cache
+from dxf_stream import DXFStreamWriter
+from gerber_geometry import LayerGeometry, add_geometry_to_dxf, stream_geometry_to_dxf
+from gerber_sources import find_dir_gerbers, find_zip_gerbers, layer_name_of, source_name
+from parallel_convert import default_workers, iter_jobs, run_jobs
 
 
 # 레이어별 색상 정의
@@ -42,178 +44,23 @@ LAYER_COLORS = {
 }
 
 
-def add_gerber_to_dxf(doc, msp, gerber_path, layer_name):
-    """Add Gerber file content to existing DXF document"""
+def convert_separate_file(gerber_path, dxf_path, layer_name, stream=False, cache_dir=None):
+    """Convert one Gerber file to its own DXF file (worker process entry)"""
     try:
-        gerber = GerberFile.open(gerber_path)
-
-        layer_color = LAYER_COLORS.get(layer_name.upper(), 7)
-        doc.layers.add(layer_name, color=layer_color)
-
-        converted_count = 0
-        for obj in gerber.objects:
-            try:
-                if isinstance(obj, Line):
-                    msp.add_line(
-                        (obj.x1, obj.y1),
-                        (obj.x2, obj.y2),
-                        dxfattribs={'layer': layer_name}
-                    )
-                    converted_count += 1
-
-                elif isinstance(obj, Arc):
-                    center = obj.center
-                    center_x = center.x if hasattr(center, 'x') else (obj.x1 + obj.cx)
-                    center_y = center.y if hasattr(center, 'y') else (obj.y1 + obj.cy)
-                    radius = math.sqrt(obj.cx**2 + obj.cy**2)
-
-                    start_angle = math.degrees(math.atan2(obj.y1 - center_y, obj.x1 - center_x))
-                    end_angle = math.degrees(math.atan2(obj.y2 - center_y, obj.x2 - center_x))
-
-                    if obj.clockwise:
-                        start_angle, end_angle = end_angle, start_angle
-
-                    msp.add_arc(
-                        center=(center_x, center_y),
-                        radius=radius,
-                        start_angle=start_angle,
-                        end_angle=end_angle,
-                        dxfattribs={'layer': layer_name}
-                    )
-                    converted_count += 1
-
-                elif isinstance(obj, Region):
-                    vertices = []
-                    for segment in obj.outline:
-                        if isinstance(segment, tuple) and len(segment) >= 2:
-                            vertices.append((segment[0], segment[1]))
-                        elif hasattr(segment, 'x1') and hasattr(segment, 'y1'):
-                            vertices.append((segment.x1, segment.y1))
-                            if hasattr(segment, 'x2') and hasattr(segment, 'y2'):
-                                vertices.append((segment.x2, segment.y2))
-
-                    unique_vertices = []
-                    for v in vertices:
-                        if not unique_vertices or abs(v[0] - unique_vertices[-1][0]) > 0.001 or abs(v[1] - unique_vertices[-1][1]) > 0.001:
-                            unique_vertices.append(v)
-
-                    if len(unique_vertices) >= 3:
-                        if abs(unique_vertices[0][0] - unique_vertices[-1][0]) > 0.001 or abs(unique_vertices[0][1] - unique_vertices[-1][1]) > 0.001:
-                            unique_vertices.append(unique_vertices[0])
-
-                        msp.add_lwpolyline(
-                            unique_vertices,
-                            dxfattribs={'layer': layer_name}
-                        )
-                        converted_count += 1
-
-                elif isinstance(obj, Flash):
-                    aperture = obj.aperture
-                    aperture_type = type(aperture).__name__
-
-                    if aperture_type == 'CircleAperture':
-                        if hasattr(aperture, 'diameter'):
-                            radius = aperture.diameter / 2
-                            msp.add_circle(
-                                center=(obj.x, obj.y),
-                                radius=radius,
-                                dxfattribs={'layer': layer_name}
-                            )
-                            converted_count += 1
-
-                    elif aperture_type == 'RectangleAperture':
-                        if hasattr(aperture, 'w'):
-                            w = aperture.w / 2
-                            h = getattr(aperture, 'h', aperture.w) / 2
-                            points = [
-                                (obj.x - w, obj.y - h),
-                                (obj.x + w, obj.y - h),
-                                (obj.x + w, obj.y + h),
-                                (obj.x - w, obj.y + h),
-                                (obj.x - w, obj.y - h)
-                            ]
-                            msp.add_lwpolyline(
-                                points,
-                                dxfattribs={'layer': layer_name}
-                            )
-                            converted_count += 1
-
-                    elif aperture_type == 'ObroundAperture':
-                        if hasattr(aperture, 'w'):
-                            w = aperture.w / 2
-                            h = getattr(aperture, 'h', aperture.w) / 2
-                            points = [
-                                (obj.x - w, obj.y - h),
-                                (obj.x + w, obj.y - h),
-                                (obj.x + w, obj.y + h),
-                                (obj.x - w, obj.y + h),
-                                (obj.x - w, obj.y - h)
-                            ]
-                            msp.add_lwpolyline(
-                                points,
-                                dxfattribs={'layer': layer_name}
-                            )
-                            converted_count += 1
-
-                    elif aperture_type == 'ApertureMacroInstance':
-                        primitives = aperture.flash(obj.x, obj.y, obj.unit, obj.polarity_dark)
-                        for prim in primitives:
-                            prim_type = type(prim).__name__
-
-                            if prim_type == 'Circle':
-                                msp.add_circle(
-                                    center=(prim.x, prim.y),
-                                    radius=prim.r,
-                                    dxfattribs={'layer': layer_name}
-                                )
-                            elif prim_type == 'Rectangle':
-                                w = prim.w / 2
-                                h = prim.h / 2
-                                cx, cy = prim.x, prim.y
-
-                                cos_r = math.cos(math.radians(prim.rotation))
-                                sin_r = math.sin(math.radians(prim.rotation))
-
-                                corners = [
-                                    (-w, -h), (w, -h), (w, h), (-w, h), (-w, -h)
-                                ]
-
-                                points = []
-                                for x, y in corners:
-                                    rx = cx + x * cos_r - y * sin_r
-                                    ry = cy + x * sin_r + y * cos_r
-                                    points.append((rx, ry))
-
-                                msp.add_lwpolyline(
-                                    points,
-                                    dxfattribs={'layer': layer_name}
-                                )
-
-                        converted_count += 1
-
-                    else:
-                        if hasattr(aperture, 'equivalent_width'):
-                            try:
-                                width = aperture.equivalent_width()
-                                if callable(width):
-                                    width = width()
-                                radius = width / 2
-                                msp.add_circle(
-                                    center=(obj.x, obj.y),
-                                    radius=radius,
-                                    dxfattribs={'layer': layer_name}
-                                )
-                                converted_count += 1
-                            except:
-                                pass
-
-            except Exception:
-                pass
-
-        return converted_count, len(gerber.objects)
-
-    except Exception as e:
-        return 0, 0
+        geometry = parse_gerber_layer_cached(gerber_path, layer_name, cache_dir)
+    except Exception:
+        geometry = LayerGeometry(layer_name)
+    layer_color = LAYER_COLORS.get(layer_name.upper(), 7)
+
+    if stream:
+        with DXFStreamWriter(dxf_path) as writer:
+            stream_geometry_to_dxf(writer, geometry, layer_color)
+    else:
+        doc = ezdxf.new('R2010')
+        msp = doc.modelspace()
+        add_geometry_to_dxf(doc, msp, geometry, layer_color)
+        doc.saveas(dxf_path)
+    return geometry.converted_count, geometry.total_count, geometry.from_cache
 
 
 class ConversionThread(QThread):
@@ -228,20 +75,18 @@ class ConversionThread(QThread):
 
     def run(self):
         try:
-            # Extract ZIP if needed
-            input_dir = self.converter.prepare_input()
+            # Find Gerber files (ZIP members are read without extraction)
+            gerber_files = self.converter.prepare_input()
 
             if self.converter.mode == "merged":
-                self.converter.convert_merged(input_dir)
+                self.converter.convert_merged(gerber_files)
             else:
-                self.converter.convert_separate(input_dir)
+                self.converter.convert_separate(gerber_files)
 
             self.finished_signal.emit(True, "변환 완료")
         except Exception as e:
             self.log_signal.emit(f"\n❌ 오류 발생: {str(e)}")
             self.finished_signal.emit(False, str(e))
-        finally:
-            self.converter.cleanup_temp()
 
 
 class GerberConverterGUI(QMainWindow):
@@ -255,8 +100,10 @@ class GerberConverterGUI(QMainWindow):
         self.input_type = "folder"  # "folder" or "zip"
         self.output_file = ""
         self.mode = "merged"  # "merged" or "separate"
-        self.temp_dir = None
         self.conversion_thread = None
+        self.workers = default_workers()  # 병렬 작업 프로세스 수 (병합: 파싱, 분리: 파일 변환)
+        self.stream_output = False  # 엔티티를 바로 디스크에 기록 (대용량 보드)
+        self.cache_dir = default_cache_dir()  # 변환 캐시 폴더 (None = 캐시 사용 안 함)
 
         self.setup_ui()
 
@@ -328,6 +175,28 @@ class GerberConverterGUI(QMainWindow):
         self.mode_button_group.addButton(self.separate_radio)
         mode_layout.addWidget(self.separate_radio)
 
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("병렬 작업 수:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, default_workers() * 2))
+        self.workers_spin.setValue(self.workers)
+        self.workers_spin.setToolTip("레이어 파일을 동시에 파싱/변환할 프로세스 수 (1 = 순차 변환)")
+        self.workers_spin.valueChanged.connect(self.set_workers)
+        workers_layout.addWidget(self.workers_spin)
+        workers_layout.addStretch()
+        mode_layout.addLayout(workers_layout)
+
+        self.stream_check = QCheckBox("스트리밍 DXF 출력 (대용량 보드, 메모리 절약)")
+        self.stream_check.setToolTip("엔티티를 만드는 즉시 디스크에 기록하여 메모리 사용량을 일정하게 유지")
+        self.stream_check.toggled.connect(self.set_stream_output)
+        mode_layout.addWidget(self.stream_check)
+
+        self.cache_check = QCheckBox("변환 캐시 사용 (바뀌지 않은 레이어는 다시 파싱하지 않음)")
+        self.cache_check.setChecked(True)
+        self.cache_check.setToolTip(f"캐시 폴더: {self.cache_dir}")
+        self.cache_check.toggled.connect(self.set_use_cache)
+        mode_layout.addWidget(self.cache_check)
+
         mode_group.setLayout(mode_layout)
         main_layout.addWidget(mode_group)
 
@@ -386,6 +255,15 @@ class GerberConverterGUI(QMainWindow):
     def set_mode(self, mode):
         self.mode = mode
 
+    def set_workers(self, workers):
+        self.workers = workers
+
+    def set_stream_output(self, enabled):
+        self.stream_output = enabled
+
+    def set_use_cache(self, enabled):
+        self.cache_dir = default_cache_dir() if enabled else None
+
     def browse_input(self):
         if self.input_type == "folder":
             path = QFileDialog.getExistingDirectory(
@@ -473,80 +351,90 @@ class GerberConverterGUI(QMainWindow):
         QMessageBox.information(self, title, message)
 
     def prepare_input(self):
-        """Prepare input directory (extract ZIP if needed)"""
+        """Find Gerber files in the input folder (recursive) or ZIP archive"""
+        input_path = self.input_path
         if self.input_type == "zip":
-            # Create temporary directory
-            self.temp_dir = tempfile.mkdtemp()
-            zip_path = self.input_path
-
-            self.conversion_thread.log_signal.emit(f"ZIP 파일 압축 해제 중: {zip_path}")
-
+            self.conversion_thread.log_signal.emit(f"ZIP 파일 읽는 중: {input_path}")
             try:
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(self.temp_dir)
-
-                self.conversion_thread.log_signal.emit(f"✓ 압축 해제 완료: {self.temp_dir}")
-                return self.temp_dir
-            except Exception as e:
-                raise Exception(f"ZIP 파일 압축 해제 실패: {str(e)}")
+                gerber_files = find_zip_gerbers(input_path)
+            except (OSError, zipfile.BadZipFile) as e:
+                raise Exception(f"ZIP 파일 읽기 실패: {str(e)}")
         else:
-            return self.input_path
-
-    def cleanup_temp(self):
-        """Clean up temporary directory"""
-        if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                shutil.rmtree(self.temp_dir)
-                self.temp_dir = None
-            except:
-                pass
-
-    def convert_merged(self, input_dir):
-        input_path = Path(input_dir)
-        output_file = self.output_file
-
-        # Find Gerber files (recursive search for ZIP files)
-        gerber_extensions = [
-            '.gbr', '.gtl', '.gbl', '.gto', '.gbo', '.gts', '.gbs',
-            '.gko', '.g1', '.g2', '.g3', '.g4', '.gd1', '.gg1'
-        ]
-
-        gerber_files = []
-        for ext in gerber_extensions:
-            gerber_files.extend(input_path.rglob(f'*{ext}'))
-            gerber_files.extend(input_path.rglob(f'*{ext.upper()}'))
+            gerber_files = find_dir_gerbers(input_path)
 
         if not gerber_files:
             raise Exception(f"Gerber 파일을 찾을 수 없습니다: {input_path}")
+        return gerber_files
+
+    def convert_merged(self, gerber_files):
+        output_file = self.output_file
 
+        workers = min(self.workers, len(gerber_files))
         self.conversion_thread.log_signal.emit(f"발견된 Gerber 파일: {len(gerber_files)}개")
+        if workers > 1:
+            self.conversion_thread.log_signal.emit(f"병렬 파싱: {workers}개 프로세스")
         self.conversion_thread.log_signal.emit("-" * 60)
 
-        # Create DXF document
-        doc = ezdxf.new('R2010')
-        msp = doc.modelspace()
+        cache_dir = self.cache_dir
+        jobs = [(gerber_file, layer_name_of(gerber_file), cache_dir) for gerber_file in gerber_files]
+
+        # 1단계: 작업 프로세스에서 레이어 파싱 (DXF 문서는 프로세스 간 공유 불가)
+        # 2단계: 하나의 문서에 파일 순서대로 레이어 추가 (스트리밍이면 바로 디스크에 기록)
+        if self.stream_output:
+            writer = DXFStreamWriter(output_file)
+            add_layer = partial(stream_geometry_to_dxf, writer)
+            self.conversion_thread.log_signal.emit("스트리밍 DXF 출력 사용")
+        else:
+            doc = ezdxf.new('R2010')
+            msp = doc.modelspace()
+            add_layer = partial(add_geometry_to_dxf, doc, msp)
 
         total_converted = 0
         total_objects = 0
+        cached_count = 0
 
-        for gerber_file in gerber_files:
-            layer_name = gerber_file.suffix[1:].upper()
-            self.conversion_thread.log_signal.emit(f"처리 중: {gerber_file.name} → 레이어: {layer_name}")
-
-            converted, total = add_gerber_to_dxf(doc, msp, str(gerber_file), layer_name)
-            total_converted += converted
-            total_objects += total
-
-            self.conversion_thread.log_signal.emit(f"  ✓ {converted}/{total} 객체 변환")
+        try:
+            for _, (gerber_path, layer_name, _), geometry, error in iter_jobs(parse_gerber_layer_cached, jobs, workers):
+                name = source_name(gerber_path)
+                if error is not None:
+                    self.conversion_thread.log_signal.emit(f"  ✗ 실패: {name}: {error}")
+                    continue
+                if geometry.from_cache:
+                    cached_count += 1
+                    self.conversion_thread.log_signal.emit(f"캐시 사용: {name} → 레이어: {layer_name}")
+                else:
+                    self.conversion_thread.log_signal.emit(f"파싱 완료: {name} → 레이어: {layer_name}")
+
+                try:
+                    add_layer(geometry, LAYER_COLORS.get(layer_name, 7))
+                except Exception as e:
+                    self.conversion_thread.log_signal.emit(f"  ✗ 레이어 추가 실패: {layer_name}: {str(e)}")
+                    continue
+
+                total_converted += geometry.converted_count
+                total_objects += geometry.total_count
+
+                self.conversion_thread.log_signal.emit(
+                    f"레이어 추가: {layer_name} ({geometry.converted_count}/{geometry.total_count} 객체 변환)")
+        except BaseException:
+            if self.stream_output:
+                writer.abort()
+            raise
 
         # Save DXF
-        doc.saveas(output_file)
+        if self.stream_output:
+            writer.close()
+        else:
+            doc.saveas(output_file)
+        prune_cache(cache_dir)
 
         self.conversion_thread.log_signal.emit("-" * 60)
         self.conversion_thread.log_signal.emit(f"✅ 변환 완료!")
         self.conversion_thread.log_signal.emit(f"  출력 파일: {output_file}")
         self.conversion_thread.log_signal.emit(f"  총 레이어: {len(gerber_files)}개")
         self.conversion_thread.log_signal.emit(f"  총 객체: {total_converted}/{total_objects}개")
+        if cache_dir is not None:
+            self.conversion_thread.log_signal.emit(f"  캐시 사용: {cached_count}개 레이어")
 
         # Show completion message in main thread
         self.conversion_thread.show_message_signal.emit(
@@ -556,52 +444,42 @@ class GerberConverterGUI(QMainWindow):
             f"객체: {total_converted}/{total_objects}개"
         )
 
-    def convert_separate(self, input_dir):
-        input_path = Path(input_dir)
+    def convert_separate(self, gerber_files):
         output_path = Path(self.output_file)
         output_path.mkdir(parents=True, exist_ok=True)
 
-        # Find Gerber files (recursive search for ZIP files)
-        gerber_extensions = [
-            '.gbr', '.gtl', '.gbl', '.gto', '.gbo', '.gts', '.gbs',
-            '.gko', '.g1', '.g2', '.g3', '.g4', '.gd1', '.gg1'
-        ]
-
-        gerber_files = []
-        for ext in gerber_extensions:
-            gerber_files.extend(input_path.rglob(f'*{ext}'))
-            gerber_files.extend(input_path.rglob(f'*{ext.upper()}'))
-
-        if not gerber_files:
-            raise Exception(f"Gerber 파일을 찾을 수 없습니다: {input_path}")
-
+        workers = min(self.workers, len(gerber_files))
         self.conversion_thread.log_signal.emit(f"발견된 Gerber 파일: {len(gerber_files)}개")
+        if workers > 1:
+            self.conversion_thread.log_signal.emit(f"병렬 변환: {workers}개 프로세스")
         self.conversion_thread.log_signal.emit("-" * 60)
 
+        # 파일마다 독립적으로 변환 (출력 파일 이름은 입력 파일 이름으로 고정)
+        jobs = [(gerber_file, str(output_path / f"{source_name(gerber_file)}.dxf"), source_name(gerber_file),
+                 self.stream_output, self.cache_dir)
+                for gerber_file in gerber_files]
+
+        def report(index, job, result, error):
+            name = source_name(job[0])
+            if error is None:
+                converted, total, cached = result
+                self.conversion_thread.log_signal.emit(
+                    f"변환 완료: {name} → {Path(job[1]).name} ({converted}/{total} 객체)"
+                    + (" [캐시]" if cached else ""))
+            else:
+                self.conversion_thread.log_signal.emit(f"  ✗ 실패: {name}: {error}")
+
+        results = run_jobs(convert_separate_file, jobs, workers, report)
+        prune_cache(self.cache_dir)
+
         success_count = 0
         total_converted = 0
         total_objects = 0
-
-        for gerber_file in gerber_files:
-            dxf_file = output_path / f"{gerber_file.name}.dxf"
-            layer_name = gerber_file.name
-
-            self.conversion_thread.log_signal.emit(f"변환 중: {gerber_file.name} → {dxf_file.name}")
-
-            try:
-                doc = ezdxf.new('R2010')
-                msp = doc.modelspace()
-
-                converted, total = add_gerber_to_dxf(doc, msp, str(gerber_file), layer_name)
-                doc.saveas(str(dxf_file))
-
-                total_converted += converted
-                total_objects += total
+        for result, error in results:
+            if error is None:
                 success_count += 1
-
-                self.conversion_thread.log_signal.emit(f"  ✓ {converted}/{total} 객체 변환")
-            except Exception as e:
-                self.conversion_thread.log_signal.emit(f"  ✗ 실패: {str(e)}")
+                total_converted += result[0]
+                total_objects += result[1]
 
         self.conversion_thread.log_signal.emit("-" * 60)
         self.conversion_thread.log_signal.emit(f"✅ 변환 완료!")
@@ -627,13 +505,14 @@ class GerberConverterGUI(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            self.cleanup_temp()
             event.accept()
         else:
             event.ignore()
 
 
 def main():
+    # 패키징된 실행 파일에서 작업 프로세스가 GUI를 다시 띄우지 않도록 함
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = GerberConverterGUI()
     window.show()
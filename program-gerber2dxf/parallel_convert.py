@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Process-pool helpers for Gerber to DXF conversion
+레이어 파일 단위 변환을 여러 프로세스로 나누어 실행
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def default_workers():
+    """기본 작업 프로세스 수 (CPU 코어 수)"""
+    return os.cpu_count() or 1
+
+
+def pop_jobs_option(args):
+    """
+    Remove a -j/--jobs N option from a command-line argument list
+
+    Args:
+        args: Argument list (modified in place)
+
+    Returns:
+        Number of worker processes, or None if the option is not given
+
+    Raises:
+        ValueError: If the option has no valid number
+    """
+    workers = None
+    for flag in ("-j", "--jobs"):
+        if flag in args:
+            index = args.index(flag)
+            try:
+                workers = max(1, int(args[index + 1]))
+            except (IndexError, ValueError):
+                raise ValueError(f"{flag} requires a number of worker processes")
+            del args[index:index + 2]
+    return workers
+
+
+def run_jobs(worker, jobs, workers=None, on_result=None):
+    """
+    Run independent conversion jobs, in parallel when workers > 1
+
+    Args:
+        worker: Module-level function called as worker(*job) (must be picklable)
+        jobs: List of argument tuples, one per file
+        workers: Number of worker processes (None = CPU cores, 1 = in-process)
+        on_result: Optional callback(index, job, result, error) called as each
+            job finishes, in completion order
+
+    Returns:
+        List of (result, error) tuples in the same order as jobs
+    """
+    if workers is None:
+        workers = default_workers()
+    workers = max(1, min(workers, len(jobs)))
+    results = [None] * len(jobs)
+
+    if workers == 1:
+        # 단일 작업이면 프로세스 생성 비용 없이 현재 프로세스에서 실행
+        for index, job in enumerate(jobs):
+            try:
+                results[index] = (worker(*job), None)
+            except Exception as e:
+                results[index] = (None, str(e))
+            if on_result:
+                on_result(index, job, *results[index])
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 큰 파일부터 제출하여 가장 큰 레이어가 마지막에 혼자 남지 않도록 함
+        order = sorted(range(len(jobs)), key=lambda i: _job_size(jobs[i]), reverse=True)
+        futures = {executor.submit(worker, *jobs[index]): index for index in order}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = (future.result(), None)
+            except Exception as e:
+                results[index] = (None, str(e))
+            if on_result:
+                on_result(index, jobs[index], *results[index])
+    return results
+
+
+def iter_jobs(worker, jobs, workers=None):
+    """
+    Run jobs like run_jobs but yield results one at a time in job order
+
+    Only a small window of jobs is in flight at once, so finished results do not
+    pile up while the caller is still consuming earlier ones (keeps memory flat
+    when each result is a large layer).
+
+    Args:
+        worker: Module-level function called as worker(*job) (must be picklable)
+        jobs: List of argument tuples, one per file
+        workers: Number of worker processes (None = CPU cores, 1 = in-process)
+
+    Yields:
+        (index, job, result, error) tuples in the same order as jobs
+    """
+    if workers is None:
+        workers = default_workers()
+    workers = max(1, min(workers, len(jobs)))
+
+    if workers == 1:
+        for index, job in enumerate(jobs):
+            try:
+                yield index, job, worker(*job), None
+            except Exception as e:
+                yield index, job, None, str(e)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 작업 프로세스 수의 2배까지만 미리 제출
+        window = workers * 2
+        futures = {}
+        for index in range(min(window, len(jobs))):
+            futures[index] = executor.submit(worker, *jobs[index])
+        for index, job in enumerate(jobs):
+            future = futures.pop(index)
+            following = index + window
+            if following < len(jobs):
+                futures[following] = executor.submit(worker, *jobs[following])
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, str(e)
+            del future
+            yield index, job, result, error
+
+
+def _job_size(job):
+    """작업의 첫 인자(입력 파일)의 크기 (정렬용)"""
+    try:
+        return os.path.getsize(job[0])
+    except (OSError, TypeError, IndexError):
+        return 0
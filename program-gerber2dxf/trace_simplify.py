@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Optional geometry post-pass for trace-heavy copper layers
+같은 폭의 이어진 선분을 하나의 폴리라인으로 묶고, 겹치는 선분을 합친 뒤
+Douglas-Peucker로 허용 오차 안의 꼭짓점을 제거
+"""
+
+import numpy as np
+
+# 허용 오차 0에서도 부동소수점 오차 수준의 일직선 꼭짓점은 제거
+_MIN_TOLERANCE = 1e-9
+
+
+def pop_simplify_option(args):
+    """
+    Remove a --simplify TOL option from a command-line argument list
+
+    Args:
+        args: Argument list (modified in place)
+
+    Returns:
+        Simplification tolerance in drawing units, or None if the option is not given
+
+    Raises:
+        ValueError: If the option has no valid tolerance
+    """
+    if "--simplify" not in args:
+        return None
+    index = args.index("--simplify")
+    try:
+        tolerance = float(args[index + 1])
+    except (IndexError, ValueError):
+        raise ValueError("--simplify requires a tolerance (e.g. 0.001)")
+    if tolerance < 0:
+        raise ValueError("--simplify tolerance must not be negative")
+    del args[index:index + 2]
+    return tolerance
+
+
+def simplify_polyline(points, tolerance):
+    """
+    Douglas-Peucker simplification (the first and last points are always kept)
+
+    Args:
+        points: (n, 2) vertices (a closed ring has first point == last point)
+        tolerance: Maximum distance of a removed vertex from the simplified polyline
+
+    Returns:
+        (k, 2) simplified vertices
+    """
+    count = len(points)
+    if count < 3:
+        return points
+    tolerance = max(tolerance, _MIN_TOLERANCE)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1:end]
+        origin = points[start]
+        dx, dy = points[end] - origin
+        length = np.hypot(dx, dy)
+        if length < _MIN_TOLERANCE:
+            # 닫힌 고리: 시작점까지의 거리
+            distance = np.hypot(inner[:, 0] - origin[0], inner[:, 1] - origin[1])
+        else:
+            # 현 (선분)까지의 거리 - 투영을 선분 안으로 제한하여 현 밖으로 나간 꼭짓점도 유지
+            rel_x = inner[:, 0] - origin[0]
+            rel_y = inner[:, 1] - origin[1]
+            t = np.clip((rel_x * dx + rel_y * dy) / (length * length), 0.0, 1.0)
+            distance = np.hypot(rel_x - t * dx, rel_y - t * dy)
+        farthest = int(np.argmax(distance))
+        if distance[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def _merge_neighbour_cells(cells, points, grid):
+    """
+    Join grid cells whose points lie within the grid size across a cell boundary
+
+    Rounding alone puts 0.4999 and 0.5001 (grid 0.001) into different cells, so
+    each cell is compared with its neighbouring cells of the same group.
+
+    Args:
+        cells: (m, 3) unique group, cell x, cell y rows
+        points: (m, 2) representative point per cell
+        grid: Cell size
+
+    Returns:
+        (m,) merged node index per cell
+    """
+    count = len(cells)
+
+    # 칸 (그룹, x, y)을 정수 하나로: 각 축은 옆 칸 값까지 포함한 순위로 바꿈
+    group = np.unique(cells[:, 0], return_inverse=True)[1].reshape(-1)
+    x_values, x_rank = np.unique(np.concatenate((cells[:, 1], cells[:, 1] + 1)), return_inverse=True)
+    y_values, y_rank = np.unique(np.concatenate((cells[:, 2] - 1, cells[:, 2], cells[:, 2] + 1)),
+                                 return_inverse=True)
+    x, x_next = x_rank.reshape(2, count)
+    y_prev, y, y_next = y_rank.reshape(3, count)
+
+    def cell_key(cell_x, cell_y):
+        return (group * len(x_values) + cell_x) * len(y_values) + cell_y
+
+    keys = cell_key(x, y)
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+
+    pairs = []
+    # 오른쪽, 위, 오른쪽 위, 오른쪽 아래 칸과 비교 (나머지 방향은 상대 칸에서 비교됨)
+    for cell_x, cell_y in ((x_next, y), (x, y_next), (x_next, y_next), (x_next, y_prev)):
+        wanted = cell_key(cell_x, cell_y)
+        position = np.minimum(np.searchsorted(sorted_keys, wanted), count - 1)
+        found = np.flatnonzero(sorted_keys[position] == wanted)
+        neighbour = order[position[found]]
+        near = np.hypot(*(points[found] - points[neighbour]).T) <= grid
+        pairs.extend(zip(found[near].tolist(), neighbour[near].tolist()))
+
+    parent = list(range(count))
+
+    def root(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for a, b in pairs:
+        a, b = root(a), root(b)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+    # 모든 칸이 대표 칸을 바로 가리킬 때까지 건너뛰기
+    parent = np.array(parent)
+    while True:
+        jumped = parent[parent]
+        if np.array_equal(jumped, parent):
+            return parent
+        parent = jumped
+
+
+def coalesce_segments(lines, groups, tolerance):
+    """
+    Chain contiguous segments of the same group into polylines
+
+    Segment ends in the same tolerance-sized grid cell, or in neighbouring cells
+    and closer than the tolerance, are joined; duplicate segments are merged;
+    chains break where three or more segments meet. Each chain is
+    simplified with simplify_polyline.
+
+    Args:
+        lines: (n, 4) x1, y1, x2, y2
+        groups: (n,) group key per segment (same trace width)
+        tolerance: Join / simplification tolerance in drawing units
+
+    Returns:
+        tuple: ((m, 4) segments left as single lines, list of (k, 2) polyline vertex arrays)
+    """
+    if not len(lines):
+        return lines, []
+
+    # 끝점을 허용 오차 격자에 맞춰 같은 점으로 묶음 (그룹이 다르면 다른 점)
+    grid = max(tolerance, _MIN_TOLERANCE)
+    ends = lines.reshape(-1, 2)
+    keys = np.column_stack((np.repeat(groups, 2), np.round(ends / grid)))
+    cells, first_index, node_of_end = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    node_of_end = _merge_neighbour_cells(cells, ends[first_index], grid)[node_of_end.reshape(-1)]
+    _, first_index, node_of_end = np.unique(node_of_end, return_index=True, return_inverse=True)
+    node_points = ends[first_index]
+    segments = node_of_end.reshape(-1, 2)
+
+    # 같은 두 점을 잇는 선분 (방향 무관)과 길이 0 선분 제거
+    segments = segments[segments[:, 0] != segments[:, 1]]
+    segments = np.unique(np.sort(segments, axis=1), axis=0)
+
+    node_count = len(node_points)
+    degree = np.bincount(segments.ravel(), minlength=node_count)
+    adjacency = [[] for _ in range(node_count)]
+    for index, (a, b) in enumerate(segments.tolist()):
+        adjacency[a].append((index, b))
+        adjacency[b].append((index, a))
+
+    used = np.zeros(len(segments), dtype=bool)
+
+    def walk(node, segment, other):
+        chain = [node]
+        while True:
+            used[segment] = True
+            chain.append(other)
+            if degree[other] != 2:
+                return chain
+            node = other
+            for segment, other in adjacency[node]:
+                if not used[segment]:
+                    break
+            else:
+                # 고리가 닫힘
+                return chain
+
+    chains = []
+    # 끝점/분기점에서 시작하고, 남은 선분 (닫힌 고리)은 임의의 점에서 시작
+    starts = [node for node in range(node_count) if degree[node] != 2]
+    for node in starts + list(segments[:, 0]):
+        for segment, other in adjacency[node]:
+            if not used[segment]:
+                chains.append(walk(node, segment, other))
+
+    singles = []
+    polylines = []
+    for chain in chains:
+        points = simplify_polyline(node_points[chain], tolerance)
+        if len(points) == 2:
+            singles.append(points.ravel())
+        else:
+            polylines.append(points)
+
+    singles = np.array(singles, dtype=float).reshape(-1, 4)
+    return singles, polylines
@@ -0,0 +1,172 @@
+"""
+RS485 버스 스케줄러 모듈
+
+하나의 시리얼 포트에 연결된 여러 센서를 라운드로빈으로 질의합니다.
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import serial
+
+from config import SensorConfig
+from sensor_data import (
+    FrameError, FrameStats, SensorData, decode_sensor_frame, find_valid_frame
+)
+from serial_comm import build_query, read_frame
+
+
+@dataclass
+class PollResult:
+    """센서 한 개에 대한 질의 결과"""
+    sensor_id: str
+    timestamp: float
+    data: Optional[SensorData] = None
+    error: Optional[str] = None
+
+
+class BusScheduler:
+    """공유 RS485 버스 라운드로빈 질의 클래스"""
+
+    def __init__(self, port: str, baudrate: int, sensor_ids: Sequence[str],
+                 config: SensorConfig, timeout: float = 0.2,
+                 inter_frame_gap: float = 0.002,
+                 stats: Optional[FrameStats] = None):
+        """
+        버스 스케줄러를 초기화합니다.
+
+        Args:
+            port: 시리얼 포트 경로
+            baudrate: 통신 속도
+            sensor_ids: 질의할 센서 ID 목록
+            config: 센서 설정 객체 (MODEL/STX/ETX 공통값)
+            timeout: 센서 한 개의 응답 대기 시간 (초)
+            inter_frame_gap: 응답 수신 후 다음 질의까지의 간격 (초)
+            stats: 누적할 프레임 통계 (None이면 새로 생성, 재연결 시 공유용)
+        """
+        if not sensor_ids:
+            raise ValueError("센서 ID 목록이 비어 있습니다")
+
+        self.port = port
+        self.baudrate = baudrate
+        self.sensor_ids = list(sensor_ids)
+        self.timeout = timeout
+        self.inter_frame_gap = inter_frame_gap
+        self.serial: Optional[serial.Serial] = None
+        self.stats = stats if stats is not None else FrameStats()
+
+        # 센서별 설정과 질의 패킷은 한 번만 생성
+        self.configs: Dict[str, SensorConfig] = {
+            sensor_id: config.for_sensor(sensor_id) for sensor_id in self.sensor_ids
+        }
+        self.queries: Dict[str, bytes] = {
+            sensor_id: build_query(cfg, "A00") for sensor_id, cfg in self.configs.items()
+        }
+
+    def open(self) -> None:
+        """시리얼 포트를 엽니다."""
+        if self.serial is None or not self.serial.is_open:
+            # read 타임아웃은 짧게 두고 프레임 대기는 read_frame의 deadline으로 제한
+            self.serial = serial.Serial(self.port, self.baudrate,
+                                        timeout=min(self.timeout, 0.02))
+
+    def close(self) -> None:
+        """시리얼 포트를 닫습니다."""
+        if self.serial is not None and self.serial.is_open:
+            self.serial.close()
+        self.serial = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def poll(self, sensor_id: str) -> PollResult:
+        """
+        센서 한 개에 A00 질의를 보내고 응답을 파싱합니다.
+
+        손상된 프레임을 받으면 남은 타임아웃 동안 계속 읽어 다음 STX에서
+        재동기화하며, 결과는 self.stats 카운터에 반영합니다.
+
+        Args:
+            sensor_id: 질의할 센서 ID
+
+        Returns:
+            PollResult: 수신 시각과 파싱 결과 (실패 시 error 설정)
+        """
+        config = self.configs[sensor_id]
+
+        # 이전 질의의 늦은 응답이 섞이지 않도록 수신 버퍼 비우기
+        self.serial.reset_input_buffer()
+        self.serial.write(self.queries[sensor_id])
+        deadline = time.monotonic() + self.timeout
+
+        response = ""
+        retried = False
+        while True:
+            chunk = read_frame(self.serial, config.receive_etx,
+                               max(deadline - time.monotonic(), 0.0))
+            response += chunk
+            timestamp = time.time()
+
+            if not response:
+                self.stats.timeouts += 1
+                return PollResult(sensor_id, timestamp, error="응답 없음")
+
+            try:
+                frame, resynced = find_valid_frame(response, config)
+                data = decode_sensor_frame(frame, config)
+            except FrameError as e:
+                # 아직 시간이 남았으면 이어서 읽어 다음 STX에서 재동기화
+                if chunk and time.monotonic() < deadline:
+                    retried = True
+                    continue
+                self.stats.bad += 1
+                return PollResult(sensor_id, timestamp, error=str(e))
+
+            self.stats.good += 1
+            if resynced or retried:
+                self.stats.resync += 1
+            return PollResult(sensor_id, timestamp, data=data)
+
+    def poll_cycle(self) -> List[PollResult]:
+        """
+        모든 센서를 한 번씩 순서대로 질의합니다.
+
+        Returns:
+            list: 센서별 PollResult 목록
+        """
+        results = []
+        for index, sensor_id in enumerate(self.sensor_ids):
+            if index and self.inter_frame_gap > 0:
+                time.sleep(self.inter_frame_gap)
+            results.append(self.poll(sensor_id))
+        return results
+
+    def run(self, on_result: Callable[[PollResult], None],
+            should_continue: Callable[[], bool], cycle_interval: float = 0.0) -> None:
+        """
+        should_continue()가 False가 될 때까지 라운드로빈 질의를 반복합니다.
+
+        Args:
+            on_result: 각 PollResult를 받을 콜백
+            should_continue: 계속 여부를 반환하는 함수
+            cycle_interval: 한 사이클의 최소 주기 (초, 0이면 최대 속도)
+        """
+        while should_continue():
+            cycle_start = time.monotonic()
+            for index, sensor_id in enumerate(self.sensor_ids):
+                if not should_continue():
+                    return
+                if index and self.inter_frame_gap > 0:
+                    time.sleep(self.inter_frame_gap)
+                on_result(self.poll(sensor_id))
+
+            # 다음 사이클까지 대기 (중지 요청에 빠르게 반응하도록 나눠서 대기)
+            deadline = cycle_start + cycle_interval
+            while should_continue() and time.monotonic() < deadline:
+                time.sleep(max(0.0, min(0.1, deadline - time.monotonic())))
+            if cycle_interval <= 0 and self.inter_frame_gap > 0:
+                time.sleep(self.inter_frame_gap)
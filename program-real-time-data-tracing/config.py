@@ -3,7 +3,8 @@
 """
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import List
 
 @dataclass
 class SensorConfig:
@@ -14,6 +15,18 @@ class SensorConfig:
     receive_stx: str
     receive_etx: str
 
+    def sensor_ids(self) -> List[str]:
+        """ID 항목을 쉼표로 구분된 센서 ID 목록으로 반환합니다."""
+        return parse_sensor_ids(self.id)
+
+    def for_sensor(self, sensor_id: str) -> "SensorConfig":
+        """ID만 sensor_id로 바꾼 설정 사본을 반환합니다."""
+        return replace(self, id=sensor_id)
+
+def parse_sensor_ids(text: str) -> List[str]:
+    """쉼표(또는 공백)로 구분된 센서 ID 문자열을 목록으로 변환합니다."""
+    return [part for part in text.replace(",", " ").split() if part]
+
 def load_sensor_config_json(path="sensor_info.json") -> SensorConfig:
     # utf-8-sig: 파일에 BOM이 있어도 안전
     with open(path, "r", encoding="utf-8-sig") as f:
@@ -5,36 +5,57 @@ import csv
 import os
 import time
 from datetime import datetime
-from typing import Optional
-from serial_comm import SerialCommunicator
-from sensor_data import SensorData
+from typing import List, Optional
+from bus_scheduler import BusScheduler, PollResult
+from config import load_sensor_config_json
+from sensor_data import SENSOR_FIELDS, FrameStats, SensorData
 
 class DataLogger:
     """센서 데이터 로거 클래스"""
     
     def __init__(self, filename: str = "sensor_data.csv", interval: int = 5, 
-                 port: str = "/dev/ttyUSB0", baudrate: int = 19200):
+                 port: str = "/dev/ttyUSB0", baudrate: int = 19200,
+                 sensor_ids: Optional[List[str]] = None,
+                 config_path: str = "sensor_info.json", timeout: float = 0.2,
+                 inter_frame_gap: float = 0.002, verbose: bool = True):
         """
         데이터 로거를 초기화합니다.
         
         Args:
             filename: CSV 파일명
-            interval: 데이터 수집 간격 (초)
+            interval: 데이터 수집 간격 (초, 전체 센서 한 사이클 기준)
             port: 시리얼 포트 경로
             baudrate: 통신 속도
+            sensor_ids: 질의할 센서 ID 목록 (None이면 sensor_info.json의 ID)
+            config_path: 센서 설정 JSON 파일 경로
+            timeout: 센서 한 개의 응답 대기 시간 (초)
+            inter_frame_gap: 프레임 간 간격 (초)
+            verbose: 샘플마다 콘솔 출력 여부
         """
         self.filename = filename
         self.interval = interval
-        self.serial_comm = SerialCommunicator(port, baudrate)
+        self.port = port
+        self.baudrate = baudrate
+        self.sensor_ids = sensor_ids
+        self.config_path = config_path
+        self.timeout = timeout
+        self.inter_frame_gap = inter_frame_gap
+        self.verbose = verbose
+        self.running = False
+        self.stats = FrameStats()  # 세션 전체 프레임 통계 (재연결 시에도 누적)
         
-    def get_timestamp(self) -> str:
+    def get_timestamp(self, timestamp: Optional[float] = None) -> str:
         """
-        현재 시간을 문자열로 반환합니다.
+        시간을 문자열로 반환합니다.
+        
+        Args:
+            timestamp: POSIX 타임스탬프 (None이면 현재 시간)
         
         Returns:
-            str: 현재 시간 (YYYY-MM-DD HH:MM:SS 형식)
+            str: 시간 (YYYY-MM-DD HH:MM:SS 형식)
         """
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        moment = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+        return moment.strftime("%Y-%m-%d %H:%M:%S")
     
     def write_header_if_needed(self) -> None:
         """
@@ -43,19 +64,19 @@ class DataLogger:
         if not os.path.exists(self.filename):
             with open(self.filename, 'w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file)
-                writer.writerow([
-                    'timestamp', 'length', 'angle_x', 'angle_y', 
-                    'temperature', 'voltage', 'current'
-                ])
+                writer.writerow(['timestamp', 'sensor_id', *SENSOR_FIELDS])
     
-    def log_data(self, data: SensorData) -> None:
+    def log_data(self, data: SensorData, sensor_id: str = "",
+                 timestamp: Optional[float] = None) -> None:
         """
         센서 데이터를 CSV 파일에 기록합니다.
         
         Args:
             data: 센서 데이터
+            sensor_id: 센서 ID
+            timestamp: 수신 시각 (POSIX 초, None이면 현재 시간)
         """
-        timestamp = self.get_timestamp()
+        timestamp = self.get_timestamp(timestamp)
         
         # 헤더가 필요한 경우 작성
         self.write_header_if_needed()
@@ -63,40 +84,71 @@ class DataLogger:
         # 데이터 추가
         with open(self.filename, 'a', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
-            writer.writerow([
-                timestamp, data.length, data.angle_x, data.angle_y,
-                data.temperature, data.voltage, data.current
-            ])
+            writer.writerow([timestamp, sensor_id, *data.as_tuple()])
+        
+        if self.verbose:
+            print(f"데이터 저장됨: {self.filename}")
+    
+    def on_poll_result(self, result: PollResult) -> None:
+        """
+        버스 스케줄러의 질의 결과를 기록합니다.
+        
+        Args:
+            result: 센서 한 개의 질의 결과
+        """
+        if result.data is None:
+            print(f"[{result.sensor_id}] 오류 발생: {result.error} ({self.stats.summary()})")
+            return
+        
+        data = result.data
+        self.log_data(data, result.sensor_id, result.timestamp)
         
-        print(f"데이터 저장됨: {self.filename}")
+        if not self.verbose:
+            return
+        print(f"[{result.sensor_id}] "
+              f"길이: {data.length:.2f}mm, "
+              f"각도: X={data.angle_x:.2f}°, Y={data.angle_y:.2f}°, "
+              f"온도: {data.temperature:.2f}°C, "
+              f"전압: {data.voltage:.2f}V, "
+              f"전류: {data.current:.1f}mA")
+    
+    def stop(self) -> None:
+        """
+        로깅 루프를 종료하도록 요청합니다 (시그널 핸들러에서 호출 가능).
+        """
+        self.running = False
     
     def start_logging(self) -> None:
         """
-        데이터 로깅을 시작합니다. Ctrl+C로 종료할 수 있습니다.
+        데이터 로깅을 시작합니다. Ctrl+C 또는 stop()으로 종료할 수 있습니다.
         """
         #print(f"데이터 로깅 시작 ({self.interval}초 간격)")
         #print("종료하려면 Ctrl+C를 누르세요")
         
+        config = load_sensor_config_json(self.config_path)
+        sensor_ids = self.sensor_ids or config.sensor_ids()
+        self.running = True
+        
         try:
-            while True:
+            while self.running:
                 try:
-                    # 센서 데이터 수집
-                    data = self.serial_comm.collect_sensor_data_once()
-                    
-                    # CSV 파일에 기록
-                    self.log_data(data)
-                    
-                    print(f"길이: {data.length:.2f}mm, "
-                          f"각도: X={data.angle_x:.2f}°, Y={data.angle_y:.2f}°, "
-                          f"온도: {data.temperature:.2f}°C, "
-                          f"전압: {data.voltage:.2f}V, "
-                          f"전류: {data.current:.1f}mA")
-                    
+                    # 하나의 포트에서 모든 센서를 라운드로빈으로 질의
+                    with BusScheduler(self.port, self.baudrate, sensor_ids, config,
+                                      timeout=self.timeout,
+                                      inter_frame_gap=self.inter_frame_gap,
+                                      stats=self.stats) as bus:
+                        bus.run(self.on_poll_result, lambda: self.running, self.interval)
                 except Exception as e:
                     print(f"오류 발생: {e}")
                 
-                # 지정된 간격만큼 대기
-                time.sleep(self.interval)
+                # 포트 오류 시 잠시 후 재연결 (중지 요청은 바로 반영)
+                deadline = time.monotonic() + max(self.interval, 1.0)
+                while self.running and time.monotonic() < deadline:
+                    time.sleep(0.1)
                 
         except KeyboardInterrupt:
-            print("\n데이터 로깅을 종료합니다.")
+            pass
+        
+        self.running = False
+        print("\n데이터 로깅을 종료합니다.")
+        print(f"프레임 통계: {self.stats.summary()}")
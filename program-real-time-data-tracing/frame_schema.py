@@ -0,0 +1,273 @@
+"""
+응답 프레임 스키마 모듈
+
+CMD별 데이터 필드를 선언적으로 정의하고, 미리 계산한 슬라이스/변환 정보로
+컴파일하여 빠르게 해석합니다. 태그가 붙은 선택 필드가 빠질 수 있는 스키마
+(optional_tags)는 고정 위치 대신 태그를 차례로 찾아가며 해석합니다.
+
+응답 프레임 구조: STX + PRE(10) + CMD(1) + LENGTH(1~2) + data_string + CHKSUM(2) + ETX
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class FieldError(ValueError):
+    """필드 태그/형식이 스키마와 맞지 않을 때 발생하는 예외"""
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    데이터 필드 한 개의 정의
+
+    값 변환: kind가 int/float이면 (offset - raw if offset else raw) / divisor
+    """
+    name: str
+    width: int = 0  # 값 자릿수 (0이면 나머지 전체)
+    tag: str = ""  # 값 앞의 태그 문자열 (검증용, 없으면 "")
+    kind: str = "int"  # int, float, str, code
+    divisor: float = 1.0
+    offset: int = 0  # 0이 아니면 offset - raw (반전 기준값)
+    choices: Optional[Dict[int, str]] = None  # kind == "code": 코드 -> 표시 문자열
+    default: Optional[str] = None  # choices에 없는 코드의 표시 문자열 (None이면 "알 수 없음(코드)")
+
+
+@dataclass
+class FrameSchema:
+    """CMD 한 개의 응답 데이터 정의"""
+    cmd: str
+    fields: Tuple[FieldSpec, ...] = ()
+    length_digits: int = 2  # LENGTH 자릿수
+    exact_length: Optional[int] = None  # data_string 길이가 정해져 있으면 지정
+    min_length: int = 0
+    optional_tags: bool = False  # True면 태그가 없는 필드는 건너뜀 (뒤 필드가 앞으로 당겨짐)
+    constants: Dict[str, object] = field(default_factory=dict)  # 항상 추가할 값
+    finalize: Optional[Callable[[str, dict], None]] = None  # (data_string, result) 후처리
+
+
+class FrameDecoder:
+    """FrameSchema를 컴파일한 데이터 해석기"""
+
+    def __init__(self, schema: FrameSchema):
+        """
+        스키마의 필드 위치와 변환 함수를 미리 계산합니다.
+
+        Args:
+            schema: CMD 응답 데이터 정의
+        """
+        self.schema = schema
+        self.cmd = schema.cmd
+        self.length_digits = schema.length_digits
+        # 필드별 (이름, 태그 위치, 값 시작, 값 끝, 태그, 자릿수, 변환 함수, 반전 기준, 나눗셈, 정의)
+        self._plan = []
+        pos = 0
+        for spec in schema.fields:
+            tag_end = pos + len(spec.tag)
+            end = tag_end + spec.width if spec.width else None
+            convert = {"str": str, "float": float}.get(spec.kind, int)
+            self._plan.append((spec.name, pos, tag_end, end, spec.tag, spec.width, convert,
+                               spec.offset, spec.divisor, spec if spec.kind == "code" else None))
+            if end is None:
+                break
+            pos = end
+        self.record_length = pos
+        self._optional_tags = schema.optional_tags
+        self._has_post = bool(schema.constants) or schema.finalize is not None
+
+    def decode(self, data_string: str, strict: bool = False) -> dict:
+        """
+        data_string을 필드 딕셔너리로 해석합니다.
+
+        Args:
+            data_string: 응답의 데이터 영역
+            strict: True면 잘못된 필드에서 FieldError, False면 해당 필드만 생략
+
+        Returns:
+            dict: 필드명 -> 값 (code 필드는 표시 문자열과 이름_code 값)
+
+        Raises:
+            FieldError: strict 모드에서 길이/태그/숫자 형식이 잘못된 경우
+        """
+        result = self._decode_fields(data_string, strict)
+        if self._has_post:
+            self._post_process(data_string, result)
+        return result
+
+    def _post_process(self, data_string: str, result: dict) -> None:
+        """스키마의 고정값과 후처리를 적용합니다."""
+        schema = self.schema
+        if schema.constants:
+            result.update(schema.constants)
+        if schema.finalize is not None:
+            schema.finalize(data_string, result)
+
+    def _decode_fields(self, data_string: str, strict: bool) -> dict:
+        """미리 계산한 필드 목록을 따라 검사하며 해석합니다."""
+        schema = self.schema
+        size = len(data_string)
+        if schema.exact_length is not None and size != schema.exact_length:
+            if strict:
+                raise FieldError(f"CMD {self.cmd} data length should be "
+                                 f"{schema.exact_length}, got {size}")
+            return {}
+        if size < schema.min_length:
+            if strict:
+                raise FieldError(f"CMD {self.cmd} data length should be at least "
+                                 f"{schema.min_length}, got {size}")
+            return {}
+        if self._optional_tags:
+            return self._decode_tagged(data_string, strict)
+
+        result = {}
+        for name, start, tag_end, end, tag, width, convert, offset, divisor, code_spec in self._plan:
+            if tag and not data_string.startswith(tag, start):
+                if strict:
+                    raise FieldError(f"{name}: tag {tag!r} expected at {start}")
+                continue
+            text = data_string[tag_end:end]
+            if width and len(text) != width:
+                if strict:
+                    raise FieldError(f"{name}: incomplete field")
+                continue
+            try:
+                value = convert(text)
+            except ValueError:
+                if strict:
+                    raise FieldError(f"{name}: invalid value {text!r}")
+                continue
+            _store_value(result, name, value, offset, divisor, code_spec)
+        return result
+
+    def _decode_tagged(self, data_string: str, strict: bool) -> dict:
+        """
+        태그를 차례로 찾아가며 해석합니다.
+
+        태그가 없는 필드는 위치를 차지하지 않고 건너뛰며 (꺼진 센서 등),
+        값이 잘못된 필드에서는 이후 위치를 알 수 없으므로 해석을 멈춥니다.
+        """
+        result = {}
+        pos = 0
+        for name, _, _, _, tag, width, convert, offset, divisor, code_spec in self._plan:
+            if tag and not data_string.startswith(tag, pos):
+                continue
+            start = pos + len(tag)
+            end = start + width if width else len(data_string)
+            text = data_string[start:end]
+            if width and len(text) != width:
+                if strict:
+                    raise FieldError(f"{name}: incomplete field")
+                break
+            try:
+                value = convert(text)
+            except ValueError:
+                if strict:
+                    raise FieldError(f"{name}: invalid value {text!r}")
+                break
+            _store_value(result, name, value, offset, divisor, code_spec)
+            pos = end
+        return result
+
+    def decode_many(self, data_strings: Iterable[str], strict: bool = False) -> List[dict]:
+        """
+        여러 data_string을 한 번에 해석합니다.
+
+        Args:
+            data_strings: 데이터 영역 문자열들
+            strict: decode()와 동일
+
+        Returns:
+            list: 입력 순서대로의 필드 딕셔너리 목록
+        """
+        if self._has_post:
+            decode = self.decode
+            return [decode(data_string, strict) for data_string in data_strings]
+
+        # 후처리가 없는 스키마(A 등)는 필드 해석만 바로 호출
+        decode_fields = self._decode_fields
+        return [decode_fields(data_string, strict) for data_string in data_strings]
+
+
+def _store_value(result: dict, name: str, value, offset: int, divisor: float,
+                 code_spec: Optional[FieldSpec]) -> None:
+    """변환한 값에 코드 표시/반전/나눗셈을 적용하여 결과에 넣습니다."""
+    if code_spec is not None:
+        if code_spec.choices is not None:
+            label = code_spec.choices.get(value)
+            if label is None:
+                label = code_spec.default if code_spec.default is not None else f"알 수 없음({value})"
+            result[name] = label
+        result[name + "_code"] = value
+        return
+    if offset:
+        value = offset - value
+    if divisor != 1.0:
+        value = value / divisor
+    result[name] = value
+
+
+def compile_schemas(schemas: Iterable[FrameSchema]) -> Dict[str, FrameDecoder]:
+    """
+    스키마 목록을 CMD -> FrameDecoder 딕셔너리로 컴파일합니다.
+
+    Args:
+        schemas: CMD별 응답 데이터 정의
+
+    Returns:
+        dict: CMD 문자 -> 컴파일된 해석기
+    """
+    return {schema.cmd: FrameDecoder(schema) for schema in schemas}
+
+
+def split_frame(response_str: str, recv_stx: str, recv_etx: str,
+                decoders: Dict[str, FrameDecoder], pre_length: int = 10) -> dict:
+    """
+    응답 프레임을 PRE/CMD/LENGTH/data_string/CHKSUM으로 나눕니다.
+
+    Args:
+        response_str: 수신된 응답 문자열 (STX ~ ETX)
+        recv_stx: 수신 STX
+        recv_etx: 수신 ETX
+        decoders: CMD별 해석기 (LENGTH 자릿수 결정용, 없는 CMD는 2자리)
+        pre_length: PRE(모델 + ID) 길이
+
+    Returns:
+        dict: pre, cmd, length, data_string, checksum, raw_response
+
+    Raises:
+        FieldError: STX/ETX, 길이 등 프레임 구조가 잘못된 경우
+    """
+    if not response_str.startswith(recv_stx):
+        raise FieldError(f"Invalid receive STX: {response_str[:10]}")
+    if not response_str.endswith(recv_etx):
+        raise FieldError(f"Invalid receive ETX: {response_str[-10:]}")
+
+    content = response_str[len(recv_stx):len(response_str) - len(recv_etx)]
+    # CHKSUM (마지막 2자리) 분리
+    data_part = content[:-2]
+    checksum = content[-2:]
+    if len(data_part) <= pre_length:
+        raise FieldError("Response content too short")
+
+    pre = data_part[:pre_length]
+    cmd = data_part[pre_length]
+    decoder = decoders.get(cmd)
+    length_digits = decoder.length_digits if decoder is not None else 2
+    data_start = pre_length + 1 + length_digits
+    length_str = data_part[pre_length + 1:data_start]
+    try:
+        data_length = int(length_str)
+    except ValueError:
+        raise FieldError(f"Invalid length value: {length_str}")
+
+    data_string = data_part[data_start:data_start + data_length]
+    if len(data_string) != data_length:
+        raise FieldError(f"Data length mismatch: expected {data_length}, got {len(data_string)}")
+
+    return {
+        'pre': pre,
+        'cmd': cmd,
+        'length': data_length,
+        'data_string': data_string,
+        'checksum': checksum,
+        'raw_response': response_str,
+    }
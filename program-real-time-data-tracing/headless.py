@@ -0,0 +1,193 @@
+"""
+헤드리스 데이터 수집 모듈
+
+Qt/matplotlib 없이 센서 데이터를 CSV로 기록하는 명령줄 데몬입니다.
+GUI가 없는 현장 PC에서 서비스로 실행할 수 있습니다.
+
+사용 예:
+    python -m headless log --port /dev/ttyUSB0 --rate 2
+    python -m headless log --port COM3 --ids 000001,000002 --rate 0 --quiet
+    python -m headless tune --port /dev/ttyUSB0 --ids 000001
+
+tune으로 찾은 통신 속도/타임아웃/프레임 간격은 포트별로 저장되며, log에서
+해당 옵션을 생략하면 저장된 값을 사용합니다.
+"""
+import argparse
+import signal
+import sys
+from typing import List, Optional
+
+from bus_scheduler import BusScheduler
+from config import load_sensor_config_json, parse_sensor_ids
+from data_logger import DataLogger
+from link_tuning import LinkTuner, load_profile, save_profile
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    명령줄 인자 파서를 생성합니다.
+
+    Returns:
+        argparse.ArgumentParser: 서브커맨드가 등록된 파서
+    """
+    parser = argparse.ArgumentParser(
+        prog="headless", description="센서 데이터 헤드리스 수집기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    log_parser = subparsers.add_parser("log", help="센서 데이터를 CSV 파일로 기록")
+    log_parser.add_argument("--port", default="/dev/ttyUSB0", help="시리얼 포트 경로")
+    log_parser.add_argument("--baudrate", type=int, default=None,
+                            help="통신 속도 (생략 시 튜닝 프로파일, 없으면 19200)")
+    log_parser.add_argument("--rate", type=float, default=1.0,
+                            help="초당 수집 사이클 수 (0이면 최대 속도)")
+    log_parser.add_argument("--ids", default="",
+                            help="센서 ID 목록 (쉼표 구분, 생략 시 설정 파일의 ID)")
+    log_parser.add_argument("--output", default="sensor_data.csv", help="CSV 파일 경로")
+    log_parser.add_argument("--config", default="sensor_info.json",
+                            help="센서 설정 JSON 파일 경로")
+    log_parser.add_argument("--timeout", type=float, default=None,
+                            help="센서 한 개의 응답 대기 시간 (초, 생략 시 튜닝 프로파일, 없으면 0.2)")
+    log_parser.add_argument("--gap", type=float, default=None,
+                            help="프레임 간 간격 (초, 생략 시 튜닝 프로파일, 없으면 0.002)")
+    log_parser.add_argument("--quiet", action="store_true",
+                            help="샘플별 콘솔 출력 생략 (오류와 통계만 출력)")
+    log_parser.add_argument("--profile", default="link_profiles.json",
+                            help="포트별 튜닝 프로파일 파일 경로")
+
+    tune_parser = subparsers.add_parser(
+        "tune", help="통신 속도/타임아웃/프레임 간격을 측정하여 프로파일로 저장")
+    tune_parser.add_argument("--port", default="/dev/ttyUSB0", help="시리얼 포트 경로")
+    tune_parser.add_argument("--ids", default="",
+                             help="질의할 센서 ID (생략 시 설정 파일의 첫 ID)")
+    tune_parser.add_argument("--config", default="sensor_info.json",
+                             help="센서 설정 JSON 파일 경로")
+    tune_parser.add_argument("--probes", type=int, default=20,
+                             help="속도/간격마다 보낼 질의 수")
+    tune_parser.add_argument("--probe-timeout", type=float, default=0.5,
+                             help="측정 중 질의 한 개의 응답 대기 시간 (초)")
+    tune_parser.add_argument("--profile", default="link_profiles.json",
+                             help="결과를 저장할 프로파일 파일 경로")
+    return parser
+
+
+def run_log(args: argparse.Namespace) -> int:
+    """
+    log 서브커맨드를 실행합니다. SIGINT/SIGTERM 수신 시 정상 종료합니다.
+
+    Args:
+        args: 파싱된 명령줄 인자
+
+    Returns:
+        int: 종료 코드
+    """
+    if args.rate < 0:
+        print("--rate는 0 이상이어야 합니다", file=sys.stderr)
+        return 2
+    interval = 1.0 / args.rate if args.rate > 0 else 0.0
+
+    # 생략한 통신 설정은 같은 속도로 튜닝한 프로파일 값, 없으면 기본값 사용
+    profile = load_profile(args.port, args.profile)
+    baudrate = args.baudrate or (profile.baudrate if profile else 19200)
+    if profile is not None and profile.baudrate != baudrate:
+        profile = None
+    timeout = args.timeout if args.timeout is not None else (profile.timeout if profile else 0.2)
+    gap = args.gap if args.gap is not None else (profile.inter_frame_gap if profile else 0.002)
+
+    logger = DataLogger(filename=args.output, interval=interval,
+                        port=args.port, baudrate=baudrate,
+                        sensor_ids=parse_sensor_ids(args.ids) or None,
+                        config_path=args.config, timeout=timeout,
+                        inter_frame_gap=gap, verbose=not args.quiet)
+
+    # 서비스 관리자(systemd 등)의 종료 요청도 Ctrl+C와 같이 처리
+    def handle_stop(signum, frame):
+        logger.stop()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    try:
+        logger.start_logging()
+    except (OSError, ValueError) as e:
+        print(f"로깅 시작 실패: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_tune(args: argparse.Namespace) -> int:
+    """
+    tune 서브커맨드를 실행합니다. 센서 한 개에 A00 질의를 반복하여 측정합니다.
+
+    Args:
+        args: 파싱된 명령줄 인자
+
+    Returns:
+        int: 종료 코드 (응답하는 속도가 없으면 1)
+    """
+    try:
+        config = load_sensor_config_json(args.config)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"설정 파일 오류: {e}", file=sys.stderr)
+        return 1
+    sensor_ids = parse_sensor_ids(args.ids) or config.sensor_ids()
+    if not sensor_ids:
+        print("센서 ID가 없습니다", file=sys.stderr)
+        return 2
+    sensor_id = sensor_ids[0]
+
+    stopped = False
+
+    def handle_stop(signum, frame):
+        nonlocal stopped
+        stopped = True
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    try:
+        with BusScheduler(args.port, 19200, [sensor_id], config,
+                          timeout=args.probe_timeout, inter_frame_gap=0.0) as bus:
+            def exchange(timeout: float) -> bool:
+                bus.timeout = timeout
+                return bus.poll(sensor_id).data is not None
+
+            def set_baudrate(baudrate: int) -> None:
+                bus.serial.baudrate = baudrate
+                bus.serial.reset_input_buffer()
+
+            tuner = LinkTuner(exchange, set_baudrate, probes=args.probes,
+                              probe_timeout=args.probe_timeout)
+            profile = tuner.tune(args.port, lambda: stopped, print)
+    except OSError as e:
+        print(f"포트 열기 실패: {e}", file=sys.stderr)
+        return 1
+
+    if profile is None:
+        print("모든 질의에 응답하는 통신 속도를 찾지 못했습니다", file=sys.stderr)
+        return 1
+    save_profile(profile, args.profile)
+    print(f"{args.port}: {profile.baudrate} bps, 타임아웃 {profile.timeout * 1000:.0f}ms, "
+          f"프레임 간격 {profile.inter_frame_gap * 1000:.0f}ms -> {args.profile}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    명령줄 진입점입니다.
+
+    Args:
+        argv: 명령줄 인자 (None이면 sys.argv)
+
+    Returns:
+        int: 종료 코드
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == "log":
+        return run_log(args)
+    if args.command == "tune":
+        return run_tune(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,14 +2,15 @@
 센서 데이터 실시간 그래프 GUI
 PyQt6와 matplotlib 조합
 """
+import os
 import sys
 import threading
-import time
-from collections import deque
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+import numpy as np
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 import matplotlib.font_manager as fm
 from matplotlib.animation import FuncAnimation
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
@@ -47,41 +48,63 @@ from PyQt5.QtWidgets import (
     QGridLayout, QMessageBox, QCheckBox
 )
 
-from serial_comm import SerialCommunicator
-from sensor_data import SensorData
+from bus_scheduler import BusScheduler, PollResult
+from link_tuning import load_profile
+from config import load_sensor_config_json, parse_sensor_ids
+from sensor_data import SENSOR_FIELDS, FrameStats, SensorData
+from timeseries_store import TimeSeriesStore
+
+
+def to_plot_dates(timestamps: np.ndarray) -> np.ndarray:
+    """POSIX 타임스탬프 배열을 matplotlib 날짜 값(로컬 시간)으로 변환"""
+    if len(timestamps) == 0:
+        return timestamps
+    last = float(timestamps[-1])
+    offset = mdates.date2num(datetime.fromtimestamp(last)) - last / 86400.0
+    return timestamps / 86400.0 + offset
 
 
 class SensorDataCollector(QObject):
-    """센서 데이터 수집을 담당하는 워커 클래스"""
-    data_received = pyqtSignal(SensorData)
+    """센서 데이터 수집을 담당하는 워커 클래스 (공유 버스 라운드로빈)"""
+    data_received = pyqtSignal(str, float, SensorData)  # sensor_id, timestamp, data
+    poll_failed = pyqtSignal(str, str)  # sensor_id, error message
+    stats_updated = pyqtSignal(str)  # 프레임 통계 요약
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, port: str, baudrate: int, interval: float):
+    def __init__(self, port: str, baudrate: int, interval: float, sensor_ids: List[str]):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
         self.interval = interval
+        self.sensor_ids = sensor_ids
         self.running = False
-        self.serial_comm = None
+        self.stats = FrameStats()
     
     def start_collection(self):
         """데이터 수집 시작"""
         self.running = True
         try:
-            self.serial_comm = SerialCommunicator(self.port, self.baudrate)
-            
-            while self.running:
-                try:
-                    data = self.serial_comm.collect_sensor_data_once()
-                    self.data_received.emit(data)
-                except Exception as e:
-                    self.error_occurred.emit(f"데이터 수집 오류: {str(e)}")
-                
-                time.sleep(self.interval)
+            config = load_sensor_config_json()
+            # headless tune으로 저장한 프로파일이 같은 속도면 측정된 타임아웃/간격 사용
+            link = {}
+            profile = load_profile(self.port)
+            if profile and profile.baudrate == self.baudrate:
+                link = {"timeout": profile.timeout, "inter_frame_gap": profile.inter_frame_gap}
+            with BusScheduler(self.port, self.baudrate, self.sensor_ids, config,
+                              stats=self.stats, **link) as bus:
+                bus.run(self.handle_result, lambda: self.running, self.interval)
                 
         except Exception as e:
             self.error_occurred.emit(f"시리얼 연결 오류: {str(e)}")
     
+    def handle_result(self, result: PollResult):
+        """센서별 질의 결과를 시그널로 전달"""
+        if result.data is not None:
+            self.data_received.emit(result.sensor_id, result.timestamp, result.data)
+        else:
+            self.poll_failed.emit(result.sensor_id, f"데이터 수집 오류: {result.error}")
+        self.stats_updated.emit(self.stats.summary())
+    
     def stop_collection(self):
         """데이터 수집 중지"""
         self.running = False
@@ -90,18 +113,18 @@ class SensorDataCollector(QObject):
 class RealTimePlotWidget(QWidget):
     """matplotlib을 사용한 실시간 플롯 위젯"""
     
-    def __init__(self, title: str, unit: str, max_points: int = 100, y_min: float = None, y_max: float = None):
+    def __init__(self, title: str, unit: str, store: TimeSeriesStore, channel: str,
+                 max_points: int = 1000, y_min: float = None, y_max: float = None):
         super().__init__()
         self.title = title
         self.unit = unit
-        self.max_points = max_points
+        self.max_points = max_points  # 화면에 그리는 최대 점 수 (저장 개수와 무관)
         self.y_min = y_min
         self.y_max = y_max
-        self.start_time = None  # 시작 시간 기록
         
-        # 데이터 저장용 deque
-        self.times = deque(maxlen=max_points)
-        self.values = deque(maxlen=max_points)
+        # 세션 공용 버퍼 중 이 위젯이 표시할 채널 (데이터는 버퍼에 한 번만 저장됨)
+        self.store = store
+        self.channel = channel
         
         # matplotlib 설정 (그래프 크기 증가)
         self.figure = Figure(figsize=(8, 4))
@@ -131,28 +154,23 @@ class RealTimePlotWidget(QWidget):
         self.ax.relim()
         self.ax.autoscale_view()
     
-    def update_data(self, value: float):
-        """새로운 데이터 포인트 추가"""
-        current_time = datetime.now()
-        
-        # 첫 번째 데이터 포인트일 때 시작 시간 설정
-        if self.start_time is None:
-            self.start_time = current_time
-            
-        self.times.append(current_time)
-        self.values.append(value)
-        
-        # 플롯 업데이트
-        if len(self.times) >= 1:
-            self.line.set_data(list(self.times), list(self.values))
+    def refresh(self):
+        """공용 버퍼의 현재 내용으로 플롯 갱신"""
+        time_range = self.store.time_range()
+        
+        # 플롯 업데이트 (전체 이력을 max_points 이내로 다운샘플링)
+        if time_range is not None:
+            times, values = self.get_display_series()
+            self.line.set_data(to_plot_dates(times), values)
             
             # X축 시간 포맷 설정 (HH:MM:SS) - 자동 눈금 조정
-            import matplotlib.dates as mdates
             self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
             
-            # X축 범위를 시작 시간부터 현재까지로 설정 (계속 확장)
-            end_time = current_time
-            start_display = self.start_time
+            # X축 범위를 첫 샘플부터 마지막 샘플까지로 설정 (계속 확장)
+            start_display = datetime.fromtimestamp(time_range[0])
+            end_time = datetime.fromtimestamp(time_range[1])
+            if end_time == start_display:
+                end_time = start_display + timedelta(seconds=1)
             
             self.ax.set_xlim(start_display, end_time)
             
@@ -162,19 +180,23 @@ class RealTimePlotWidget(QWidget):
                 self.ax.set_ylim(self.y_min, self.y_max)
             else:
                 # 자동 스케일링
-                if len(self.values) > 0:
-                    min_val = min(self.values)
-                    max_val = max(self.values)
+                if len(values) > 0:
+                    min_val = float(values.min())
+                    max_val = float(values.max())
                     margin = (max_val - min_val) * 0.1 if max_val != min_val else 1
                     self.ax.set_ylim(min_val - margin, max_val + margin)
             
             # X축 라벨 회전
             plt.setp(self.ax.xaxis.get_majorticklabels(), rotation=45)
-            self.canvas.draw()
+        else:
+            self.line.set_data([], [])
+            self.ax.relim()
+            self.ax.autoscale_view()
+        self.canvas.draw()
     
-    def reset_start_time(self):
-        """시작 시간 리셋"""
-        self.start_time = None
+    def get_display_series(self, max_points: Optional[int] = None):
+        """표시용 (타임스탬프, 값) 배열 반환 - min/max 포락선으로 극값 보존"""
+        return self.store.get_series(self.channel, max_points=max_points or self.max_points)
 
 
 class SensorGraphGUI(QMainWindow):
@@ -190,6 +212,12 @@ class SensorGraphGUI(QMainWindow):
         self.data_collector = None
         self.is_collecting = False
         
+        # 센서별 세션 버퍼 (타임스탬프 1열 + 센서 6열)
+        # self.session은 현재 그래프에 표시 중인 센서의 버퍼 (모든 그래프가 공유)
+        self.sessions: Dict[str, TimeSeriesStore] = {}
+        self.session = TimeSeriesStore(SENSOR_FIELDS)
+        self.display_sensor_id = None
+        
         # 그래프 위젯들 초기화
         self.plot_widgets: Dict[str, RealTimePlotWidget] = {}
         
@@ -317,6 +345,10 @@ class SensorGraphGUI(QMainWindow):
         rx_stx_label.setStyleSheet(label_style)
         config_layout.addWidget(rx_stx_label, 0, 5)
         
+        display_label = QLabel("표시 센서")
+        display_label.setStyleSheet(label_style)
+        config_layout.addWidget(display_label, 0, 6)
+        
         # 입력 필드 스타일 설정
         input_style = """
             QComboBox, QLineEdit, QSpinBox {
@@ -347,7 +379,8 @@ class SensorGraphGUI(QMainWindow):
         config_layout.addWidget(self.baudrate_combo, 1, 1)
         
         self.interval_input = QSpinBox()
-        self.interval_input.setRange(1, 60)
+        self.interval_input.setRange(0, 60)
+        self.interval_input.setSpecialValueText("최대")  # 0: 대기 없이 연속 폴링
         self.interval_input.setValue(2)
         self.interval_input.setFixedWidth(70)
         self.interval_input.setStyleSheet(input_style)
@@ -359,7 +392,8 @@ class SensorGraphGUI(QMainWindow):
         config_layout.addWidget(self.model_input, 1, 3)
         
         self.id_input = QLineEdit(sensor_config['id'])
-        self.id_input.setFixedWidth(80)
+        self.id_input.setPlaceholderText("쉼표로 여러 ID 입력")
+        self.id_input.setFixedWidth(160)
         self.id_input.setStyleSheet(input_style)
         config_layout.addWidget(self.id_input, 1, 4)
         
@@ -368,13 +402,19 @@ class SensorGraphGUI(QMainWindow):
         self.receive_stx_input.setStyleSheet(input_style)
         config_layout.addWidget(self.receive_stx_input, 1, 5)
         
+        self.display_combo = QComboBox()
+        self.display_combo.setFixedWidth(100)
+        self.display_combo.setStyleSheet(input_style)
+        self.display_combo.currentTextChanged.connect(self.set_display_sensor)
+        config_layout.addWidget(self.display_combo, 1, 6)
+        
         # 숨겨진 나머지 설정값들 (업데이트용)
         self.send_stx_input = QLineEdit(sensor_config['send_stx'])
         self.send_etx_input = QLineEdit(sensor_config['send_etx'])
         self.receive_etx_input = QLineEdit(sensor_config['receive_etx'])
         self.max_points_input = QSpinBox()
-        self.max_points_input.setRange(50, 1000)
-        self.max_points_input.setValue(100)
+        self.max_points_input.setRange(50, 5000)
+        self.max_points_input.setValue(1000)
         
         config_group.setLayout(config_layout)
         config_group.setMaximumHeight(100)
@@ -471,7 +511,7 @@ class SensorGraphGUI(QMainWindow):
         max_points = self.max_points_input.value()
         
         for sensor_key, title, unit, row, col, y_min, y_max in sensors:
-            plot_widget = RealTimePlotWidget(title, unit, max_points, y_min, y_max)
+            plot_widget = RealTimePlotWidget(title, unit, self.session, sensor_key, max_points, y_min, y_max)
             self.plot_widgets[sensor_key] = plot_widget
             graph_layout.addWidget(plot_widget, row, col)
         
@@ -599,7 +639,9 @@ class SensorGraphGUI(QMainWindow):
         
         parent_layout.addLayout(button_layout)
         
-        # 상태바
+        # 상태바 (오른쪽에 프레임 통계 고정 표시)
+        self.stats_label = QLabel(FrameStats().summary())
+        self.statusBar().addPermanentWidget(self.stats_label)
         self.statusBar().showMessage("준비됨")
     
     def start_monitoring(self):
@@ -611,15 +653,25 @@ class SensorGraphGUI(QMainWindow):
             port = self.port_combo.currentText().strip()
             baudrate = int(self.baudrate_combo.currentText())
             interval = self.interval_input.value()
+            sensor_ids = parse_sensor_ids(self.id_input.text())
             
             if not port:
                 QMessageBox.warning(self, "오류", "시리얼 포트를 선택하세요.")
                 return
             
+            if not sensor_ids:
+                QMessageBox.warning(self, "오류", "센서 ID를 입력하세요.")
+                return
+            
+            # 센서별 버퍼 준비 및 표시 센서 목록 갱신
+            self.prepare_sessions(sensor_ids)
+            
             # 데이터 수집기 생성
-            self.data_collector = SensorDataCollector(port, baudrate, interval)
+            self.data_collector = SensorDataCollector(port, baudrate, interval, sensor_ids)
             self.data_collector.data_received.connect(self.on_data_received)
+            self.data_collector.poll_failed.connect(self.on_poll_failed)
             self.data_collector.error_occurred.connect(self.on_error)
+            self.data_collector.stats_updated.connect(self.stats_label.setText)
             
             # 별도 스레드에서 데이터 수집 시작
             self.collector_thread = QThread()
@@ -630,7 +682,7 @@ class SensorGraphGUI(QMainWindow):
             self.is_collecting = True
             self.start_button.setEnabled(False)
             self.stop_button.setEnabled(True)
-            self.statusBar().showMessage(f"모니터링 중... ({port}, {baudrate} bps)")
+            self.statusBar().showMessage(f"모니터링 중... ({port}, {baudrate} bps, 센서 {len(sensor_ids)}개)")
             
         except Exception as e:
             QMessageBox.critical(self, "오류", f"모니터링 시작 실패: {str(e)}")
@@ -652,31 +704,65 @@ class SensorGraphGUI(QMainWindow):
         self.stop_button.setEnabled(False)
         self.statusBar().showMessage("중지됨")
     
-    def on_data_received(self, data: SensorData):
+    def prepare_sessions(self, sensor_ids: List[str]):
+        """센서별 세션 버퍼를 만들고 표시 센서 콤보박스를 갱신"""
+        for sensor_id in sensor_ids:
+            if sensor_id not in self.sessions:
+                self.sessions[sensor_id] = TimeSeriesStore(SENSOR_FIELDS)
+        
+        current = self.display_sensor_id if self.display_sensor_id in sensor_ids else sensor_ids[0]
+        self.display_combo.blockSignals(True)
+        self.display_combo.clear()
+        self.display_combo.addItems(sensor_ids)
+        self.display_combo.setCurrentText(current)
+        self.display_combo.blockSignals(False)
+        self.set_display_sensor(current)
+    
+    def set_display_sensor(self, sensor_id: str):
+        """그래프에 표시할 센서 변경"""
+        if sensor_id not in self.sessions:
+            return
+        self.display_sensor_id = sensor_id
+        self.session = self.sessions[sensor_id]
+        for plot_widget in self.plot_widgets.values():
+            plot_widget.store = self.session
+            plot_widget.refresh()
+    
+    def on_data_received(self, sensor_id: str, timestamp: float, data: SensorData):
         """새로운 센서 데이터 수신 처리"""
-        # 각 그래프에 데이터 추가
-        self.plot_widgets["length"].update_data(float(data.length))
-        self.plot_widgets["angle_x"].update_data(float(data.angle_x))
-        self.plot_widgets["angle_y"].update_data(float(data.angle_y))
-        self.plot_widgets["temperature"].update_data(float(data.temperature))
-        self.plot_widgets["voltage"].update_data(float(data.voltage))
-        self.plot_widgets["current"].update_data(float(data.current))
+        # 샘플을 해당 센서 버퍼에 한 번만 저장 (모든 채널이 같은 타임스탬프 공유)
+        session = self.sessions.get(sensor_id)
+        if session is None:
+            return
+        session.append(timestamp, data.as_tuple())
+        
+        # 표시 중인 센서가 아니면 그래프 갱신 생략
+        if sensor_id != self.display_sensor_id:
+            return
+        
+        # 각 그래프 갱신
+        for plot_widget in self.plot_widgets.values():
+            plot_widget.refresh()
         
         # 상태바 업데이트
         # 한글 폰트 지원 여부에 따라 상태바 메시지 설정
         use_korean = korean_fonts and plt.rcParams['font.family'] in korean_fonts
         if use_korean:
             status_msg = (
-                f"최근 데이터 - 길이: {data.length}mm, 온도: {data.temperature}°C, "
+                f"[{sensor_id}] 최근 데이터 - 길이: {data.length}mm, 온도: {data.temperature}°C, "
                 f"전압: {data.voltage}V - {datetime.now().strftime('%H:%M:%S')}"
             )
         else:
             status_msg = (
-                f"Latest - Length: {data.length}mm, Temp: {data.temperature}°C, "
+                f"[{sensor_id}] Latest - Length: {data.length}mm, Temp: {data.temperature}°C, "
                 f"Voltage: {data.voltage}V - {datetime.now().strftime('%H:%M:%S')}"
             )
         self.statusBar().showMessage(status_msg)
     
+    def on_poll_failed(self, sensor_id: str, error_msg: str):
+        """센서 한 개의 질의 실패 처리 (버스 폴링은 계속)"""
+        self.statusBar().showMessage(f"[{sensor_id}] {error_msg}")
+    
     def on_error(self, error_msg: str):
         """오류 발생 처리"""
         QMessageBox.warning(self, "오류", error_msg)
@@ -684,14 +770,11 @@ class SensorGraphGUI(QMainWindow):
     
     def clear_graphs(self):
         """모든 그래프 초기화"""
+        for session in self.sessions.values():
+            session.clear()
+        self.session.clear()
         for plot_widget in self.plot_widgets.values():
-            plot_widget.times.clear()
-            plot_widget.values.clear()
-            plot_widget.reset_start_time()  # 시작 시간 리셋
-            plot_widget.line.set_data([], [])
-            plot_widget.ax.relim()
-            plot_widget.ax.autoscale_view()
-            plot_widget.canvas.draw()
+            plot_widget.refresh()
         
         self.statusBar().showMessage("그래프 초기화됨")
     
@@ -699,7 +782,6 @@ class SensorGraphGUI(QMainWindow):
         """현재 그래프 데이터를 CSV 파일로 저장"""
         try:
             from PyQt5.QtWidgets import QFileDialog
-            import csv
             from datetime import datetime
             
             # 파일 경로 선택
@@ -712,40 +794,19 @@ class SensorGraphGUI(QMainWindow):
             if not file_path:
                 return
             
-            # CSV 파일 작성
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # 헤더 작성
-                headers = ['timestamp']
-                for sensor_name in ['length', 'angle_x', 'angle_y', 'temperature', 'voltage', 'current']:
-                    headers.append(sensor_name)
-                writer.writerow(headers)
-                
-                # 데이터 개수 확인 (가장 긴 데이터 기준)
-                max_length = max(len(widget.times) for widget in self.plot_widgets.values()) if self.plot_widgets else 0
-                
-                # 데이터 행 작성
-                for i in range(max_length):
-                    row = []
-                    
-                    # 시간 추가 (첫 번째 위젯의 시간 사용)
-                    first_widget = list(self.plot_widgets.values())[0] if self.plot_widgets else None
-                    if first_widget and i < len(first_widget.times):
-                        row.append(first_widget.times[i].strftime('%Y-%m-%d %H:%M:%S'))
-                    else:
-                        row.append('')
-                    
-                    # 각 센서 데이터 추가
-                    for sensor_name in ['length', 'angle_x', 'angle_y', 'temperature', 'voltage', 'current']:
-                        if sensor_name in self.plot_widgets and i < len(self.plot_widgets[sensor_name].values):
-                            row.append(self.plot_widgets[sensor_name].values[i])
-                        else:
-                            row.append('')
-                    
-                    writer.writerow(row)
+            # 센서 버퍼 전체 이력을 청크 단위로 일괄 기록 (센서가 여럿이면 센서별 파일)
+            if len(self.sessions) <= 1:
+                targets = [(self.session, file_path)]
+            else:
+                base, ext = os.path.splitext(file_path)
+                targets = [(session, f"{base}_{sensor_id}{ext or '.csv'}")
+                           for sensor_id, session in self.sessions.items()]
+            for session, path in targets:
+                session.export_csv(path)
             
-            QMessageBox.information(self, "성공", f"데이터가 저장되었습니다:\n{file_path}")
+            # 실제로 기록한 파일 목록 표시
+            files = "\n".join(path for _, path in targets)
+            QMessageBox.information(self, "성공", f"데이터가 저장되었습니다:\n{files}")
             
         except Exception as e:
             QMessageBox.critical(self, "오류", f"데이터 저장 실패: {str(e)}")
@@ -798,14 +859,14 @@ class SensorGraphGUI(QMainWindow):
                 ax = axes[row, col]
                 if sensor_key in self.plot_widgets:
                     widget = self.plot_widgets[sensor_key]
-                    if len(widget.times) > 0 and len(widget.values) > 0:
-                        ax.plot(widget.times, widget.values, 'bo-', linewidth=2, markersize=4)
+                    if len(self.session) > 0:
+                        times, values = widget.get_display_series(max_points=4000)
+                        ax.plot(to_plot_dates(times), values, 'bo-', linewidth=2, markersize=4)
                         ax.set_title(title)
                         ax.set_ylabel(f'{title} ({unit})')
                         ax.grid(True, alpha=0.3)
                         
                         # X축 시간 포맷
-                        import matplotlib.dates as mdates
                         ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
                         
                         # Y축 범위 설정
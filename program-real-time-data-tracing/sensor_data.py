@@ -2,9 +2,9 @@
 센서 데이터 처리 모듈
 """
 from dataclasses import dataclass
-from typing import Optional
-from config import SensorConfig, load_sensor_config_json
-from utils import *
+from typing import List, Optional, Tuple
+from config import SensorConfig
+from frame_schema import FieldError, FieldSpec, FrameDecoder, FrameSchema
 
 @dataclass
 class SensorData:
@@ -16,6 +16,49 @@ class SensorData:
     voltage: float
     current: float
 
+    def as_tuple(self) -> tuple:
+        """SENSOR_FIELDS 순서의 값 튜플을 반환합니다."""
+        return (self.length, self.angle_x, self.angle_y,
+                self.temperature, self.voltage, self.current)
+
+# 저장/표시에 사용하는 센서 채널 순서
+SENSOR_FIELDS = ('length', 'angle_x', 'angle_y', 'temperature', 'voltage', 'current')
+
+# A 응답 데이터 영역: 태그(1) + 값(5) x 6, 각도/온도는 32767 기준 반전
+SENSOR_FRAME_SCHEMA = FrameSchema('A', (
+    FieldSpec('length', 5, tag='3', divisor=100.0),
+    FieldSpec('angle_x', 5, tag='2', offset=32767, divisor=100.0),
+    FieldSpec('angle_y', 5, tag='2', offset=32767, divisor=100.0),
+    FieldSpec('temperature', 5, tag='1', offset=32767, divisor=100.0),
+    FieldSpec('voltage', 5, tag='B', divisor=100.0),
+    FieldSpec('current', 5, tag='C', divisor=10.0),
+), exact_length=36)
+
+SENSOR_FRAME_DECODER = FrameDecoder(SENSOR_FRAME_SCHEMA)
+
+class FrameError(ValueError):
+    """응답 프레임이 유효하지 않을 때 발생하는 예외"""
+
+class ChecksumError(FrameError):
+    """응답 프레임의 체크섬이 일치하지 않을 때 발생하는 예외"""
+
+@dataclass
+class FrameStats:
+    """세션별 프레임 수신 통계"""
+    good: int = 0
+    bad: int = 0
+    timeouts: int = 0
+    resync: int = 0
+
+    def summary(self) -> str:
+        """상태바/로그 표시용 요약 문자열을 반환합니다."""
+        return (f"정상 {self.good} / 불량 {self.bad} / "
+                f"타임아웃 {self.timeouts} / 재동기 {self.resync}")
+
+    def reset(self) -> None:
+        """모든 카운터를 0으로 초기화합니다."""
+        self.good = self.bad = self.timeouts = self.resync = 0
+
 def calculate_checksum(data: str) -> int:
     """
     문자열 데이터의 8비트 2의 보수 체크섬을 계산합니다.
@@ -30,73 +73,136 @@ def calculate_checksum(data: str) -> int:
     checksum = ((~sum_bytes) + 1) & 0xFF
     return checksum
 
-def confirm_checksum( response: str ):
-
-    config = load_sensor_config_json()
-    n_chksum = 2+len(config.receive_etx)
-    #print("n_chksum = ", n_chksum)
-    #print("response =", response)
-    i = response.find(config.receive_stx)
-    #sss="aaa"
-    #print("i = ", i)
-    #print("i =", config.receive_stx)
-    #print("sss=",sss)
-    stemp = response[i:-n_chksum]
-    #print("stemp  =", stemp )
-    chk = calculate_checksum( stemp )
-    chk_hex = f"{chk:02X}"
-    #print("r= ",response[-n_chksum:-len(config.receive_etx)])
-    if chk_hex == response[-n_chksum:-len(config.receive_etx)]:
-        return True
-    else :
-        #print("chk = ", chk_hex )
+def confirm_checksum(frame: str, config: SensorConfig) -> bool:
+    """
+    STX로 시작하고 ETX로 끝나는 프레임의 체크섬을 확인합니다.
+    
+    Args:
+        frame: STX ~ ETX 프레임 문자열
+        config: 센서 설정 객체
+        
+    Returns:
+        bool: 체크섬 일치 여부
+    """
+    n_chksum = 2 + len(config.receive_etx)
+    if len(frame) < len(config.receive_stx) + n_chksum:
         return False
+    chk = calculate_checksum(frame[:-n_chksum])
+    return f"{chk:02X}" == frame[-n_chksum:-len(config.receive_etx)]
 
 
-def parse_sensor_string(response: str, config: SensorConfig) -> SensorData:
+def find_valid_frame(response: str, config: SensorConfig) -> Tuple[str, bool]:
     """
-    센서 응답 문자열을 파싱하여 센서 데이터를 추출합니다.
+    응답 문자열에서 체크섬과 ID가 맞는 첫 프레임을 찾습니다.
+    
+    앞쪽 잡음이나 손상된 프레임은 건너뛰고 다음 STX에서 다시 동기화합니다.
     
     Args:
-        response: 센서로부터 받은 응답 문자열
+        response: 수신된 응답 문자열
         config: 센서 설정 객체
         
     Returns:
-        SensorData: 파싱된 센서 데이터
+        tuple: (프레임 문자열, 재동기화 여부)
         
     Raises:
-        ValueError: 응답 형식이 잘못된 경우
+        ChecksumError: 완전한 프레임은 있으나 모두 체크섬이 틀린 경우
+        FrameError: 완전한 프레임이 없거나 ID가 다른 경우
     """
-
-    if ( not confirm_checksum( response ) ):
-        print("Checksum is WRONG")
-        exit(1)
+    prefix = config.receive_stx + config.model + config.id
+    start = response.find(config.receive_stx)
+    skipped = start > 0
+    checksum_failed = False
+    
+    while start >= 0:
+        end = response.find(config.receive_etx, start + len(config.receive_stx))
+        if end < 0:
+            break
+        frame = response[start:end + len(config.receive_etx)]
+        if not confirm_checksum(frame, config):
+            checksum_failed = True
+        elif frame.startswith(prefix):
+            return frame, skipped
+        skipped = True
+        start = response.find(config.receive_stx, start + 1)
+    
+    if checksum_failed:
+        raise ChecksumError(f"체크섬 불일치: {response!r}")
+    raise FrameError(f"유효한 프레임 없음: {response!r}")
 
 
+def decode_sensor_frame(frame: str, config: SensorConfig) -> SensorData:
+    """
+    검증된 A 응답 프레임의 데이터 영역을 센서 데이터로 변환합니다.
+    
+    Args:
+        frame: find_valid_frame으로 찾은 프레임
+        config: 센서 설정 객체
+        
+    Returns:
+        SensorData: 파싱된 센서 데이터
+        
+    Raises:
+        FrameError: 길이나 필드 형식이 잘못된 경우
+    """
     pre_length = len(config.receive_stx)+len(config.model)+len(config.id)+1  # 마지막 1은 CMD이다.
-
-    length = int(response[pre_length:pre_length+2])
-    #print("data length = ", length)
+    
+    try:
+        length = int(frame[pre_length:pre_length+2])
+    except ValueError:
+        raise FrameError(f"데이터 길이 오류: {frame!r}")
     data_1 = pre_length + 2
     data_2 = data_1 + length
+    
+    data_str = frame[data_1:data_2]
+    
+    try:
+        values = SENSOR_FRAME_DECODER.decode(data_str, strict=True)
+    except FieldError as e:
+        raise FrameError(f"데이터 형식 오류: {data_str!r} ({e})")
+    
+    return SensorData(**values)
 
-    #print("data string = ", response[data_1:data_2])
-    data_str = response[data_1:data_2]
-
-    return_tuple = parse_by_lengths( data_str, "151515151515" )
-
-    Iref = 32767
 
-    data = SensorData(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+def decode_sensor_payloads(data_strings: List[str]) -> List[Optional[SensorData]]:
+    """
+    여러 A 응답 데이터 영역을 한 번에 센서 데이터로 변환합니다.
+    
+    Args:
+        data_strings: 프레임에서 잘라낸 데이터 영역 문자열 목록
+        
+    Returns:
+        list: 입력 순서대로의 SensorData (형식이 잘못된 항목은 None)
+    """
+    return [SensorData(**values) if len(values) == len(SENSOR_FIELDS) else None
+            for values in SENSOR_FRAME_DECODER.decode_many(data_strings)]
 
-    data.length      = float(return_tuple[1])*0.01
-    data.angle_x     = float(Iref - int(return_tuple[3]))*0.01
-    data.angle_y     = float(Iref - int(return_tuple[5]))*0.01
-    data.temperature = float(Iref-int(return_tuple[7]))*0.01
-    data.voltage     = float(return_tuple[9])*0.01
-    data.current     = float(return_tuple[11])*0.1
 
+def parse_sensor_string(response: str, config: SensorConfig,
+                        stats: Optional[FrameStats] = None) -> SensorData:
+    """
+    센서 응답 문자열을 파싱하여 센서 데이터를 추출합니다.
+    
+    Args:
+        response: 센서로부터 받은 응답 문자열
+        config: 센서 설정 객체
+        stats: 갱신할 프레임 통계 (선택적)
+        
+    Returns:
+        SensorData: 파싱된 센서 데이터
+        
+    Raises:
+        FrameError: 응답 형식이 잘못되었거나 체크섬이 틀린 경우 (ValueError 하위 클래스)
+    """
+    try:
+        frame, resynced = find_valid_frame(response, config)
+        data = decode_sensor_frame(frame, config)
+    except FrameError:
+        if stats is not None:
+            stats.bad += 1
+        raise
+    
+    if stats is not None:
+        stats.good += 1
+        if resynced:
+            stats.resync += 1
     return data
-
-
-
@@ -8,6 +8,49 @@ from typing import Optional
 from config import SensorConfig, load_sensor_config_json
 from sensor_data import SensorData, calculate_checksum, parse_sensor_string
 
+
+def build_query(config: SensorConfig, cmd: str = "A00") -> bytes:
+    """
+    센서 질의 패킷을 생성합니다.
+
+    Args:
+        config: 센서 설정 객체 (ID는 단일 센서 ID)
+        cmd: CMD + LENGTH (+ 데이터) 문자열 (기본값: A00)
+
+    Returns:
+        bytes: STX + MODEL + ID + CMD + CHECKSUM + ETX 패킷
+    """
+    query = config.send_stx + config.model + config.id + cmd
+    checksum = calculate_checksum(query)
+    return (query + f"{checksum:02X}" + config.send_etx).encode('ascii')
+
+
+def read_frame(ser: serial.Serial, receive_etx: str, timeout: float) -> str:
+    """
+    수신 ETX가 나올 때까지 응답 프레임을 읽습니다.
+
+    Args:
+        ser: 열린 시리얼 포트 (짧은 read 타임아웃 권장)
+        receive_etx: 수신 ETX 문자열
+        timeout: 프레임 전체 대기 시간 (초)
+
+    Returns:
+        str: 수신된 문자열 (ETX 이후 같이 들어온 바이트 포함, 타임아웃 시 그때까지 받은 데이터)
+    """
+    etx = receive_etx.encode('ascii')
+    buffer = bytearray()
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        chunk = ser.read(ser.in_waiting or 1)
+        if chunk:
+            buffer += chunk
+            if etx in buffer:
+                break
+
+    return buffer.decode('ascii', errors='ignore')
+
+
 class SerialCommunicator:
     """시리얼 통신 클래스"""
     
@@ -35,59 +78,18 @@ class SerialCommunicator:
             serial.SerialException: 시리얼 통신 오류
             ValueError: 데이터 파싱 오류
         """
-        # 설정 파일 로드
+        # 설정 파일 로드 (ID가 여러 개면 첫 번째 센서)
         config = load_sensor_config_json()
+        config = config.for_sensor(config.sensor_ids()[0])
         
         # 시리얼 포트 연결
         with serial.Serial(self.port, self.baudrate, timeout=self.timeout) as ser:
-            # 쿼리 생성
+            # 쿼리 생성 및 전송
             # CMD=A이고 이 후 문자열이 없으므로 길이가 00 이다.
-            cmd = "A00"
-            query = config.send_stx + config.model + config.id + cmd
-            
-            # 체크섬 계산 및 추가
-            checksum = calculate_checksum(query)
-            query += f"{checksum:02X}" + config.send_etx
-            
-            #print(f"query = {query}")
-            
-            # 데이터 전송
-            ser.write(query.encode('ascii'))
-            
-            # 응답 수신 (완전한 응답을 받을 때까지 반복)
-            read_data = ""
-            response_complete = False
-            max_attempts = 50  # 최대 시도 횟수 제한
-            attempts = 0
+            ser.write(build_query(config, "A00"))
             
-            while not response_complete and attempts < max_attempts:
-                attempts += 1
-                
-                # 대기 중인 바이트 수 확인 후 읽기
-                bytes_to_read = ser.in_waiting
-                if bytes_to_read > 0:
-                    temp_data = ser.read(bytes_to_read).decode('ascii', errors='ignore')
-                else:
-                    # 대기 중인 데이터가 없으면 1바이트만 읽되 짧은 타임아웃 설정
-                    temp_data = ser.read(1).decode('ascii', errors='ignore')
-                
-                if temp_data:
-                    read_data += temp_data
-                    
-                    # ETX 문자가 포함되어 있는지 확인하여 응답 완료 여부 판단
-                    if config.receive_etx in read_data:
-                        response_complete = True
-                        
-                # 데이터가 없고 읽은 데이터도 없으면 종료
-                elif len(read_data) == 0:
-                    break
-                    
-                # 짧은 대기 (CPU 사용률 감소)
-                time.sleep(0.001)
-            
-
-
-
+            # 응답 수신 (완전한 응답을 받을 때까지)
+            read_data = read_frame(ser, config.receive_etx, self.timeout)
 
             bytes_read = len(read_data)
             if bytes_read <= 0:
@@ -0,0 +1,382 @@
+"""
+장기 시계열 저장소 모듈
+
+세션 전체의 센서 데이터를 NumPy 청크 단위로 보관하고,
+min/max 피라미드(LOD)로 다운샘플링하여 그래프에 고정 비용으로 표시합니다.
+"""
+import bisect
+import csv
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class _GrowableRows:
+    """용량을 두 배씩 늘려가며 행을 추가하는 2차원 배열"""
+
+    def __init__(self, width: int, capacity: int = 256):
+        self._data = np.empty((capacity, width), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, row: np.ndarray) -> None:
+        if self._size == len(self._data):
+            grown = np.empty((len(self._data) * 2, self._data.shape[1]), dtype=np.float64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = row
+        self._size += 1
+
+    def view(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    def clear(self) -> None:
+        self._size = 0
+
+
+class _PendingBucket:
+    """아직 완성되지 않은 LOD 버킷의 누적값"""
+
+    def __init__(self, n_channels: int):
+        self.count = 0
+        self.t_first = 0.0
+        self.t_last = 0.0
+        self.mins = np.empty(n_channels, dtype=np.float64)
+        self.maxs = np.empty(n_channels, dtype=np.float64)
+
+    def add(self, t_first: float, t_last: float, mins: np.ndarray, maxs: np.ndarray) -> None:
+        if self.count == 0:
+            self.t_first = t_first
+            self.mins[:] = mins
+            self.maxs[:] = maxs
+        else:
+            np.minimum(self.mins, mins, out=self.mins)
+            np.maximum(self.maxs, maxs, out=self.maxs)
+        self.t_last = t_last
+        self.count += 1
+
+
+class TimeSeriesStore:
+    """
+    청크 기반 다채널 시계열 저장소
+
+    행 형식은 [timestamp, ch0, ch1, ...] (float64, timestamp는 POSIX 초)이며,
+    가득 찬 청크는 메모리에 두거나 spill_path 파일로 내보내 memmap으로 읽습니다.
+    LOD 레벨 k(0부터)의 버킷은 lod_factor**(k+1) 개의 원본 샘플에 대한 min/max를 가집니다.
+    """
+
+    def __init__(self, channels: Sequence[str], chunk_size: int = 4096,
+                 lod_factor: int = 8, max_levels: int = 8,
+                 spill_path: Optional[str] = None):
+        """
+        시계열 저장소를 초기화합니다.
+
+        Args:
+            channels: 채널 이름 목록
+            chunk_size: 청크당 샘플 수
+            lod_factor: LOD 레벨 간 다운샘플링 비율
+            max_levels: 최대 LOD 레벨 수
+            spill_path: 가득 찬 청크를 기록할 파일 경로 (None이면 메모리 보관)
+        """
+        if chunk_size < 1 or lod_factor < 2:
+            raise ValueError("chunk_size는 1 이상, lod_factor는 2 이상이어야 합니다")
+
+        self.channels = list(channels)
+        self.chunk_size = chunk_size
+        self.lod_factor = lod_factor
+        self.max_levels = max_levels
+        self.spill_path = spill_path
+
+        self._width = 1 + len(self.channels)
+        self._full_chunks: List[np.ndarray] = []
+        self._chunk_first_times: List[float] = []
+        self._n_full_chunks = 0
+        self._tail = np.empty((chunk_size, self._width), dtype=np.float64)
+        self._tail_size = 0
+
+        self._spill_file = None
+        self._spill_map: Optional[np.ndarray] = None
+        if spill_path:
+            self._spill_file = open(spill_path, "w+b")
+
+        # 레벨 i의 행 형식: [t_first, t_last, mins..., maxs...]
+        self._levels: List[_GrowableRows] = []
+        self._pending: List[_PendingBucket] = []
+
+    def __len__(self) -> int:
+        return self._n_full_chunks * self.chunk_size + self._tail_size
+
+    def channel_index(self, channel: str) -> int:
+        """채널 이름에 해당하는 열 인덱스(타임스탬프 제외)를 반환합니다."""
+        return self.channels.index(channel)
+
+    def append(self, timestamp: float, values: Sequence[float]) -> None:
+        """
+        샘플 하나를 추가합니다.
+
+        Args:
+            timestamp: POSIX 타임스탬프 (초, 단조 증가)
+            values: 채널 순서대로의 값
+        """
+        row = self._tail[self._tail_size]
+        row[0] = timestamp
+        row[1:] = values
+        self._tail_size += 1
+
+        self._push_lod(0, timestamp, timestamp, row[1:], row[1:])
+
+        if self._tail_size == self.chunk_size:
+            self._flush_tail()
+
+    def _flush_tail(self) -> None:
+        """가득 찬 tail 청크를 확정합니다."""
+        self._chunk_first_times.append(float(self._tail[0, 0]))
+        if self._spill_file is not None:
+            self._spill_file.write(self._tail.tobytes())
+            self._spill_file.flush()
+            self._spill_map = None
+        else:
+            self._full_chunks.append(self._tail)
+            self._tail = np.empty((self.chunk_size, self._width), dtype=np.float64)
+        self._n_full_chunks += 1
+        self._tail_size = 0
+
+    def _push_lod(self, level: int, t_first: float, t_last: float,
+                  mins: np.ndarray, maxs: np.ndarray) -> None:
+        """레벨 level의 대기 버킷에 값을 누적하고, 가득 차면 상위 레벨로 올립니다."""
+        if level >= self.max_levels:
+            return
+        if level == len(self._pending):
+            self._pending.append(_PendingBucket(len(self.channels)))
+            self._levels.append(_GrowableRows(2 + 2 * len(self.channels)))
+
+        bucket = self._pending[level]
+        bucket.add(t_first, t_last, mins, maxs)
+        if bucket.count < self.lod_factor:
+            return
+
+        row = np.concatenate(([bucket.t_first, bucket.t_last], bucket.mins, bucket.maxs))
+        self._levels[level].append(row)
+        bucket.count = 0
+        n = len(self.channels)
+        self._push_lod(level + 1, row[0], row[1], row[2:2 + n], row[2 + n:])
+
+    def _chunk(self, index: int) -> np.ndarray:
+        """index번째 청크의 유효 행을 반환합니다 (마지막은 tail)."""
+        if index == self._n_full_chunks:
+            return self._tail[:self._tail_size]
+        if self._spill_file is None:
+            return self._full_chunks[index]
+        if self._spill_map is None:
+            self._spill_map = np.memmap(
+                self.spill_path, dtype=np.float64, mode="r",
+                shape=(self._n_full_chunks * self.chunk_size, self._width)
+            )
+        start = index * self.chunk_size
+        return self._spill_map[start:start + self.chunk_size]
+
+    def iter_chunks(self) -> Iterator[np.ndarray]:
+        """저장된 모든 행을 청크 단위로 순회합니다."""
+        for index in range(self._n_full_chunks + 1):
+            chunk = self._chunk(index)
+            if len(chunk):
+                yield chunk
+
+    def _search_raw(self, timestamp: float) -> int:
+        """timestamp 이상인 첫 원본 샘플의 전역 인덱스를 반환합니다."""
+        if self._tail_size and timestamp >= self._tail[0, 0]:
+            index = self._n_full_chunks
+        else:
+            index = bisect.bisect_right(self._chunk_first_times, timestamp) - 1
+        if index < 0:
+            return 0
+        chunk = self._chunk(index)
+        pos = int(np.searchsorted(chunk[:, 0], timestamp, side="left"))
+        return index * self.chunk_size + pos
+
+    def _raw_rows(self, start: int, stop: int) -> np.ndarray:
+        """전역 인덱스 [start, stop) 구간의 원본 행을 반환합니다."""
+        if start >= stop:
+            return np.empty((0, self._width), dtype=np.float64)
+        parts = []
+        first = start // self.chunk_size
+        last = (stop - 1) // self.chunk_size
+        for index in range(first, last + 1):
+            base = index * self.chunk_size
+            chunk = self._chunk(index)
+            parts.append(chunk[max(start - base, 0):min(stop - base, len(chunk))])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def time_range(self) -> Optional[Tuple[float, float]]:
+        """저장된 첫 샘플과 마지막 샘플의 타임스탬프를 반환합니다."""
+        if len(self) == 0:
+            return None
+        first = self._chunk(0)[0, 0] if self._n_full_chunks else self._tail[0, 0]
+        last = self._tail[self._tail_size - 1, 0] if self._tail_size else self._chunk(self._n_full_chunks - 1)[-1, 0]
+        return float(first), float(last)
+
+    def latest(self) -> Optional[np.ndarray]:
+        """마지막 샘플 행 [timestamp, ch0, ...]을 반환합니다."""
+        if len(self) == 0:
+            return None
+        if self._tail_size:
+            return self._tail[self._tail_size - 1]
+        return self._chunk(self._n_full_chunks - 1)[-1]
+
+    def get_series(self, channel: str, t_start: Optional[float] = None,
+                   t_end: Optional[float] = None,
+                   max_points: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        표시용 시계열을 반환합니다.
+
+        구간 내 원본 샘플이 max_points 이하이면 원본을, 그 외에는 버킷 수가
+        max_points/2 이하가 되는 가장 낮은 LOD 레벨의 min/max 포락선을 반환합니다.
+
+        Args:
+            channel: 채널 이름
+            t_start: 구간 시작 (None이면 처음부터)
+            t_end: 구간 끝 (None이면 끝까지)
+            max_points: 반환할 최대 점 수 (근사치)
+
+        Returns:
+            tuple: (timestamps, values) NumPy 배열
+        """
+        ci = self.channel_index(channel)
+        total = len(self)
+        start = self._search_raw(t_start) if t_start is not None else 0
+        stop = self._search_raw(t_end + 1e-9) if t_end is not None else total
+
+        if stop - start <= max_points:
+            rows = self._raw_rows(start, stop)
+            return rows[:, 0].copy(), rows[:, 1 + ci].copy()
+
+        n = len(self.channels)
+        for level in range(len(self._levels)):
+            buckets = self._levels[level].view()
+            lo = int(np.searchsorted(buckets[:, 1], t_start, side="left")) if t_start is not None else 0
+            hi = int(np.searchsorted(buckets[:, 0], t_end, side="right")) if t_end is not None else len(buckets)
+            if 2 * (hi - lo) > max_points and level + 1 < len(self._levels):
+                continue
+
+            selected = buckets[lo:hi]
+            times = np.empty(2 * len(selected))
+            values = np.empty(2 * len(selected))
+            times[0::2] = selected[:, 0]
+            times[1::2] = selected[:, 1]
+            values[0::2] = selected[:, 2 + ci]
+            values[1::2] = selected[:, 2 + n + ci]
+
+            # 아직 이 레벨의 버킷으로 묶이지 않은 최신 구간은 하위 레벨로 채움
+            if hi == len(buckets):
+                tail_t, tail_v = self._unbucketed_tail(level, ci, t_start, t_end)
+                times = np.concatenate((times, tail_t))
+                values = np.concatenate((values, tail_v))
+            return times, values
+
+        rows = self._raw_rows(start, stop)
+        return rows[:, 0].copy(), rows[:, 1 + ci].copy()
+
+    def _unbucketed_tail(self, level: int, ci: int, t_start: Optional[float],
+                         t_end: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """level 버킷에 아직 포함되지 않은 최신 샘플 중 구간 안의 것을 하위 레벨들에서 모읍니다."""
+        n = len(self.channels)
+        times_parts = []
+        values_parts = []
+        consumed = len(self._levels[level]) * self.lod_factor
+        for lower in range(level - 1, -1, -1):
+            rows = self._levels[lower].view()[consumed:]
+            if len(rows):
+                pair_t = np.empty(2 * len(rows))
+                pair_v = np.empty(2 * len(rows))
+                pair_t[0::2] = rows[:, 0]
+                pair_t[1::2] = rows[:, 1]
+                pair_v[0::2] = rows[:, 2 + ci]
+                pair_v[1::2] = rows[:, 2 + n + ci]
+                times_parts.append(pair_t)
+                values_parts.append(pair_v)
+            consumed = len(self._levels[lower]) * self.lod_factor
+
+        raw = self._raw_rows(consumed, len(self))
+        times_parts.append(raw[:, 0])
+        values_parts.append(raw[:, 1 + ci])
+
+        times = np.concatenate(times_parts)
+        values = np.concatenate(values_parts)
+        if t_start is not None or t_end is not None:
+            keep = np.ones(len(times), dtype=bool)
+            if t_start is not None:
+                keep &= times >= t_start
+            if t_end is not None:
+                keep &= times <= t_end
+            times, values = times[keep], values[keep]
+        return times, values
+
+    def export_csv(self, file_path: str, time_format: str = "%Y-%m-%d %H:%M:%S") -> int:
+        """
+        저장된 전체 이력을 CSV 파일로 내보냅니다.
+
+        Args:
+            file_path: 저장할 CSV 파일 경로
+            time_format: 타임스탬프 형식 (로컬 시간)
+
+        Returns:
+            int: 기록된 행 수
+        """
+        written = 0
+        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['timestamp'] + self.channels)
+            for chunk in self.iter_chunks():
+                stamps = format_timestamps(chunk[:, 0], time_format)
+                writer.writerows(
+                    [stamp] + values for stamp, values in zip(stamps, chunk[:, 1:].tolist())
+                )
+                written += len(chunk)
+        return written
+
+    def clear(self) -> None:
+        """저장된 모든 데이터를 삭제합니다."""
+        self._full_chunks.clear()
+        self._chunk_first_times.clear()
+        self._n_full_chunks = 0
+        self._tail_size = 0
+        self._levels.clear()
+        self._pending.clear()
+        self._spill_map = None
+        if self._spill_file is not None:
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+
+    def close(self) -> None:
+        """spill 파일을 닫습니다."""
+        self._spill_map = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+
+def format_timestamps(timestamps: np.ndarray, time_format: str = "%Y-%m-%d %H:%M:%S") -> List[str]:
+    """
+    POSIX 타임스탬프 배열을 로컬 시간 문자열 목록으로 변환합니다.
+
+    기본 형식은 datetime64 변환으로 일괄 처리하고, 그 외 형식은 strftime을 사용합니다.
+
+    Args:
+        timestamps: POSIX 타임스탬프 배열 (초)
+        time_format: strftime 형식 문자열
+
+    Returns:
+        list: 포맷된 시간 문자열 목록
+    """
+    if len(timestamps) == 0:
+        return []
+    if time_format != "%Y-%m-%d %H:%M:%S":
+        return [datetime.fromtimestamp(t).strftime(time_format) for t in timestamps.tolist()]
+
+    offset = datetime.fromtimestamp(float(timestamps[0])).astimezone().utcoffset().total_seconds()
+    local = (np.floor(timestamps + offset)).astype('datetime64[s]')
+    return np.char.replace(np.datetime_as_string(local, unit='s'), 'T', ' ').tolist()
+
@@ -0,0 +1,327 @@
+"""
+RS485 배치/스윕 모드 모듈
+
+ID 범위(또는 목록)와 명령 템플릿으로 명령을 만들어 버스 워커에 한 번에
+넣고, 응답을 parse_structured_response로 해석하여 표에 모은 뒤 CSV로 내보냅니다.
+"""
+import csv
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QSpinBox, QDoubleSpinBox, QTableWidget,
+                             QTableWidgetItem, QFileDialog, QMessageBox, QProgressBar,
+                             QHeaderView)
+
+from bus_worker import BusResult, PRIORITY_LOW
+
+BATCH_TAG = "batch"
+
+
+def parse_id_spec(text: str) -> List[int]:
+    """
+    ID 범위/목록 문자열을 정수 ID 목록으로 변환합니다.
+
+    Args:
+        text: "1-500", "3, 7, 10-12" 처럼 쉼표/공백 구분 ID 또는 범위
+
+    Returns:
+        list: 중복 없이 입력 순서를 유지한 ID 목록
+
+    Raises:
+        ValueError: 숫자가 아니거나 범위가 잘못된 경우
+    """
+    ids: List[int] = []
+    seen = set()
+    for part in text.replace(",", " ").split():
+        if "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+            if start > end:
+                raise ValueError(f"잘못된 범위: {part}")
+            values = range(start, end + 1)
+        else:
+            values = [int(part)]
+        for value in values:
+            if not 0 <= value <= 999999:
+                raise ValueError(f"ID는 0~999999 범위여야 합니다: {value}")
+            if value not in seen:
+                seen.add(value)
+                ids.append(value)
+    return ids
+
+
+def build_batch_commands(ids: List[int], templates: List[str], prestring: str = "JW17",
+                         repeat: int = 1) -> List[Tuple[str, str]]:
+    """
+    ID와 명령 템플릿으로 전송할 쿼리 목록을 만듭니다.
+
+    Args:
+        ids: 장치 ID 목록
+        templates: CMD + POST 템플릿 목록 (예: ["A00", "C00"])
+        prestring: ID 앞에 붙는 PRE 문자열
+        repeat: 각 명령 반복 횟수
+
+    Returns:
+        list: (6자리 ID, 쿼리 문자열) 목록 (ID 순서로 정렬, 같은 ID 명령은 연속)
+    """
+    commands = []
+    for device_id in ids:
+        padded_id = f"{device_id:06d}"
+        for _ in range(repeat):
+            for template in templates:
+                commands.append((padded_id, prestring + padded_id + template))
+    return commands
+
+
+def flatten_parsed(parsed: Optional[dict]) -> Dict[str, object]:
+    """
+    parse_structured_response 결과를 표/CSV 한 행으로 펼칩니다.
+
+    Args:
+        parsed: 구조화된 응답 딕셔너리 (None이면 빈 딕셔너리)
+
+    Returns:
+        dict: cmd, data_string과 parsed_data의 각 항목
+    """
+    if not parsed:
+        return {}
+    row = {'cmd': parsed.get('cmd', ''), 'data_string': parsed.get('data_string', '')}
+    row.update(parsed.get('parsed_data', {}))
+    return row
+
+
+class BatchDialog(QDialog):
+    """배치/스윕 실행 다이얼로그"""
+
+    BASE_COLUMNS = ["id", "query", "status", "elapsed_ms"]
+
+    def __init__(self, main_window):
+        """
+        배치 다이얼로그를 초기화합니다.
+
+        Args:
+            main_window: 버스 워커(bus)와 통신 객체(comm)를 가진 RS485GUI
+        """
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.bus = None
+        self.job_ids: Dict[int, str] = {}  # job_id -> 6자리 ID
+        self.rows: List[Dict[str, object]] = []
+        self.columns: List[str] = list(self.BASE_COLUMNS)
+        self.started_at = 0.0
+        self.init_ui()
+
+    def init_ui(self):
+        """UI 초기화"""
+        self.setWindowTitle("Batch / Sweep")
+        self.resize(900, 500)
+        layout = QVBoxLayout()
+
+        spec_layout = QHBoxLayout()
+        spec_layout.addWidget(QLabel("PRE:"))
+        self.prestring_input = QLineEdit("JW17")
+        self.prestring_input.setFixedWidth(80)
+        spec_layout.addWidget(self.prestring_input)
+
+        spec_layout.addWidget(QLabel("ID 범위/목록:"))
+        self.ids_input = QLineEdit("1-500")
+        self.ids_input.setPlaceholderText("예: 1-500, 600, 700")
+        spec_layout.addWidget(self.ids_input)
+
+        spec_layout.addWidget(QLabel("명령(CMD+POST):"))
+        self.templates_input = QLineEdit("A00")
+        self.templates_input.setPlaceholderText("예: A00, C00")
+        self.templates_input.setFixedWidth(120)
+        spec_layout.addWidget(self.templates_input)
+        layout.addLayout(spec_layout)
+
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(QLabel("반복:"))
+        self.repeat_spin = QSpinBox()
+        self.repeat_spin.setRange(1, 1000)
+        option_layout.addWidget(self.repeat_spin)
+
+        # 응답 없는 ID가 전체 시간을 좌우하므로 배치용 타임아웃은 짧게
+        option_layout.addWidget(QLabel("타임아웃(ms):"))
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(10, 5000)
+        self.timeout_spin.setValue(100)
+        option_layout.addWidget(self.timeout_spin)
+
+        option_layout.addWidget(QLabel("프레임 간격(ms):"))
+        self.gap_spin = QDoubleSpinBox()
+        self.gap_spin.setRange(0.0, 1000.0)
+        self.gap_spin.setDecimals(1)
+        self.gap_spin.setValue(2.0)
+        option_layout.addWidget(self.gap_spin)
+
+        self.start_btn = QPushButton("Start")
+        self.start_btn.clicked.connect(self.start_batch)
+        option_layout.addWidget(self.start_btn)
+
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_batch)
+        option_layout.addWidget(self.cancel_btn)
+
+        self.export_btn = QPushButton("Export CSV")
+        self.export_btn.clicked.connect(self.export_csv)
+        option_layout.addWidget(self.export_btn)
+        option_layout.addStretch()
+        layout.addLayout(option_layout)
+
+        self.progress = QProgressBar()
+        layout.addWidget(self.progress)
+
+        self.table = QTableWidget(0, len(self.columns))
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.setLayout(layout)
+
+    def start_batch(self):
+        """명령 목록을 만들어 버스 워커 큐에 넣습니다."""
+        bus = self.main_window.bus
+        if bus is None:
+            QMessageBox.warning(self, "Warning", "Not connected to device.")
+            return
+
+        try:
+            ids = parse_id_spec(self.ids_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Warning", f"잘못된 ID 입력: {e}")
+            return
+        templates = [t for t in self.templates_input.text().replace(",", " ").split() if t]
+        if not ids or not templates:
+            QMessageBox.warning(self, "Warning", "ID와 명령을 입력하세요.")
+            return
+
+        commands = build_batch_commands(ids, templates, self.prestring_input.text(),
+                                        self.repeat_spin.value())
+
+        self.clear_results()
+        self.bus = bus
+        self.bus.result_ready.connect(self.on_bus_result)
+
+        # 간격은 배치 명령에만 적용 (워커의 inter_frame_gap은 수동 명령/링크 튜닝 값 유지)
+        gap = self.gap_spin.value() / 1000.0
+        timeout = self.timeout_spin.value() / 1000.0
+        framing = self.main_window.current_framing()
+        for padded_id, query in commands:
+            # 수동 명령이 배치 중간에도 먼저 나가도록 낮은 우선순위 사용
+            job_id = self.bus.submit(query, True, PRIORITY_LOW, timeout, framing, BATCH_TAG, gap)
+            self.job_ids[job_id] = padded_id
+
+        self.progress.setRange(0, len(commands))
+        self.progress.setValue(0)
+        self.started_at = time.monotonic()
+        self.start_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.main_window.log_message("INFO", f"Batch started: {len(ids)} IDs, {len(commands)} commands")
+
+    def cancel_batch(self):
+        """대기 중인 배치 명령을 취소합니다."""
+        if self.bus is not None:
+            self.bus.cancel_all(BATCH_TAG)
+
+    def on_bus_result(self, result: BusResult):
+        """배치 명령 결과를 표에 추가합니다."""
+        if result.tag != BATCH_TAG or result.job_id not in self.job_ids:
+            return
+
+        padded_id = self.job_ids.pop(result.job_id)
+        if result.cancelled:
+            status = "cancelled"
+        elif result.response:
+            status = "ok"
+        else:
+            status = "timeout"
+
+        row: Dict[str, object] = {
+            'id': padded_id,
+            'query': result.command,
+            'status': status,
+            'elapsed_ms': round(result.elapsed * 1000.0, 1),
+        }
+        if result.response and self.main_window.comm:
+            parsed = self.main_window.comm.parse_structured_response(result.response)
+            if parsed is None:
+                row['status'] = "bad frame"
+            else:
+                self.main_window.record_result(parsed)
+            row.update(flatten_parsed(parsed))
+        self.append_row(row)
+
+        self.progress.setValue(self.progress.value() + 1)
+        if not self.job_ids:
+            self.finish_batch()
+
+    def append_row(self, row: Dict[str, object]):
+        """결과 한 행을 저장하고 표에 표시합니다."""
+        self.rows.append(row)
+        for key in row:
+            if key not in self.columns:
+                self.columns.append(key)
+                self.table.setColumnCount(len(self.columns))
+                self.table.setHorizontalHeaderLabels(self.columns)
+
+        index = self.table.rowCount()
+        self.table.insertRow(index)
+        for column, key in enumerate(self.columns):
+            if key in row:
+                self.table.setItem(index, column, QTableWidgetItem(str(row[key])))
+
+    def finish_batch(self):
+        """배치 종료 처리"""
+        elapsed = time.monotonic() - self.started_at
+        if self.bus is not None:
+            self.bus.result_ready.disconnect(self.on_bus_result)
+            self.bus = None
+
+        ok_count = sum(1 for row in self.rows if row['status'] == "ok")
+        summary = f"완료: {len(self.rows)}개 명령, 응답 {ok_count}개, {elapsed:.2f}초"
+        self.summary_label.setText(summary)
+        self.main_window.log_message("INFO", f"Batch finished - {summary}")
+        self.start_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+
+    def clear_results(self):
+        """이전 결과를 지웁니다."""
+        self.rows = []
+        self.job_ids = {}
+        self.columns = list(self.BASE_COLUMNS)
+        self.table.setRowCount(0)
+        self.table.setColumnCount(len(self.columns))
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.summary_label.setText("")
+
+    def export_csv(self):
+        """결과를 CSV 파일로 저장합니다."""
+        if not self.rows:
+            QMessageBox.information(self, "Info", "No results to export.")
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Batch Results", "rs485_batch.csv", "CSV Files (*.csv);;All Files (*)"
+        )
+        if not filename:
+            return
+
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=self.columns)
+                writer.writeheader()
+                writer.writerows(self.rows)
+            self.main_window.log_message("INFO", f"Batch results saved to {filename}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export: {str(e)}")
+
+    def closeEvent(self, event):
+        """다이얼로그를 닫을 때 남은 배치 명령 취소"""
+        self.cancel_batch()
+        event.accept()
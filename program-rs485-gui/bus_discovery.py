@@ -0,0 +1,227 @@
+"""
+RS485 버스 탐색 모듈
+
+버스에 연결된 센서 ID를 찾습니다.
+1. 포트별 캐시에 저장된 ID를 먼저 짧게 확인 (센서 수를 알고 모두 응답하면 스윕 생략)
+2. I(ID 요청) 브로드캐스트 - 센서가 한 대로 지정된 경우에만 바로 확정
+3. 그 외에는 ID 범위를 짧은 타임아웃으로 스윕 (캐시/브로드캐스트로 찾은 ID는 건너뜀)
+
+I 응답은 첫 ETX에서 끝나므로 여러 대가 있으면 가장 빠른 센서 하나만 보일 수 있어,
+센서 수를 모를 때는 캐시나 브로드캐스트 결과만으로 버스 전체를 확정하지 않습니다.
+
+프로토콜에 범위 단위 질의가 없어 이진 탐색은 불가능하므로, 스윕은 응답한
+센서의 실제 응답 시간에 맞춰 타임아웃을 줄여 전체 시간을 단축합니다.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from rs485_communication import RS485Communication
+
+BROADCAST_ID_QUERY = "0000000000I00"  # CMD=I: PRE 없음, ID=0000000000
+PROBE_TEMPLATE = "C00"  # 응답이 짧은 상태 조회로 존재 여부 확인
+
+
+@dataclass
+class DiscoveryResult:
+    """버스 탐색 결과"""
+    port: str
+    device_ids: List[str] = field(default_factory=list)  # PRE + 6자리 ID (10자리)
+    method: str = ""  # cache, broadcast, sweep
+    probes: int = 0  # 전송한 질의 수
+    elapsed: float = 0.0
+    cancelled: bool = False
+
+
+class BusDiscovery:
+    """RS485 버스 센서 탐색 클래스 (버스 워커 스레드에서 실행)"""
+
+    def __init__(self, comm: RS485Communication, prestring: str = "JW17",
+                 timeout: float = 0.05, min_timeout: float = 0.01,
+                 cache_path: str = "discovery_cache.json"):
+        """
+        탐색 객체를 초기화합니다.
+
+        Args:
+            comm: 연결된 통신 객체
+            prestring: ID 앞의 PRE 문자열
+            timeout: 스윕 시작 시 ID 하나당 응답 대기 시간 (초)
+            min_timeout: 응답 시간에 맞춰 줄일 때의 하한 (초)
+            cache_path: 포트별 탐색 결과 캐시 파일 경로
+        """
+        self.comm = comm
+        self.prestring = prestring
+        self.timeout = timeout
+        self.min_timeout = min_timeout
+        self.cache_path = cache_path
+        self.probes = 0
+        self._max_latency = 0.0
+
+    def load_cache(self) -> Dict[str, List[str]]:
+        """
+        캐시 파일을 읽습니다.
+
+        Returns:
+            dict: 포트 -> 센서 ID 목록 (파일이 없거나 손상되면 빈 딕셔너리)
+        """
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {port: entry.get("device_ids", []) for port, entry in data.items()
+                if isinstance(entry, dict)}
+
+    def save_cache(self, port: str, device_ids: List[str]) -> None:
+        """
+        포트의 탐색 결과를 캐시에 저장합니다.
+
+        Args:
+            port: 시리얼 포트 경로
+            device_ids: 찾은 센서 ID 목록
+        """
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data[port] = {"device_ids": device_ids, "updated": time.strftime("%Y-%m-%d %H:%M:%S")}
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def broadcast_id_request(self) -> Optional[str]:
+        """
+        I 명령을 브로드캐스트합니다.
+
+        Returns:
+            str: 응답한 센서 ID (한 대만 깨끗하게 응답한 경우), 아니면 None
+                 (무응답 또는 여러 대의 응답 충돌)
+        """
+        self.probes += 1
+        response = self.comm.send_query(BROADCAST_ID_QUERY, self.timeout * 4)
+        if not response:
+            return None
+        parsed = self.comm.parse_structured_response(response)
+        if parsed is None or parsed.get('cmd') != 'I':
+            return None
+        device_id = parsed.get('parsed_data', {}).get('device_id', '')
+        return device_id or None
+
+    def current_timeout(self) -> float:
+        """지금까지 관측한 응답 시간에 맞춘 질의 타임아웃을 반환합니다."""
+        if self._max_latency <= 0:
+            return self.timeout
+        # 가장 느린 응답의 3배 여유, 설정한 범위 안으로 제한
+        return min(self.timeout, max(self.min_timeout, self._max_latency * 3))
+
+    def probe(self, device_id: str, timeout: Optional[float] = None) -> bool:
+        """
+        센서 한 대가 응답하는지 확인합니다.
+
+        Args:
+            device_id: PRE + 6자리 ID
+            timeout: 응답 대기 시간 (None이면 current_timeout())
+
+        Returns:
+            bool: 올바른 응답을 받았는지 여부
+        """
+        self.probes += 1
+        started = time.monotonic()
+        response = self.comm.send_query(device_id + PROBE_TEMPLATE,
+                                        timeout if timeout is not None else self.current_timeout())
+        if not response:
+            return False
+        latency = time.monotonic() - started
+        parsed = self.comm.parse_structured_response(response)
+        if parsed is None or parsed.get('pre') != device_id:
+            return False
+        self._max_latency = max(self._max_latency, latency)
+        return True
+
+    def sweep(self, ids: Iterable[int], found: List[str],
+              is_cancelled: Callable[[], bool], report: Callable[[str], None],
+              expected: Optional[int] = None) -> None:
+        """
+        ID 범위를 순서대로 질의하여 응답하는 센서를 found에 추가합니다.
+
+        Args:
+            ids: 질의할 정수 ID (0~999999)
+            found: 찾은 센서 ID 목록 (이미 있는 ID는 건너뜀)
+            is_cancelled: 중단 여부를 반환하는 함수
+            report: 진행 메시지를 받을 함수
+            expected: 이 개수만큼 찾으면 중단 (None이면 범위 끝까지)
+        """
+        known = set(found)
+        for index, value in enumerate(ids):
+            if is_cancelled() or (expected is not None and len(found) >= expected):
+                return
+            device_id = f"{self.prestring}{value:06d}"
+            if device_id in known:
+                continue
+            # 첫 응답 전에는 느린 센서를 놓치지 않도록 기본 타임아웃 사용
+            if self.probe(device_id):
+                found.append(device_id)
+                known.add(device_id)
+                report(f"Found {device_id} (timeout {self.current_timeout() * 1000:.0f}ms)")
+            elif index and index % 100 == 0:
+                report(f"Scanned up to {device_id}, {len(found)} found")
+
+    def discover(self, port: str, ids: Iterable[int], is_cancelled: Callable[[], bool],
+                 report: Callable[[str], None], expected: Optional[int] = None,
+                 use_cache: bool = True) -> DiscoveryResult:
+        """
+        버스의 센서 ID를 찾습니다.
+
+        Args:
+            port: 캐시 키로 쓸 시리얼 포트 경로
+            ids: 스윕할 정수 ID 범위
+            is_cancelled: 중단 여부를 반환하는 함수
+            report: 진행 메시지를 받을 함수
+            expected: 버스의 센서 수를 알면 지정 (찾으면 조기 종료, None이면 범위 전체 스윕)
+            use_cache: 캐시된 ID를 먼저 확인할지 여부
+
+        Returns:
+            DiscoveryResult: 찾은 센서 ID와 사용한 방법
+        """
+        started = time.monotonic()
+        self.probes = 0
+        found: List[str] = []
+        method = "sweep"
+
+        # 1. 캐시된 ID 확인 (센서 수를 알고 그만큼 응답하면 스윕 생략, 아니면 스윕의 시작 목록)
+        cached = self.load_cache().get(port, []) if use_cache else []
+        if cached:
+            for device_id in cached:
+                if is_cancelled():
+                    break
+                if self.probe(device_id, self.timeout):
+                    found.append(device_id)
+            report(f"Cache: {len(found)}/{len(cached)} cached IDs answered")
+            if expected is not None and len(found) >= expected:
+                method = "cache"
+
+        # 2. I 브로드캐스트 (센서가 한 대로 지정된 경우에만 바로 확정)
+        if method != "cache" and not found and not is_cancelled():
+            device_id = self.broadcast_id_request()
+            if device_id:
+                report(f"Broadcast: {device_id} answered")
+                found.append(device_id)
+                if expected == 1:
+                    method = "broadcast"
+            else:
+                report("Broadcast: no single clean answer, sweeping ID range")
+
+        # 3. ID 범위 스윕
+        if method == "sweep":
+            self.sweep(ids, found, is_cancelled, report, expected)
+
+        cancelled = is_cancelled()
+        if not cancelled:
+            self.save_cache(port, found)
+
+        return DiscoveryResult(port, found, method, self.probes,
+                               time.monotonic() - started, cancelled)
@@ -0,0 +1,255 @@
+"""
+RS485 버스 워커 모듈
+
+하나의 장수명 QThread가 시리얼 포트를 독점하고, 명령 큐에서 순서대로
+명령을 꺼내 전송합니다. 명령마다 스레드를 만들지 않으므로 빠른 연속 전송이나
+스크립트 전송에서도 같은 포트에 동시에 접근하지 않습니다.
+"""
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Set, Tuple
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from rs485_communication import RS485Communication
+
+# 우선순위 (값이 작을수록 먼저 전송)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+@dataclass
+class BusCommand:
+    """큐에 들어가는 명령 한 개"""
+    job_id: int
+    command: str
+    use_checksum: bool = True
+    priority: int = PRIORITY_NORMAL
+    timeout: Optional[float] = None  # None이면 통신 객체의 기본 타임아웃
+    framing: Optional[Tuple[str, str, str, str]] = None  # (stx, etx, recv_stx, recv_etx)
+    tag: str = ""  # 결과를 받을 쪽 구분용 (예: "manual", "batch")
+    gap: Optional[float] = None  # 이 명령 뒤의 간격 (초, None이면 워커의 inter_frame_gap)
+    # 지정하면 command 대신 action(comm, is_cancelled, report)를 워커 스레드에서 실행
+    action: Optional[Callable[..., Any]] = None
+
+
+@dataclass
+class BusResult:
+    """명령 한 개의 처리 결과"""
+    job_id: int
+    command: str
+    tag: str
+    response: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0  # 전송부터 응답 완료까지 걸린 시간 (초)
+    cancelled: bool = False
+    payload: Any = None  # action 작업의 반환값
+
+
+class BusWorker(QThread):
+    """명령 큐를 가진 RS485 버스 전용 스레드"""
+    result_ready = pyqtSignal(object)  # BusResult
+    queue_size_changed = pyqtSignal(int)
+    job_progress = pyqtSignal(int, str)  # job_id, 진행 메시지 (action 작업용)
+
+    def __init__(self, comm_obj: RS485Communication, inter_frame_gap: float = 0.0):
+        """
+        버스 워커를 초기화합니다.
+
+        Args:
+            comm_obj: 연결된 통신 객체 (이 워커만 사용해야 함)
+            inter_frame_gap: 응답 수신 후 다음 명령까지의 간격 (초)
+        """
+        super().__init__()
+        self.comm_obj = comm_obj
+        self.inter_frame_gap = inter_frame_gap
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._job_ids = itertools.count(1)
+        self._cancelled: Set[int] = set()
+        self._active: Set[int] = set()  # 대기 중이거나 실행 중인 작업 ID
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def submit(self, command: str, use_checksum: bool = True,
+               priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None,
+               framing: Optional[Tuple[str, str, str, str]] = None,
+               tag: str = "", gap: Optional[float] = None) -> int:
+        """
+        명령을 큐에 넣습니다 (어느 스레드에서나 호출 가능).
+
+        Args:
+            command: 전송할 쿼리 문자열
+            use_checksum: 체크섬 포함 여부
+            priority: 우선순위 (PRIORITY_HIGH/NORMAL/LOW)
+            timeout: 이 명령의 응답 대기 시간 (초)
+            framing: 전송 전에 적용할 (stx, etx, recv_stx, recv_etx)
+            tag: 결과 구분용 태그
+            gap: 이 명령의 응답 후 다음 명령까지의 간격 (None이면 inter_frame_gap)
+
+        Returns:
+            int: 취소에 사용할 작업 ID
+        """
+        job_id = next(self._job_ids)
+        job = BusCommand(job_id, command, use_checksum, priority, timeout, framing, tag, gap=gap)
+        with self._lock:
+            self._active.add(job_id)
+        # 같은 우선순위는 넣은 순서대로 처리
+        self._queue.put((priority, next(self._seq), job))
+        self.queue_size_changed.emit(self._queue.qsize())
+        return job_id
+
+    def submit_action(self, action: Callable[..., Any], description: str = "",
+                      priority: int = PRIORITY_NORMAL, tag: str = "") -> int:
+        """
+        포트를 여러 번 사용하는 작업(탐색 등)을 큐에 넣습니다.
+
+        action은 워커 스레드에서 action(comm, is_cancelled, report) 형태로
+        호출되며, 실행되는 동안 다른 명령은 전송되지 않습니다.
+
+        Args:
+            action: 실행할 함수 (반환값은 BusResult.payload)
+            description: 로그/결과에 표시할 작업 설명
+            priority: 우선순위
+            tag: 결과 구분용 태그
+
+        Returns:
+            int: 취소에 사용할 작업 ID
+        """
+        job_id = next(self._job_ids)
+        job = BusCommand(job_id, description, priority=priority, tag=tag, action=action)
+        with self._lock:
+            self._active.add(job_id)
+        self._queue.put((priority, next(self._seq), job))
+        self.queue_size_changed.emit(self._queue.qsize())
+        return job_id
+
+    def cancel(self, job_id: int) -> None:
+        """
+        아직 전송되지 않은 명령을 취소합니다 (실행 중인 action 작업은 중단 요청).
+
+        Args:
+            job_id: submit()이 반환한 작업 ID
+        """
+        with self._lock:
+            # 이미 끝난 (또는 없는) 작업 ID는 기록하지 않음
+            if job_id in self._active:
+                self._cancelled.add(job_id)
+
+    def cancel_all(self, tag: Optional[str] = None) -> int:
+        """
+        대기 중인 명령을 모두 취소합니다.
+
+        Args:
+            tag: 지정하면 해당 태그의 명령만 취소
+
+        Returns:
+            int: 취소된 명령 수
+        """
+        kept = []
+        count = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            job = item[2]
+            if job is not None and (tag is None or job.tag == tag):
+                count += 1
+                self._forget(job.job_id)
+                self.result_ready.emit(BusResult(job.job_id, job.command, job.tag,
+                                                 cancelled=True))
+            else:
+                kept.append(item)
+        for item in kept:
+            self._queue.put(item)
+        self.queue_size_changed.emit(self._queue.qsize())
+        return count
+
+    def pending(self) -> int:
+        """대기 중인 명령 수를 반환합니다."""
+        return self._queue.qsize()
+
+    def stop(self) -> None:
+        """대기 중인 명령을 버리고 스레드를 종료합니다."""
+        self._stopping = True
+        self.cancel_all()
+        # 종료 표시는 가장 높은 우선순위로 넣어 바로 꺼내지도록 함
+        self._queue.put((PRIORITY_HIGH - 1, next(self._seq), None))
+
+    def run(self):
+        while True:
+            _, _, job = self._queue.get()
+            if job is None or self._stopping:
+                break
+
+            self.queue_size_changed.emit(self._queue.qsize())
+
+            with self._lock:
+                cancelled = job.job_id in self._cancelled
+            if cancelled:
+                self._forget(job.job_id)
+                self.result_ready.emit(BusResult(job.job_id, job.command, job.tag,
+                                                 cancelled=True))
+                continue
+
+            result = self._execute(job)
+            # 실행 중에 들어온 취소 요청도 함께 정리
+            self._forget(job.job_id)
+            self.result_ready.emit(result)
+
+            gap = self.inter_frame_gap if job.gap is None else job.gap
+            if gap > 0:
+                time.sleep(gap)
+
+    def _forget(self, job_id: int) -> None:
+        """끝난 작업의 ID를 대기/취소 목록에서 제거합니다."""
+        with self._lock:
+            self._active.discard(job_id)
+            self._cancelled.discard(job_id)
+
+    def _execute(self, job: BusCommand) -> BusResult:
+        """명령 한 개를 전송하고 결과를 만듭니다 (워커 스레드에서만 호출)."""
+        result = BusResult(job.job_id, job.command, job.tag)
+        started = time.monotonic()
+        if job.action is not None:
+            return self._execute_action(job, result, started)
+        try:
+            if job.framing is not None:
+                self.comm_obj.set_stx_etx(*job.framing)
+            if job.use_checksum:
+                response = self.comm_obj.send_query(job.command, job.timeout)
+            else:
+                response = self.comm_obj.send_simple_query(job.command, job.timeout)
+
+            if response:
+                result.response = response
+            else:
+                result.error = f"No response for command: {job.command}"
+        except Exception as e:
+            result.error = f"Communication error: {str(e)}"
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def _execute_action(self, job: BusCommand, result: BusResult, started: float) -> BusResult:
+        """action 작업을 실행하고 결과를 만듭니다 (워커 스레드에서만 호출)."""
+        def is_cancelled() -> bool:
+            with self._lock:
+                return self._stopping or job.job_id in self._cancelled
+
+        def report(message: str) -> None:
+            self.job_progress.emit(job.job_id, message)
+
+        try:
+            result.payload = job.action(self.comm_obj, is_cancelled, report)
+        except Exception as e:
+            result.error = f"{job.command or 'Action'} error: {str(e)}"
+        with self._lock:
+            result.cancelled = job.job_id in self._cancelled
+            self._cancelled.discard(job.job_id)
+        result.elapsed = time.monotonic() - started
+        return result
@@ -0,0 +1,220 @@
+"""
+시리얼 링크 자동 튜닝 모듈
+
+지원 통신 속도를 빠른 순서로 시험하여 모든 질의에 응답하는 가장 빠른 속도를
+고르고, 그 속도에서 측정한 왕복 지연 분포로 최소 안전 타임아웃과 프레임 간
+간격을 정합니다. 결과는 포트별 프로파일 파일에 저장하여 다음 연결/수집 때
+최악의 경우를 가정한 긴 타임아웃 대신 사용합니다.
+
+통신 방식에 의존하지 않도록 질의는 exchange(timeout) -> bool 함수로,
+속도 변경은 set_baudrate(baudrate) 함수로 받습니다.
+"""
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+SUPPORTED_BAUDRATES = (9600, 19200, 38400, 57600, 115200)
+GAP_CANDIDATES = (0.0, 0.001, 0.002, 0.005, 0.01, 0.02)  # 프레임 간 간격 후보 (초)
+
+
+@dataclass
+class BaudrateTrial:
+    """통신 속도 한 개의 측정 결과"""
+    baudrate: int
+    sent: int = 0
+    latencies: List[float] = field(default_factory=list)  # 성공한 질의의 왕복 시간 (초)
+
+    @property
+    def received(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def success_rate(self) -> float:
+        return self.received / self.sent if self.sent else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """왕복 시간의 백분위 값 (fraction: 0~1)을 반환합니다."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[index]
+
+
+@dataclass
+class LinkProfile:
+    """포트별 튜닝 결과"""
+    port: str
+    baudrate: int
+    timeout: float  # 질의 한 개의 응답 대기 시간 (초)
+    inter_frame_gap: float  # 응답 수신 후 다음 질의까지의 간격 (초)
+    latency_p50: float = 0.0
+    latency_max: float = 0.0
+    updated: str = ""
+
+
+class LinkTuner:
+    """통신 속도/타임아웃/프레임 간격 자동 튜닝 클래스"""
+
+    def __init__(self, exchange: Callable[[float], bool],
+                 set_baudrate: Callable[[int], None],
+                 baudrates: Sequence[int] = SUPPORTED_BAUDRATES,
+                 probes: int = 20, probe_timeout: float = 0.5,
+                 timeout_margin: float = 2.0, min_timeout: float = 0.02,
+                 gap_candidates: Sequence[float] = GAP_CANDIDATES):
+        """
+        튜너를 초기화합니다.
+
+        Args:
+            exchange: 질의 한 개를 보내고 올바른 응답을 받았는지 반환하는 함수 (인자: 타임아웃 초)
+            set_baudrate: 열린 포트의 통신 속도를 바꾸는 함수
+            baudrates: 시험할 통신 속도 목록
+            probes: 속도/간격마다 보낼 질의 수
+            probe_timeout: 측정 중 질의 한 개의 응답 대기 시간 (초)
+            timeout_margin: 가장 느린 응답 대비 타임아웃 여유 배수
+            min_timeout: 타임아웃 하한 (초)
+            gap_candidates: 시험할 프레임 간 간격 (작은 것부터)
+        """
+        self.exchange = exchange
+        self.set_baudrate = set_baudrate
+        self.baudrates = sorted(baudrates, reverse=True)
+        self.probes = probes
+        self.probe_timeout = probe_timeout
+        self.timeout_margin = timeout_margin
+        self.min_timeout = min_timeout
+        self.gap_candidates = sorted(gap_candidates)
+        self.trials: Dict[int, BaudrateTrial] = {}
+
+    def measure(self, baudrate: int, count: int, timeout: float, gap: float,
+                is_cancelled: Callable[[], bool]) -> BaudrateTrial:
+        """
+        현재 속도에서 질의를 count번 보내 왕복 시간을 측정합니다.
+
+        Args:
+            baudrate: 결과에 기록할 통신 속도
+            count: 보낼 질의 수
+            timeout: 질의 한 개의 응답 대기 시간 (초)
+            gap: 질의 사이 간격 (초)
+            is_cancelled: 중단 여부를 반환하는 함수
+
+        Returns:
+            BaudrateTrial: 측정 결과
+        """
+        trial = BaudrateTrial(baudrate)
+        for index in range(count):
+            if is_cancelled():
+                break
+            if index and gap > 0:
+                time.sleep(gap)
+            trial.sent += 1
+            started = time.monotonic()
+            if self.exchange(timeout):
+                trial.latencies.append(time.monotonic() - started)
+        return trial
+
+    def safe_timeout(self, trial: BaudrateTrial) -> float:
+        """측정한 가장 느린 응답에 여유를 둔 타임아웃을 반환합니다 (ms 단위 올림)."""
+        timeout = max(self.min_timeout, trial.percentile(1.0) * self.timeout_margin)
+        return math.ceil(timeout * 1000) / 1000
+
+    def tune(self, port: str, is_cancelled: Callable[[], bool],
+             report: Callable[[str], None]) -> Optional[LinkProfile]:
+        """
+        포트의 최적 통신 설정을 찾습니다.
+
+        빠른 속도부터 몇 번 질의해 보고, 응답이 있으면 전체 측정에서 모든 질의가
+        성공하는 첫 속도를 선택합니다. 이후 그 속도의 안전 타임아웃으로 간격을
+        줄여 가며 모든 질의가 성공하는 가장 작은 간격을 고릅니다.
+
+        Args:
+            port: 프로파일에 기록할 포트 경로
+            is_cancelled: 중단 여부를 반환하는 함수
+            report: 진행 메시지를 받을 함수
+
+        Returns:
+            LinkProfile: 튜닝 결과 (응답하는 속도가 없거나 중단되면 None)
+        """
+        self.trials = {}
+        chosen: Optional[BaudrateTrial] = None
+        slowest_gap = self.gap_candidates[-1] if self.gap_candidates else 0.0
+
+        for baudrate in self.baudrates:
+            if is_cancelled():
+                return None
+            self.set_baudrate(baudrate)
+            # 속도 변경 직후의 잔여 바이트를 흘려보낸 뒤 짧게 응답 여부만 확인
+            screen = self.measure(baudrate, 3, self.probe_timeout, slowest_gap, is_cancelled)
+            if not screen.received:
+                report(f"{baudrate} bps: no response")
+                continue
+            trial = self.measure(baudrate, self.probes, self.probe_timeout, slowest_gap,
+                                 is_cancelled)
+            self.trials[baudrate] = trial
+            report(f"{baudrate} bps: {trial.received}/{trial.sent} ok, "
+                   f"p50 {trial.percentile(0.5) * 1000:.1f}ms, "
+                   f"max {trial.percentile(1.0) * 1000:.1f}ms")
+            if trial.sent and trial.success_rate == 1.0:
+                chosen = trial
+                break
+
+        if chosen is None or is_cancelled():
+            return None
+
+        timeout = self.safe_timeout(chosen)
+        gap = slowest_gap
+        for candidate in self.gap_candidates:
+            if is_cancelled():
+                return None
+            trial = self.measure(chosen.baudrate, self.probes, timeout, candidate, is_cancelled)
+            report(f"gap {candidate * 1000:.0f}ms: {trial.received}/{trial.sent} ok")
+            if trial.sent and trial.success_rate == 1.0:
+                gap = candidate
+                # 짧은 간격에서 관측한 지연도 타임아웃에 반영
+                chosen.latencies.extend(trial.latencies)
+                break
+
+        return LinkProfile(port, chosen.baudrate, self.safe_timeout(chosen), gap,
+                           chosen.percentile(0.5), chosen.percentile(1.0),
+                           time.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def load_profile(port: str, path: str = "link_profiles.json") -> Optional[LinkProfile]:
+    """
+    포트의 저장된 튜닝 결과를 읽습니다.
+
+    Args:
+        port: 시리얼 포트 경로
+        path: 프로파일 파일 경로
+
+    Returns:
+        LinkProfile: 저장된 결과 (없거나 파일이 손상되면 None)
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f).get(port)
+        return LinkProfile(**entry) if isinstance(entry, dict) else None
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_profile(profile: LinkProfile, path: str = "link_profiles.json") -> None:
+    """
+    튜닝 결과를 포트별로 저장합니다.
+
+    Args:
+        profile: 저장할 튜닝 결과
+        path: 프로파일 파일 경로
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    data[profile.port] = asdict(profile)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -1,46 +1,33 @@
 #!/usr/bin/env python3
 
+import os
 import sys
 import time
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QTextEdit, QLineEdit, QPushButton,
                              QLabel, QComboBox, QSpinBox, QGroupBox, QSplitter,
-                             QMessageBox, QStatusBar)
-from PyQt6.QtCore import QThread, pyqtSignal, QTimer, Qt
-from PyQt6.QtGui import QFont, QTextCursor
+                             QMessageBox, QStatusBar, QInputDialog)
+from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtGui import QFont
 from rs485_communication import RS485Communication
+from bus_worker import BusWorker, BusResult
+from batch_dialog import BatchDialog, parse_id_spec
+from multi_port_dialog import MultiPortDialog
+from bus_discovery import BROADCAST_ID_QUERY, BusDiscovery
+from log_view import LogView
+from link_tuning import LinkTuner, load_profile, save_profile
+from frame_capture import ReplayDevice, is_capturing, start_capture, stop_capture
+from results_store import ResultsStore
 import serial.tools.list_ports
 
-class CommunicationWorker(QThread):
-    """별도 스레드에서 통신 처리"""
-    response_received = pyqtSignal(str, str)  # command, response
-    error_occurred = pyqtSignal(str)
-    
-    def __init__(self, comm_obj, command, use_checksum=True):
-        super().__init__()
-        self.comm_obj = comm_obj
-        self.command = command
-        self.use_checksum = use_checksum
-    
-    def run(self):
-        try:
-            if self.use_checksum:
-                response = self.comm_obj.send_query(self.command)
-            else:
-                response = self.comm_obj.send_simple_query(self.command)
-            
-            if response:
-                self.response_received.emit(self.command, response)
-            else:
-                self.error_occurred.emit(f"No response for command: {self.command}")
-        except Exception as e:
-            self.error_occurred.emit(f"Communication error: {str(e)}")
-
 class RS485GUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.comm = None
-        self.worker = None
+        self.bus = None  # 연결 동안 포트를 독점하는 버스 워커
+        self.batch_dialog = None
+        self.multi_port_dialog = None
+        self.results = ResultsStore()  # 해석된 응답 (장치/CMD별 열 단위)
         self.init_ui()
         self.refresh_ports()
         
@@ -121,6 +108,24 @@ class RS485GUI(QMainWindow):
         self.connect_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; font-weight: bold; }")
         layout.addWidget(self.connect_btn)
         
+        # 버스의 센서 수 (알면 탐색을 일찍 끝냄, 0이면 모름 → 범위 전체 스윕)
+        layout.addWidget(QLabel("Sensors:"))
+        self.sensor_count_spin = QSpinBox()
+        self.sensor_count_spin.setRange(0, 999)
+        self.sensor_count_spin.setSpecialValueText("?")
+        self.sensor_count_spin.setToolTip("버스에 연결된 센서 수 (?: 모름)")
+        layout.addWidget(self.sensor_count_spin)
+        
+        # 버스 탐색 버튼
+        self.discover_btn = QPushButton("Discover")
+        self.discover_btn.clicked.connect(self.discover_devices)
+        layout.addWidget(self.discover_btn)
+        
+        # 통신 속도/타임아웃 자동 튜닝 버튼
+        self.tune_btn = QPushButton("Auto-Tune")
+        self.tune_btn.clicked.connect(self.auto_tune_link)
+        layout.addWidget(self.tune_btn)
+        
         layout.addStretch()  # 남은 공간 채우기
         
         group.setLayout(layout)
@@ -212,6 +217,16 @@ class RS485GUI(QMainWindow):
         self.preview_btn.clicked.connect(self.show_preview)
         full_input_layout.addWidget(self.preview_btn)
         
+        # 배치/스윕 버튼
+        self.batch_btn = QPushButton("Batch...")
+        self.batch_btn.clicked.connect(self.show_batch_dialog)
+        full_input_layout.addWidget(self.batch_btn)
+        
+        # 다중 포트 동시 폴링 버튼
+        self.multi_port_btn = QPushButton("Multi-Port...")
+        self.multi_port_btn.clicked.connect(self.show_multi_port_dialog)
+        full_input_layout.addWidget(self.multi_port_btn)
+        
         layout.addLayout(full_input_layout)
         
         # 구분선
@@ -340,10 +355,10 @@ class RS485GUI(QMainWindow):
         group = QGroupBox("Communication Log")
         layout = QVBoxLayout()
         
-        # 로그 표시 영역
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
+        # 로그 표시 영역 (최근 줄만 보관, 전체는 회전 로그 파일에 기록)
+        self.log_text = LogView(max_lines=20000)
         self.log_text.setFont(QFont("Consolas", 10))
+        self.log_text.set_log_file(os.path.join("logs", "rs485_gui.log"))
         layout.addWidget(self.log_text)
         
         # 제어 버튼들
@@ -357,6 +372,28 @@ class RS485GUI(QMainWindow):
         self.save_btn.clicked.connect(self.save_log)
         button_layout.addWidget(self.save_btn)
         
+        # 송수신 프레임 캡처/재생
+        self.capture_btn = QPushButton("Start Capture")
+        self.capture_btn.clicked.connect(self.toggle_capture)
+        button_layout.addWidget(self.capture_btn)
+        
+        self.replay_btn = QPushButton("Replay...")
+        self.replay_btn.clicked.connect(self.start_replay)
+        button_layout.addWidget(self.replay_btn)
+        
+        # 해석된 응답 기록/내보내기
+        self.record_btn = QPushButton("Record CSV...")
+        self.record_btn.clicked.connect(self.toggle_results_recording)
+        button_layout.addWidget(self.record_btn)
+        
+        self.export_results_btn = QPushButton("Export Results...")
+        self.export_results_btn.clicked.connect(self.export_results)
+        button_layout.addWidget(self.export_results_btn)
+        
+        # 기록 중인 CSV를 주기적으로 디스크에 반영
+        self.results_flush_timer = QTimer(self)
+        self.results_flush_timer.timeout.connect(self.results.flush_csv)
+        
         button_layout.addStretch()
         
         # 종료 버튼
@@ -427,6 +464,20 @@ Length: {preview_with_checksum['command_length']} bytes
         
         QMessageBox.information(self, "Command Preview", details)
     
+    def show_batch_dialog(self):
+        """배치/스윕 다이얼로그 표시"""
+        if self.batch_dialog is None:
+            self.batch_dialog = BatchDialog(self)
+        self.batch_dialog.show()
+        self.batch_dialog.raise_()
+    
+    def show_multi_port_dialog(self):
+        """다중 포트 폴링 다이얼로그 표시"""
+        if self.multi_port_dialog is None:
+            self.multi_port_dialog = MultiPortDialog(self)
+        self.multi_port_dialog.show()
+        self.multi_port_dialog.raise_()
+    
     def refresh_ports(self):
         """시리얼 포트 목록 새로고침"""
         self.port_combo.clear()
@@ -470,25 +521,106 @@ Length: {preview_with_checksum['command_length']} bytes
                                          stx=stx, etx=etx, recv_stx=recv_stx, recv_etx=recv_etx)
             
             if self.comm.connect():
-                self.connect_btn.setText("Disconnect")
-                self.connect_btn.setStyleSheet("QPushButton { background-color: #f44336; color: white; font-weight: bold; }")
-                self.send_simple_btn.setEnabled(True)
-                self.send_checksum_btn.setEnabled(True)
-                
-                # 빠른 명령 버튼들 활성화
-                #for btn in self.quick_buttons:
-                #    btn.setEnabled(True)
+                self.start_bus()
                 
                 self.status_bar.showMessage(f"Connected to {port_name}")
                 self.log_message("INFO", f"Connected to {port_name} at {baudrate} baud with STX='{stx}', ETX='{etx}'")
+                
+                # 이 포트의 튜닝 결과가 있으면 짧은 타임아웃과 프레임 간격 사용
+                profile = load_profile(port_name)
+                if profile and profile.baudrate == baudrate:
+                    self.apply_link_profile(profile)
+                elif profile:
+                    self.log_message("INFO", f"Tuned profile for {port_name} uses {profile.baudrate} baud "
+                                             f"(reconnect at that rate or run Auto-Tune)")
             else:
                 QMessageBox.critical(self, "Error", f"Failed to connect to {port_name}")
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Connection error: {str(e)}")
     
+    def start_bus(self):
+        """연결된 통신 객체로 버스 워커를 시작하고 전송 버튼을 활성화"""
+        # 포트는 이후 버스 워커 스레드만 사용
+        self.bus = BusWorker(self.comm)
+        self.bus.result_ready.connect(self.on_bus_result)
+        self.bus.queue_size_changed.connect(self.on_queue_size_changed)
+        self.bus.job_progress.connect(self.on_job_progress)
+        self.bus.start()
+        
+        self.connect_btn.setText("Disconnect")
+        self.connect_btn.setStyleSheet("QPushButton { background-color: #f44336; color: white; font-weight: bold; }")
+        self.send_simple_btn.setEnabled(True)
+        self.send_checksum_btn.setEnabled(True)
+        
+        # 빠른 명령 버튼들 활성화
+        #for btn in self.quick_buttons:
+        #    btn.setEnabled(True)
+    
+    def start_replay(self):
+        """캡처 파일을 시리얼 포트 대신 연결하여 기록된 응답으로 재생"""
+        from PyQt6.QtWidgets import QFileDialog
+        
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Replay Capture", "", "Capture Files (*.fcap);;All Files (*)"
+        )
+        if not filename:
+            return
+        
+        realtime = QMessageBox.question(
+            self, "Replay", "Reproduce the recorded response timing?\n(No = replay as fast as possible)"
+        ) == QMessageBox.StandardButton.Yes
+        
+        try:
+            device = ReplayDevice(filename, realtime=realtime)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Failed to open capture: {str(e)}")
+            return
+        
+        if self.comm and self.comm.is_connected():
+            self.disconnect_device()
+        
+        self.comm = RS485Communication(port=filename, timeout=self.timeout_spin.value())
+        self.comm.set_stx_etx(*self.current_framing())
+        self.comm.serial_connection = device
+        self.start_bus()
+        
+        self.status_bar.showMessage(f"Replaying {os.path.basename(filename)}")
+        self.log_message("INFO", f"Replaying {filename} ({len(device.exchanges)} exchanges, "
+                                 f"{'recorded timing' if realtime else 'max speed'})")
+    
+    def toggle_capture(self):
+        """송수신 프레임 캡처 시작/종료"""
+        if is_capturing():
+            capture = stop_capture()
+            self.capture_btn.setText("Start Capture")
+            self.log_message("INFO", f"Capture saved to {capture.path} ({capture.count} frames)")
+            return
+        
+        from PyQt6.QtWidgets import QFileDialog
+        
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Start Capture", time.strftime("rs485_%Y%m%d_%H%M%S.fcap"),
+            "Capture Files (*.fcap);;All Files (*)"
+        )
+        if not filename:
+            return
+        try:
+            start_capture(filename)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to start capture: {str(e)}")
+            return
+        self.capture_btn.setText("Stop Capture")
+        self.log_message("INFO", f"Capturing frames to {filename}")
+    
     def disconnect_device(self):
         """장치 연결 해제"""
+        if self.bus:
+            # 진행 중인 명령이 끝난 뒤 포트를 닫음
+            self.bus.stop()
+            self.bus.wait()
+            self.bus = None
+        
         if self.comm:
             self.comm.disconnect()
             self.comm = None
@@ -735,13 +867,6 @@ Length: {preview_with_checksum['command_length']} bytes
                                   f"Not connected to device.\n\nPreview:\nCommand: {preview_info['full_command']}\nHex: {preview_info['full_command_hex']}{checksum_note}")
             return
         
-        # STX/ETX 업데이트
-        stx = self.send_stx_combo.currentText() or "@"
-        etx = self.send_etx_combo.currentText() or "*"
-        recv_stx = self.recv_stx_combo.currentText() or "@#J"
-        recv_etx = self.recv_etx_combo.currentText() or "Q"
-        self.comm.set_stx_etx(stx, etx, recv_stx, recv_etx)
-        
         checksum_type = "CHKSUM+SEND" if use_checksum else "SEND"
         self.log_message("SEND", f"[{checksum_type}] {command}")
         
@@ -756,11 +881,154 @@ Length: {preview_with_checksum['command_length']} bytes
         
         self.status_bar.showMessage("Sending command...")
         
-        # 별도 스레드에서 통신 처리
-        self.worker = CommunicationWorker(self.comm, command, use_checksum)
-        self.worker.response_received.connect(self.on_response_received)
-        self.worker.error_occurred.connect(self.on_error_occurred)
-        self.worker.start()
+        # 버스 워커 큐에 추가 (STX/ETX는 워커 스레드에서 전송 직전에 적용)
+        self.bus.submit(command, use_checksum, framing=self.current_framing(), tag="manual")
+    
+    def current_framing(self):
+        """현재 선택된 (송신 STX, 송신 ETX, 수신 STX, 수신 ETX)를 반환"""
+        return (self.send_stx_combo.currentText() or "@",
+                self.send_etx_combo.currentText() or "*",
+                self.recv_stx_combo.currentText() or "@#J",
+                self.recv_etx_combo.currentText() or "Q")
+    
+    def on_bus_result(self, result: BusResult):
+        """버스 워커 결과 처리 (배치 등 다른 태그는 각 다이얼로그가 처리)"""
+        if result.tag == "discovery":
+            self.on_discovery_finished(result)
+            return
+        if result.tag == "tune":
+            self.on_tune_finished(result)
+            return
+        if result.tag != "manual":
+            return
+        if result.cancelled:
+            self.log_message("INFO", f"Cancelled: {result.command}")
+        elif result.response:
+            self.on_response_received(result.command, result.response)
+        else:
+            self.on_error_occurred(result.error)
+    
+    def discover_devices(self):
+        """버스에 연결된 센서 ID 탐색"""
+        if not self.bus:
+            QMessageBox.warning(self, "Warning", "Not connected to device.")
+            return
+        
+        id_text, ok = QInputDialog.getText(self, "Discover", "스윕할 ID 범위 (예: 1-100):", text="1-100")
+        if not ok:
+            return
+        try:
+            ids = parse_id_spec(id_text)
+        except ValueError as e:
+            QMessageBox.warning(self, "Warning", f"잘못된 ID 입력: {e}")
+            return
+        
+        port = self.comm.port
+        framing = self.current_framing()
+        prestring = self.prestring_input.text() or "JW17"  # CMD=I 선택 시 PRE가 비어 있음
+        expected = self.sensor_count_spin.value() or None
+        
+        def action(comm, is_cancelled, report):
+            comm.set_stx_etx(*framing)
+            return BusDiscovery(comm, prestring).discover(port, ids, is_cancelled, report, expected)
+        
+        self.bus.submit_action(action, "Discovery", tag="discovery")
+        self.discover_btn.setEnabled(False)
+        count = expected if expected is not None else "unknown"
+        self.log_message("INFO", f"Discovery started on {port} ({len(ids)} IDs, {count} sensor(s) expected)")
+        self.status_bar.showMessage("Discovering devices...")
+    
+    def auto_tune_link(self):
+        """통신 속도, 응답 타임아웃, 프레임 간격 자동 튜닝"""
+        if not self.bus:
+            QMessageBox.warning(self, "Warning", "Not connected to device.")
+            return
+        
+        id_text = self.id_input.text().strip()
+        default_id = f"{self.prestring_input.text()}{int(id_text):06d}" if id_text.isdigit() else ""
+        device_id, ok = QInputDialog.getText(
+            self, "Auto-Tune", "질의할 센서 ID (PRE + ID, 비우면 I 브로드캐스트):", text=default_id)
+        if not ok:
+            return
+        
+        port = self.comm.port
+        framing = self.current_framing()
+        query = device_id.strip() + "A00" if device_id.strip() else BROADCAST_ID_QUERY
+        
+        def action(comm, is_cancelled, report):
+            comm.set_stx_etx(*framing)
+            original = comm.baudrate
+            
+            def exchange(timeout):
+                response = comm.send_query(query, timeout)
+                return bool(response) and comm.parse_structured_response(response) is not None
+            
+            def set_baudrate(baudrate):
+                comm.serial_connection.baudrate = baudrate
+                comm.baudrate = baudrate
+                comm.serial_connection.reset_input_buffer()
+            
+            profile = LinkTuner(exchange, set_baudrate).tune(port, is_cancelled, report)
+            if profile is None:
+                set_baudrate(original)
+            else:
+                save_profile(profile)
+            return profile
+        
+        self.bus.submit_action(action, "Auto-tune", tag="tune")
+        self.tune_btn.setEnabled(False)
+        self.log_message("INFO", f"Auto-tune started on {port} with query {query}")
+        self.status_bar.showMessage("Tuning link...")
+    
+    def on_tune_finished(self, result: BusResult):
+        """자동 튜닝 완료 처리"""
+        self.tune_btn.setEnabled(True)
+        self.status_bar.showMessage("Ready")
+        if result.error:
+            self.log_message("ERROR", result.error)
+        elif result.payload is None:
+            self.log_message("ERROR", "Auto-tune failed: no baudrate answered every query")
+        else:
+            self.apply_link_profile(result.payload)
+    
+    def apply_link_profile(self, profile):
+        """튜닝 결과를 현재 연결에 적용"""
+        self.comm.timeout = profile.timeout
+        if self.bus:
+            self.bus.inter_frame_gap = profile.inter_frame_gap
+        self.baudrate_combo.setCurrentText(str(profile.baudrate))
+        self.log_message("PARSED", f"Link profile: {profile.baudrate} baud, "
+                                   f"timeout {profile.timeout * 1000:.0f}ms, "
+                                   f"gap {profile.inter_frame_gap * 1000:.0f}ms "
+                                   f"(latency p50 {profile.latency_p50 * 1000:.1f}ms, "
+                                   f"max {profile.latency_max * 1000:.1f}ms)")
+    
+    def on_job_progress(self, job_id, message):
+        """작업 진행 메시지 표시"""
+        self.log_message("INFO", message)
+    
+    def on_discovery_finished(self, result: BusResult):
+        """탐색 완료 처리"""
+        self.discover_btn.setEnabled(True)
+        self.status_bar.showMessage("Ready")
+        if result.error:
+            self.log_message("ERROR", result.error)
+            return
+        discovery = result.payload
+        if discovery is None:
+            self.log_message("INFO", "Discovery cancelled")
+            return
+        
+        ids_text = ", ".join(discovery.device_ids) or "none"
+        state = " (cancelled)" if discovery.cancelled else ""
+        self.log_message("PARSED", f"Discovered {len(discovery.device_ids)} device(s) via "
+                                   f"{discovery.method} in {discovery.elapsed:.2f}s, "
+                                   f"{discovery.probes} queries{state}: {ids_text}")
+    
+    def on_queue_size_changed(self, size):
+        """대기 중인 명령 수 표시"""
+        if size:
+            self.status_bar.showMessage(f"Sending command... ({size} queued)")
     
     def on_response_received(self, command, response):
         """응답 수신 처리"""
@@ -770,6 +1038,7 @@ Length: {preview_with_checksum['command_length']} bytes
         if self.comm:
             parsed = self.comm.parse_structured_response(response)
             if parsed and 'parsed_data' in parsed:
+                self.record_result(parsed)
                 self.display_parsed_data(parsed['parsed_data'], parsed['cmd'])
         
         self.status_bar.showMessage("Ready")
@@ -779,6 +1048,68 @@ Length: {preview_with_checksum['command_length']} bytes
         self.log_message("ERROR", error_msg)
         self.status_bar.showMessage("Error occurred")
     
+    def record_result(self, parsed, timestamp=None):
+        """
+        해석된 응답을 결과 저장소에 추가합니다.
+        
+        Args:
+            parsed: parse_structured_response()의 결과
+            timestamp: 수신 시각 (None이면 현재 시각)
+        """
+        self.results.add(time.time() if timestamp is None else timestamp,
+                         parsed.get('pre', ''), parsed.get('cmd', ''),
+                         parsed.get('parsed_data', {}))
+    
+    def toggle_results_recording(self):
+        """해석된 응답의 CMD별 CSV 증분 기록 시작/중지"""
+        if self.results.is_recording:
+            self.results.stop_csv()
+            self.results_flush_timer.stop()
+            self.record_btn.setText("Record CSV...")
+            self.log_message("INFO", "Results recording stopped")
+            return
+        
+        from PyQt6.QtWidgets import QFileDialog
+        
+        directory = QFileDialog.getExistingDirectory(self, "Record Results To")
+        if not directory:
+            return
+        try:
+            self.results.start_csv(directory)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to start recording: {str(e)}")
+            return
+        self.results_flush_timer.start(1000)
+        self.record_btn.setText("Stop Recording")
+        self.log_message("INFO", f"Recording results to {directory}/rs485_results_<CMD>.csv")
+    
+    def export_results(self):
+        """저장소의 결과를 열 단위 바이너리(.rscol) 또는 CMD별 CSV로 저장"""
+        if not len(self.results):
+            QMessageBox.information(self, "Info", "No parsed results to export.")
+            return
+        
+        from PyQt6.QtWidgets import QFileDialog
+        
+        filename, selected = QFileDialog.getSaveFileName(
+            self, "Export Results", "rs485_results.rscol",
+            "Columnar Results (*.rscol);;CSV per CMD (*.csv)"
+        )
+        if not filename:
+            return
+        try:
+            if selected.startswith("CSV") or filename.lower().endswith(".csv"):
+                directory, base = os.path.split(filename)
+                paths = self.results.export_csv(directory or ".", os.path.splitext(base)[0])
+                saved = ", ".join(os.path.basename(path) for path in paths)
+            else:
+                self.results.save_columnar(filename)
+                saved = filename
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to export results: {str(e)}")
+            return
+        self.log_message("INFO", f"{len(self.results)} results exported to {saved}")
+    
     def display_parsed_data(self, parsed_data, cmd):
         """파싱된 데이터를 로그에 표시"""
         if cmd == 'A':
@@ -857,28 +1188,9 @@ Length: {preview_with_checksum['command_length']} bytes
         """로그 메시지 추가"""
         timestamp = time.strftime("%H:%M:%S")
         
-        # 메시지 타입별 색상
-        if msg_type == "SEND":
-            color = "blue"
-        elif msg_type == "RECV":
-            color = "green"
-        elif msg_type == "ERROR":
-            color = "red"
-        elif msg_type == "PREVIEW":
-            color = "purple"
-        elif msg_type == "PARSED":
-            color = "darkgreen"
-        else:  # INFO
-            color = "black"
-        
-        formatted_msg = f'<span style="color: {color};"><b>[{timestamp}] {msg_type}:</b> {message}</span>'
-        
-        self.log_text.append(formatted_msg)
-        
-        # 자동으로 마지막 줄로 스크롤
-        cursor = self.log_text.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.log_text.setTextCursor(cursor)
+        # 색상은 로그 뷰 델리게이트가 메시지 타입별로 적용
+        # 화면 반영과 스크롤은 로그 뷰가 타이머로 모아서 처리
+        self.log_text.append_line(f"[{timestamp}] {msg_type}: {message}", msg_type)
     
     def clear_log(self):
         """로그 클리어"""
@@ -896,8 +1208,8 @@ Length: {preview_with_checksum['command_length']} bytes
         if filename:
             try:
                 with open(filename, 'w', encoding='utf-8') as f:
-                    # HTML 태그 제거하고 저장
-                    plain_text = self.log_text.toPlainText()
+                    # 화면에 보관 중인 로그 저장 (전체 기록은 logs/rs485_gui.log)
+                    plain_text = self.log_text.to_plain_text()
                     f.write(plain_text)
                 
                 self.log_message("INFO", f"Log saved to {filename}")
@@ -915,6 +1227,11 @@ Length: {preview_with_checksum['command_length']} bytes
         """프로그램 종료시 연결 해제"""
         if self.comm and self.comm.is_connected():
             self.disconnect_device()
+        if self.multi_port_dialog is not None:
+            self.multi_port_dialog.stop_polling()
+        stop_capture()
+        self.results.close()
+        self.log_text.close_log_file()
         event.accept()
 
 def main():
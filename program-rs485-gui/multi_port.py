@@ -0,0 +1,236 @@
+"""
+다중 포트 RS485 동시 폴링 모듈
+
+USB-RS485 어댑터(버스)마다 폴링 스레드를 하나씩 두고 각 버스를 독립적으로
+라운드로빈 질의합니다. 버스끼리는 서로 기다리지 않으므로 전체 처리량이 버스
+수에 비례하며, 모든 결과는 하나의 큐로 모아 시각 순서의 단일 스트림으로
+꺼냅니다.
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from rs485_communication import RS485Communication
+
+DEFAULT_FRAMING = ("@#T", "Q", "@#J", "Q")  # (stx, etx, recv_stx, recv_etx)
+
+
+@dataclass
+class PortConfig:
+    """버스 한 개의 폴링 설정"""
+    port: str
+    device_ids: List[str]  # PRE + 6자리 ID (10자리)
+    baudrate: int = 19200
+    templates: List[str] = field(default_factory=lambda: ["A00"])  # CMD + POST
+    timeout: float = 0.1  # 질의 한 개의 응답 대기 시간 (초)
+    inter_frame_gap: float = 0.002  # 응답 수신 후 다음 질의까지의 간격 (초)
+    cycle_interval: float = 0.0  # 한 사이클의 최소 주기 (초, 0이면 최대 속도)
+    framing: Tuple[str, str, str, str] = DEFAULT_FRAMING
+
+
+@dataclass
+class PollSample:
+    """질의 한 개의 결과"""
+    timestamp: float  # 응답 수신 시각 (time.time())
+    port: str
+    device_id: str
+    query: str
+    cmd: str = ""
+    data_string: str = ""
+    parsed_data: Dict[str, object] = field(default_factory=dict)
+    error: Optional[str] = None
+    elapsed: float = 0.0  # 전송부터 응답 완료까지 (초)
+
+
+@dataclass
+class PortStats:
+    """버스별 누적 통계"""
+    sent: int = 0
+    ok: int = 0
+    errors: int = 0
+    cycles: int = 0
+    started: float = 0.0
+    last_error: str = ""
+    running: bool = False
+
+    def rate(self) -> float:
+        """시작 후 초당 성공 응답 수를 반환합니다."""
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        return self.ok / elapsed if elapsed > 0 else 0.0
+
+
+class PortPoller(threading.Thread):
+    """버스 한 개를 독점하여 라운드로빈 질의하는 스레드"""
+
+    def __init__(self, config: PortConfig, output: "queue.Queue[PollSample]"):
+        """
+        폴링 스레드를 초기화합니다.
+
+        Args:
+            config: 버스 폴링 설정
+            output: 결과를 넣을 공유 큐
+        """
+        super().__init__(name=f"PortPoller-{config.port}", daemon=True)
+        self.config = config
+        self.output = output
+        self.stats = PortStats()
+        self._stop_event = threading.Event()
+        # 질의 목록은 한 번만 생성
+        self.queries = [(device_id, device_id + template)
+                        for device_id in config.device_ids for template in config.templates]
+
+    def stop(self) -> None:
+        """폴링을 멈추도록 요청합니다 (진행 중인 질의는 끝까지 처리)."""
+        self._stop_event.set()
+
+    def run(self):
+        config = self.config
+        stx, etx, recv_stx, recv_etx = config.framing
+        comm = RS485Communication(port=config.port, baudrate=config.baudrate,
+                                  timeout=config.timeout, stx=stx, etx=etx,
+                                  recv_stx=recv_stx, recv_etx=recv_etx)
+        if not comm.connect():
+            self.stats.last_error = f"Failed to connect to {config.port}"
+            self.output.put(PollSample(time.time(), config.port, "", "",
+                                       error=self.stats.last_error))
+            return
+
+        # 프레이밍이 고정이므로 전송 패킷을 한 번만 만들어 사이클마다 재사용
+        packets = comm.prebuild_schedule([query for _, query in self.queries])
+        schedule = [(device_id, query, packet)
+                    for (device_id, query), packet in zip(self.queries, packets)]
+
+        self.stats.running = True
+        self.stats.started = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                cycle_start = time.monotonic()
+                for index, (device_id, query, packet) in enumerate(schedule):
+                    if self._stop_event.is_set():
+                        break
+                    if index and config.inter_frame_gap > 0:
+                        self._stop_event.wait(config.inter_frame_gap)
+                    self.output.put(self.poll(comm, device_id, query, packet))
+                self.stats.cycles += 1
+
+                # 다음 사이클까지 대기 (중지 요청 시 바로 깨어남)
+                remaining = cycle_start + config.cycle_interval - time.monotonic()
+                if remaining > 0:
+                    self._stop_event.wait(remaining)
+                elif config.inter_frame_gap > 0:
+                    self._stop_event.wait(config.inter_frame_gap)
+        finally:
+            comm.disconnect()
+            self.stats.running = False
+
+    def poll(self, comm: RS485Communication, device_id: str, query: str,
+             packet: bytes) -> PollSample:
+        """
+        질의 한 개를 보내고 응답을 해석합니다.
+
+        Args:
+            comm: 이 스레드가 연 통신 객체
+            device_id: PRE + 6자리 ID
+            query: 결과에 기록할 쿼리 (체크섬 제외)
+            packet: prebuild_schedule()로 만든 전송 패킷
+
+        Returns:
+            PollSample: 해석 결과 (실패 시 error 설정)
+        """
+        self.stats.sent += 1
+        started = time.monotonic()
+        try:
+            response = comm.exchange(packet, self.config.timeout)
+        except Exception as e:
+            response = None
+            error = f"Communication error: {e}"
+        else:
+            error = None if response else "No response"
+        sample = PollSample(time.time(), self.config.port, device_id, query,
+                            elapsed=time.monotonic() - started)
+
+        if response:
+            parsed = comm.parse_structured_response(response)
+            if parsed is None:
+                error = "Bad frame"
+            else:
+                sample.cmd = parsed.get('cmd', '')
+                sample.data_string = parsed.get('data_string', '')
+                sample.parsed_data = parsed.get('parsed_data', {})
+
+        if error:
+            sample.error = error
+            self.stats.errors += 1
+            self.stats.last_error = error
+        else:
+            self.stats.ok += 1
+        return sample
+
+
+class MultiPortManager:
+    """여러 버스의 폴링 스레드를 관리하고 결과를 하나의 스트림으로 합치는 클래스"""
+
+    def __init__(self):
+        self.output: "queue.Queue[PollSample]" = queue.Queue()
+        self.pollers: Dict[str, PortPoller] = {}
+
+    def add_port(self, config: PortConfig) -> None:
+        """
+        폴링할 버스를 추가합니다 (start() 전에 호출).
+
+        Args:
+            config: 버스 폴링 설정
+
+        Raises:
+            ValueError: 같은 포트가 이미 추가된 경우
+        """
+        if config.port in self.pollers:
+            raise ValueError(f"Port already added: {config.port}")
+        self.pollers[config.port] = PortPoller(config, self.output)
+
+    def start(self) -> None:
+        """모든 버스의 폴링을 시작합니다."""
+        for poller in self.pollers.values():
+            poller.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        모든 폴링을 멈추고 스레드 종료를 기다립니다.
+
+        Args:
+            timeout: 스레드 하나당 최대 대기 시간 (초)
+        """
+        for poller in self.pollers.values():
+            poller.stop()
+        for poller in self.pollers.values():
+            if poller.is_alive():
+                poller.join(timeout)
+
+    def is_running(self) -> bool:
+        """폴링 중인 스레드가 있는지 반환합니다."""
+        return any(poller.is_alive() for poller in self.pollers.values())
+
+    def drain(self, max_items: Optional[int] = None) -> List[PollSample]:
+        """
+        지금까지 모인 결과를 수신 시각 순서로 꺼냅니다.
+
+        Args:
+            max_items: 한 번에 꺼낼 최대 개수 (None이면 전부)
+
+        Returns:
+            list: 시각 순서로 정렬된 PollSample 목록
+        """
+        samples = []
+        while max_items is None or len(samples) < max_items:
+            try:
+                samples.append(self.output.get_nowait())
+            except queue.Empty:
+                break
+        samples.sort(key=lambda sample: sample.timestamp)
+        return samples
+
+    def stats(self) -> Dict[str, PortStats]:
+        """포트별 통계를 반환합니다."""
+        return {port: poller.stats for port, poller in self.pollers.items()}
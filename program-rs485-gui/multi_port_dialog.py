@@ -0,0 +1,341 @@
+"""
+다중 포트 폴링 다이얼로그 모듈
+
+포트별 ID/명령 설정을 표로 입력받아 MultiPortManager로 동시에 폴링하고,
+모든 버스의 결과를 하나의 시각 순서 스트림과 장치별 최신값 표로 보여줍니다.
+"""
+import csv
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QSpinBox, QDoubleSpinBox, QTableWidget,
+                             QTableWidgetItem, QFileDialog, QMessageBox, QHeaderView)
+import serial.tools.list_ports
+
+from batch_dialog import parse_id_spec
+from link_tuning import load_profile
+from multi_port import MultiPortManager, PollSample, PortConfig
+
+STREAM_COLUMNS = ["timestamp", "port", "id", "query", "status", "elapsed_ms", "cmd", "data_string"]
+
+
+def sample_row(sample: PollSample) -> Dict[str, object]:
+    """
+    PollSample을 표/CSV 한 행으로 펼칩니다.
+
+    Args:
+        sample: 질의 결과
+
+    Returns:
+        dict: STREAM_COLUMNS 항목과 parsed_data의 각 항목
+    """
+    row: Dict[str, object] = {
+        'timestamp': time.strftime("%H:%M:%S", time.localtime(sample.timestamp))
+                     + f".{int(sample.timestamp * 1000) % 1000:03d}",
+        'port': sample.port,
+        'id': sample.device_id,
+        'query': sample.query,
+        'status': sample.error or "ok",
+        'elapsed_ms': round(sample.elapsed * 1000.0, 1),
+        'cmd': sample.cmd,
+        'data_string': sample.data_string,
+    }
+    row.update(sample.parsed_data)
+    return row
+
+
+class MultiPortDialog(QDialog):
+    """다중 포트 동시 폴링 다이얼로그"""
+
+    PORT_COLUMNS = ["Port", "Baudrate", "IDs", "Commands"]
+    LATEST_BASE_COLUMNS = ["timestamp", "port", "id", "status", "elapsed_ms", "samples", "errors"]
+
+    def __init__(self, main_window, max_stream_rows: int = 100000):
+        """
+        다이얼로그를 초기화합니다.
+
+        Args:
+            main_window: 로그 출력과 현재 프레이밍을 제공하는 RS485GUI
+            max_stream_rows: 메모리에 보관할 통합 스트림 최대 행 수
+        """
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.manager = None
+        self.stream: Deque[Dict[str, object]] = deque(maxlen=max_stream_rows)
+        self.stream_columns: List[str] = list(STREAM_COLUMNS)
+        self.latest: Dict[Tuple[str, str], Dict[str, object]] = {}  # (port, id) -> 최신 행
+        self.latest_rows: Dict[Tuple[str, str], int] = {}  # (port, id) -> 표 행 번호
+        self.latest_columns: List[str] = list(self.LATEST_BASE_COLUMNS)
+
+        self.drain_timer = QTimer(self)
+        self.drain_timer.setInterval(100)
+        self.drain_timer.timeout.connect(self.drain_results)
+        self.init_ui()
+
+    def init_ui(self):
+        """UI 초기화"""
+        self.setWindowTitle("Multi-Port Polling")
+        self.resize(1000, 600)
+        layout = QVBoxLayout()
+
+        # 포트별 설정 표
+        self.port_table = QTableWidget(0, len(self.PORT_COLUMNS))
+        self.port_table.setHorizontalHeaderLabels(self.PORT_COLUMNS)
+        self.port_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.port_table.setMaximumHeight(150)
+        layout.addWidget(self.port_table)
+
+        port_btn_layout = QHBoxLayout()
+        self.add_port_btn = QPushButton("Add Port")
+        self.add_port_btn.clicked.connect(self.add_port_row)
+        port_btn_layout.addWidget(self.add_port_btn)
+        self.remove_port_btn = QPushButton("Remove Port")
+        self.remove_port_btn.clicked.connect(self.remove_port_row)
+        port_btn_layout.addWidget(self.remove_port_btn)
+        port_btn_layout.addStretch()
+        layout.addLayout(port_btn_layout)
+
+        option_layout = QHBoxLayout()
+        option_layout.addWidget(QLabel("PRE:"))
+        self.prestring_input = QLineEdit("JW17")
+        self.prestring_input.setFixedWidth(80)
+        option_layout.addWidget(self.prestring_input)
+
+        # 튜닝 프로파일이 있는 포트는 프로파일 값 사용
+        option_layout.addWidget(QLabel("타임아웃(ms):"))
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(10, 5000)
+        self.timeout_spin.setValue(100)
+        option_layout.addWidget(self.timeout_spin)
+
+        option_layout.addWidget(QLabel("프레임 간격(ms):"))
+        self.gap_spin = QDoubleSpinBox()
+        self.gap_spin.setRange(0.0, 1000.0)
+        self.gap_spin.setDecimals(1)
+        self.gap_spin.setValue(2.0)
+        option_layout.addWidget(self.gap_spin)
+
+        option_layout.addWidget(QLabel("사이클 주기(ms):"))
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(0, 3600000)
+        self.interval_spin.setValue(0)
+        option_layout.addWidget(self.interval_spin)
+
+        self.start_btn = QPushButton("Start")
+        self.start_btn.clicked.connect(self.start_polling)
+        option_layout.addWidget(self.start_btn)
+
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop_polling)
+        option_layout.addWidget(self.stop_btn)
+
+        self.export_btn = QPushButton("Export CSV")
+        self.export_btn.clicked.connect(self.export_csv)
+        option_layout.addWidget(self.export_btn)
+        option_layout.addStretch()
+        layout.addLayout(option_layout)
+
+        # 장치별 최신값 표 (행 수가 장치 수로 고정되어 장시간 폴링에도 가벼움)
+        self.latest_table = QTableWidget(0, len(self.latest_columns))
+        self.latest_table.setHorizontalHeaderLabels(self.latest_columns)
+        self.latest_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.latest_table)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.setLayout(layout)
+        self.add_port_row()
+
+    def add_port_row(self):
+        """포트 설정 행을 추가합니다 (아직 사용하지 않은 포트를 기본값으로)."""
+        used = {self.cell_text(row, 0) for row in range(self.port_table.rowCount())}
+        available = [port.device for port in serial.tools.list_ports.comports()
+                     if port.device not in used]
+        row = self.port_table.rowCount()
+        self.port_table.insertRow(row)
+        values = [available[0] if available else "", "19200", "1-10", "A00"]
+        for column, value in enumerate(values):
+            self.port_table.setItem(row, column, QTableWidgetItem(value))
+
+    def remove_port_row(self):
+        """선택한 포트 설정 행을 삭제합니다."""
+        row = self.port_table.currentRow()
+        if row >= 0:
+            self.port_table.removeRow(row)
+
+    def cell_text(self, row: int, column: int) -> str:
+        item = self.port_table.item(row, column)
+        return item.text().strip() if item else ""
+
+    def build_configs(self) -> List[PortConfig]:
+        """
+        포트 설정 표로 PortConfig 목록을 만듭니다.
+
+        Returns:
+            list: 포트별 폴링 설정
+
+        Raises:
+            ValueError: 입력이 잘못된 경우
+        """
+        prestring = self.prestring_input.text()
+        framing = self.main_window.current_framing()
+        main_comm = self.main_window.comm
+        configs = []
+        for row in range(self.port_table.rowCount()):
+            port = self.cell_text(row, 0)
+            if not port:
+                continue
+            if main_comm is not None and main_comm.is_connected() and main_comm.port == port:
+                raise ValueError(f"{port}는 메인 창에서 사용 중입니다")
+            baudrate = int(self.cell_text(row, 1))
+            ids = parse_id_spec(self.cell_text(row, 2))
+            templates = [t for t in self.cell_text(row, 3).replace(",", " ").split() if t]
+            if not ids or not templates:
+                raise ValueError(f"{port}: ID와 명령을 입력하세요")
+
+            timeout = self.timeout_spin.value() / 1000.0
+            gap = self.gap_spin.value() / 1000.0
+            profile = load_profile(port)
+            if profile and profile.baudrate == baudrate:
+                timeout, gap = profile.timeout, profile.inter_frame_gap
+
+            configs.append(PortConfig(
+                port=port, baudrate=baudrate,
+                device_ids=[f"{prestring}{value:06d}" for value in ids],
+                templates=templates, timeout=timeout, inter_frame_gap=gap,
+                cycle_interval=self.interval_spin.value() / 1000.0, framing=framing))
+        if not configs:
+            raise ValueError("포트를 한 개 이상 입력하세요")
+        return configs
+
+    def start_polling(self):
+        """모든 포트의 폴링을 시작합니다."""
+        try:
+            configs = self.build_configs()
+            manager = MultiPortManager()
+            for config in configs:
+                manager.add_port(config)
+        except ValueError as e:
+            QMessageBox.warning(self, "Warning", f"잘못된 입력: {e}")
+            return
+
+        self.clear_results()
+        self.manager = manager
+        self.manager.start()
+        self.drain_timer.start()
+        self.start_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        self.port_table.setEnabled(False)
+        ports = ", ".join(config.port for config in configs)
+        self.main_window.log_message("INFO", f"Multi-port polling started on {len(configs)} port(s): {ports}")
+
+    def stop_polling(self):
+        """폴링을 멈추고 남은 결과를 반영합니다."""
+        if self.manager is None:
+            return
+        self.manager.stop()
+        self.drain_timer.stop()
+        self.drain_results()
+        self.main_window.log_message("INFO", f"Multi-port polling stopped - {self.summary_label.text()}")
+        self.manager = None
+        self.start_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        self.port_table.setEnabled(True)
+
+    def drain_results(self):
+        """모인 결과를 통합 스트림과 최신값 표에 반영합니다 (타이머에서 호출)."""
+        if self.manager is None:
+            return
+        samples = self.manager.drain()
+        for sample in samples:
+            row = sample_row(sample)
+            self.stream.append(row)
+            for key in row:
+                if key not in self.stream_columns:
+                    self.stream_columns.append(key)
+            if sample.device_id:
+                self.update_latest(sample, row)
+                if sample.cmd:
+                    self.main_window.results.add(sample.timestamp, sample.device_id,
+                                                 sample.cmd, sample.parsed_data)
+            elif sample.error:
+                self.main_window.log_message("ERROR", sample.error)
+
+        stats = self.manager.stats()
+        parts = [f"{port}: {s.ok}/{s.sent} ok, {s.rate():.1f}/s" + ("" if s.running else " (stopped)")
+                 for port, s in stats.items()]
+        total_rate = sum(s.rate() for s in stats.values())
+        self.summary_label.setText(f"Total {total_rate:.1f}/s | " + " | ".join(parts))
+
+        # 모든 스레드가 끝났으면 (예: 포트 열기 실패) 자동으로 종료 처리
+        if self.drain_timer.isActive() and not self.manager.is_running() \
+                and self.manager.output.empty():
+            self.stop_polling()
+
+    def update_latest(self, sample: PollSample, row: Dict[str, object]):
+        """장치별 최신값 표의 해당 행을 갱신합니다."""
+        key = (sample.port, sample.device_id)
+        previous = self.latest.get(key, {})
+        latest = dict(previous) if sample.error else {}
+        latest.update(row)
+        latest['samples'] = previous.get('samples', 0) + 1
+        latest['errors'] = previous.get('errors', 0) + (1 if sample.error else 0)
+        self.latest[key] = latest
+
+        for column_key in latest:
+            if column_key not in self.latest_columns and column_key not in ("query", "data_string"):
+                self.latest_columns.append(column_key)
+                self.latest_table.setColumnCount(len(self.latest_columns))
+                self.latest_table.setHorizontalHeaderLabels(self.latest_columns)
+
+        index = self.latest_rows.get(key)
+        if index is None:
+            index = self.latest_table.rowCount()
+            self.latest_table.insertRow(index)
+            self.latest_rows[key] = index
+        for column, column_key in enumerate(self.latest_columns):
+            if column_key in latest:
+                self.latest_table.setItem(index, column, QTableWidgetItem(str(latest[column_key])))
+
+    def clear_results(self):
+        """이전 결과를 지웁니다."""
+        self.stream.clear()
+        self.stream_columns = list(STREAM_COLUMNS)
+        self.latest = {}
+        self.latest_rows = {}
+        self.latest_columns = list(self.LATEST_BASE_COLUMNS)
+        self.latest_table.setRowCount(0)
+        self.latest_table.setColumnCount(len(self.latest_columns))
+        self.latest_table.setHorizontalHeaderLabels(self.latest_columns)
+        self.summary_label.setText("")
+
+    def export_csv(self):
+        """통합 스트림을 시각 순서대로 CSV 파일로 저장합니다."""
+        if not self.stream:
+            QMessageBox.information(self, "Info", "No results to export.")
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self, "Export Multi-Port Stream", "rs485_multiport.csv", "CSV Files (*.csv);;All Files (*)"
+        )
+        if not filename:
+            return
+
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=self.stream_columns)
+                writer.writeheader()
+                writer.writerows(self.stream)
+            self.main_window.log_message("INFO", f"Multi-port stream saved to {filename}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export: {str(e)}")
+
+    def closeEvent(self, event):
+        """다이얼로그를 닫을 때 폴링 중지"""
+        self.stop_polling()
+        event.accept()
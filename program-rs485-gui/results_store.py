@@ -0,0 +1,410 @@
+"""
+RS485 응답 결과 저장소 모듈
+
+해석된 응답(parsed_data)을 장치 ID와 CMD별 표로 모아 열 단위 배열에 보관합니다.
+숫자 열은 array('d')(빈 값은 NaN), 문자열 열은 사전 인코딩한 array('i') 코드로
+저장하므로 장시간 폴링에도 메모리가 작고, 로그 텍스트를 다시 파싱하지 않고
+분석할 수 있습니다.
+
+출력 형식:
+    CSV: CMD별 파일(prefix_A.csv 등)에 행을 받을 때마다 이어서 기록
+        (나중에 처음 나온 필드는 열을 추가하여 파일을 다시 씀, utf-8-sig)
+    열 단위 바이너리(.rscol): 헤더 JSON + 열별 원시 배열 바이트
+        (numpy.frombuffer로 바로 읽을 수 있음, load_columnar로 복원)
+"""
+import csv
+import json
+import math
+import os
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+COLUMNAR_MAGIC = b"RSCOL1\n"
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+class _StringColumn:
+    """사전 인코딩 문자열 열 (같은 값은 한 번만 보관)"""
+
+    def __init__(self):
+        self.codes = array('i')
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def append(self, value: str) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+
+Column = Union[array, _StringColumn]
+
+
+class ResultTable:
+    """장치 하나, CMD 하나의 결과 표"""
+
+    def __init__(self, device_id: str, cmd: str):
+        """
+        결과 표를 초기화합니다.
+
+        Args:
+            device_id: PRE + 6자리 ID
+            cmd: 응답 CMD 문자
+        """
+        self.device_id = device_id
+        self.cmd = cmd
+        self.timestamps = array('d')
+        self.columns: Dict[str, Column] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def _new_column(self, value) -> Column:
+        """첫 값의 형식으로 열을 만들고 기존 행을 빈 값으로 채웁니다."""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            column: Column = array('d', [math.nan]) * len(self.timestamps)
+        else:
+            column = _StringColumn()
+            for _ in range(len(self.timestamps)):
+                column.append("")
+        return column
+
+    def append(self, timestamp: float, values: Dict[str, object]) -> None:
+        """
+        한 행을 추가합니다.
+
+        Args:
+            timestamp: 응답 수신 시각 (POSIX 초)
+            values: 필드 이름 -> 값 (숫자 또는 문자열)
+        """
+        for name, value in values.items():
+            if name not in self.columns:
+                self.columns[name] = self._new_column(value)
+
+        for name, column in self.columns.items():
+            value = values.get(name)
+            if isinstance(column, _StringColumn):
+                column.append("" if value is None else str(value))
+            elif isinstance(value, (int, float)):
+                column.append(float(value))
+            else:
+                column.append(math.nan)
+        self.timestamps.append(timestamp)
+
+    def column(self, name: str) -> Union[array, List[str]]:
+        """
+        열 전체를 반환합니다.
+
+        Args:
+            name: 필드 이름
+
+        Returns:
+            array('d') (숫자 열) 또는 문자열 목록
+        """
+        column = self.columns[name]
+        if isinstance(column, _StringColumn):
+            return [column.values[code] for code in column.codes]
+        return column
+
+    def row(self, index: int) -> Dict[str, object]:
+        """index번째 행을 딕셔너리로 반환합니다 (빈 값은 생략)."""
+        result: Dict[str, object] = {}
+        for name, column in self.columns.items():
+            value = column[index]
+            if isinstance(column, _StringColumn):
+                if value != "":
+                    result[name] = value
+            elif not math.isnan(value):
+                result[name] = value
+        return result
+
+
+class ResultsStore:
+    """장치 ID/CMD별 결과 표 모음"""
+
+    def __init__(self):
+        self.tables: Dict[Tuple[str, str], ResultTable] = {}
+        self._csv_directory: Optional[str] = None
+        self._csv_prefix = ""
+        self._csv_files: Dict[str, Tuple[TextIO, csv.writer, List[str]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self.tables.values())
+
+    def add(self, timestamp: float, device_id: str, cmd: str,
+            parsed_data: Dict[str, object]) -> None:
+        """
+        해석된 응답 하나를 추가합니다 (CSV 기록 중이면 파일에도 추가).
+
+        Args:
+            timestamp: 응답 수신 시각 (POSIX 초)
+            device_id: 응답의 PRE (PRE + 6자리 ID)
+            cmd: 응답 CMD 문자
+            parsed_data: 해석된 필드 딕셔너리
+        """
+        key = (device_id, cmd)
+        table = self.tables.get(key)
+        if table is None:
+            table = self.tables[key] = ResultTable(device_id, cmd)
+        table.append(timestamp, parsed_data)
+        if self._csv_directory is not None:
+            self._write_csv_row(timestamp, device_id, cmd, parsed_data)
+
+    def table(self, device_id: str, cmd: str) -> Optional[ResultTable]:
+        """장치와 CMD에 해당하는 표를 반환합니다 (없으면 None)."""
+        return self.tables.get((device_id, cmd))
+
+    def iter_rows(self, cmd: str) -> Iterator[Dict[str, object]]:
+        """
+        CMD 하나의 모든 행을 장치 ID, 시각 순서로 순회합니다.
+
+        Args:
+            cmd: 응답 CMD 문자
+
+        Yields:
+            dict: timestamp, pre(장치 ID)와 필드 값
+        """
+        for (device_id, table_cmd), table in sorted(self.tables.items()):
+            if table_cmd != cmd:
+                continue
+            for index in range(len(table)):
+                row: Dict[str, object] = {'timestamp': table.timestamps[index],
+                                          'pre': device_id}
+                row.update(table.row(index))
+                yield row
+
+    def clear(self) -> None:
+        """메모리의 결과를 모두 지웁니다 (CSV 기록은 유지)."""
+        self.tables = {}
+
+    # --- 증분 CSV 기록 ---
+
+    def start_csv(self, directory: str, prefix: str = "rs485_results") -> None:
+        """
+        이후 추가되는 결과를 CMD별 CSV 파일(prefix_CMD.csv)에 이어서 기록합니다.
+
+        Args:
+            directory: CSV 파일을 만들 디렉터리
+            prefix: 파일 이름 접두사
+        """
+        self.stop_csv()
+        os.makedirs(directory, exist_ok=True)
+        self._csv_directory = directory
+        self._csv_prefix = prefix
+
+    def _csv_path(self, cmd: str) -> str:
+        return os.path.join(self._csv_directory, f"{self._csv_prefix}_{cmd}.csv")
+
+    def _open_csv(self, cmd: str, fields: List[str]) -> Tuple[TextIO, csv.writer, List[str]]:
+        """
+        CMD의 CSV 파일을 이어 쓰기로 엽니다.
+
+        Args:
+            cmd: 응답 CMD 문자
+            fields: 새 파일의 필드 열 (기존 파일이면 그 헤더의 열 구성을 따름)
+
+        Returns:
+            tuple: (파일, csv.writer, 필드 열 목록)
+        """
+        path = self._csv_path(cmd)
+        header: List[str] = []
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                header = next(csv.reader(f), [])
+        # 한글 코드 표시값이 엑셀에서도 보이도록 export_csv와 같은 utf-8-sig
+        # (이어 쓰기에서는 BOM을 다시 쓰지 않음)
+        f = open(path, 'a', newline='', encoding='utf-8-sig')
+        writer = csv.writer(f)
+        if header:
+            fields = header[2:]
+        else:
+            writer.writerow(['timestamp', 'pre'] + fields)
+        entry = self._csv_files[cmd] = (f, writer, fields)
+        return entry
+
+    def _add_csv_columns(self, cmd: str, new_fields: List[str]) -> Tuple[TextIO, csv.writer, List[str]]:
+        """나중에 처음 나온 필드를 열로 추가합니다 (새 헤더로 파일을 다시 씀)."""
+        f, _, fields = self._csv_files.pop(cmd)
+        f.close()
+        fields = fields + new_fields
+        width = len(fields) + 2
+        path = self._csv_path(cmd)
+        tmp_path = f"{path}.tmp"
+        with open(path, newline='', encoding='utf-8-sig') as src, \
+                open(tmp_path, 'w', newline='', encoding='utf-8-sig') as dst:
+            reader = csv.reader(src)
+            next(reader, None)
+            writer = csv.writer(dst)
+            writer.writerow(['timestamp', 'pre'] + fields)
+            for row in reader:
+                writer.writerow(row + [""] * (width - len(row)))
+        os.replace(tmp_path, path)
+        return self._open_csv(cmd, fields)
+
+    def _write_csv_row(self, timestamp: float, device_id: str, cmd: str,
+                       parsed_data: Dict[str, object]) -> None:
+        entry = self._csv_files.get(cmd)
+        if entry is None:
+            entry = self._open_csv(cmd, list(parsed_data))
+        new_fields = [name for name in parsed_data if name not in entry[2]]
+        if new_fields:
+            entry = self._add_csv_columns(cmd, new_fields)
+        _, writer, fields = entry
+        writer.writerow([f"{timestamp:.3f}", device_id] + [parsed_data.get(name, "") for name in fields])
+
+    def flush_csv(self) -> None:
+        """기록 중인 CSV 파일을 디스크로 내보냅니다."""
+        for f, _, _ in self._csv_files.values():
+            f.flush()
+
+    def stop_csv(self) -> None:
+        """CSV 기록을 끝내고 파일을 닫습니다."""
+        for f, _, _ in self._csv_files.values():
+            f.close()
+        self._csv_files = {}
+        self._csv_directory = None
+
+    @property
+    def is_recording(self) -> bool:
+        return self._csv_directory is not None
+
+    # --- 일괄 내보내기 ---
+
+    def export_csv(self, directory: str, prefix: str = "rs485_results") -> List[str]:
+        """
+        메모리의 모든 결과를 CMD별 CSV 파일로 저장합니다.
+
+        Args:
+            directory: 저장할 디렉터리
+            prefix: 파일 이름 접두사
+
+        Returns:
+            list: 만든 파일 경로 목록
+        """
+        paths = []
+        for cmd in sorted({cmd for _, cmd in self.tables}):
+            fields: List[str] = []
+            for (_, table_cmd), table in sorted(self.tables.items()):
+                if table_cmd == cmd:
+                    fields.extend(name for name in table.columns if name not in fields)
+            path = os.path.join(directory, f"{prefix}_{cmd}.csv")
+            with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.DictWriter(f, fieldnames=['timestamp', 'pre'] + fields)
+                writer.writeheader()
+                for row in self.iter_rows(cmd):
+                    row['timestamp'] = f"{row['timestamp']:.3f}"
+                    writer.writerow(row)
+            paths.append(path)
+        return paths
+
+    def save_columnar(self, path: str) -> None:
+        """
+        모든 표를 열 단위 바이너리 파일로 저장합니다.
+
+        파일 구성: COLUMNAR_MAGIC + 헤더 길이(uint32) + 헤더 JSON + 열 데이터.
+        헤더의 각 열은 type(f8/i4), offset, length를 가지며 offset은 열 데이터
+        영역 시작 기준입니다. 문자열 열은 i4 코드와 헤더의 values 목록입니다.
+
+        Args:
+            path: 저장할 파일 경로
+        """
+        blobs: List[bytes] = []
+        offset = 0
+
+        def add_blob(values: array) -> Dict[str, object]:
+            nonlocal offset
+            data = values.tobytes()
+            blobs.append(data)
+            info = {'type': 'f8' if values.typecode == 'd' else 'i4',
+                    'offset': offset, 'length': len(values)}
+            offset += len(data)
+            return info
+
+        tables = []
+        for (device_id, cmd), table in sorted(self.tables.items()):
+            columns = []
+            for name, column in table.columns.items():
+                if isinstance(column, _StringColumn):
+                    info = add_blob(column.codes)
+                    info['values'] = column.values
+                else:
+                    info = add_blob(column)
+                info['name'] = name
+                columns.append(info)
+            tables.append({'device_id': device_id, 'cmd': cmd,
+                           'timestamps': add_blob(table.timestamps), 'columns': columns})
+
+        header = json.dumps({'byteorder': _byteorder(), 'tables': tables},
+                            ensure_ascii=False).encode('utf-8')
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(COLUMNAR_MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            for data in blobs:
+                f.write(data)
+        os.replace(tmp_path, path)
+
+    def close(self) -> None:
+        """CSV 기록 파일을 닫습니다."""
+        self.stop_csv()
+
+
+def _byteorder() -> str:
+    return "little" if struct.pack("=H", 1) == b"\x01\x00" else "big"
+
+
+def load_columnar(path: str) -> ResultsStore:
+    """
+    save_columnar로 저장한 파일을 읽어 저장소를 복원합니다.
+
+    Args:
+        path: 열 단위 바이너리 파일 경로
+
+    Returns:
+        ResultsStore: 복원된 저장소
+
+    Raises:
+        ValueError: 형식이 맞지 않는 경우
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"열 단위 결과 파일이 아닙니다: {path}")
+        (header_length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+        data = f.read()
+
+    swap = header.get('byteorder', 'little') != _byteorder()
+
+    def read_blob(info: Dict[str, object]) -> array:
+        values = array('d' if info['type'] == 'f8' else 'i')
+        size = values.itemsize * info['length']
+        values.frombytes(data[info['offset']:info['offset'] + size])
+        if swap:
+            values.byteswap()
+        return values
+
+    store = ResultsStore()
+    for entry in header['tables']:
+        table = ResultTable(entry['device_id'], entry['cmd'])
+        table.timestamps = read_blob(entry['timestamps'])
+        for info in entry['columns']:
+            if 'values' in info:
+                column = _StringColumn()
+                column.codes = read_blob(info)
+                column.values = list(info['values'])
+                column._index = {value: code for code, value in enumerate(column.values)}
+                table.columns[info['name']] = column
+            else:
+                table.columns[info['name']] = read_blob(info)
+        store.tables[(table.device_id, table.cmd)] = table
+    return store
@@ -1,9 +1,83 @@
 import serial
 import time
 import logging
-from typing import Optional, Union, Dict
+from dataclasses import dataclass
+from typing import Optional, Union, Dict, List, Sequence
+from frame_schema import FieldError, FieldSpec, FrameSchema, compile_schemas, split_frame
+from frame_capture import RX, TX, capture_frame
+
+
+def _finalize_e(data_string: str, result: dict) -> None:
+    if 'connection_status' in result:
+        result['status_message'] = f"연결상태가 {result['connection_status']}으로 설정되어 있습니다"
+
+
+def _finalize_f(data_string: str, result: dict) -> None:
+    # 숫자가 아니면 원문을 함께 보관
+    if 'relay_off_time' not in result:
+        result['relay_off_time'] = 0
+        result['relay_off_time_str'] = data_string
+
+
+def _finalize_g(data_string: str, result: dict) -> None:
+    if 'temperature_compensation' in result:
+        result['status_message'] = f"온도보상 설정이 {result['temperature_compensation']}으로 되어있습니다"
+
+
+def _finalize_i(data_string: str, result: dict) -> None:
+    result['id_length'] = len(data_string)
+
+
+# CMD별 응답 데이터 스키마
+RESPONSE_SCHEMAS = (
+    # 3 05822 2 32748 2 32910 1 30001 B 01133 C 00309
+    FrameSchema('A', (
+        FieldSpec('displacement', 5, tag='3', divisor=100.0),       # 05822 -> 58.22
+        FieldSpec('x_angle_lsb', 5, tag='2'),
+        FieldSpec('y_angle_lsb', 5, tag='2'),
+        FieldSpec('temperature', 5, tag='1', offset=32767, divisor=100.0),  # (32767 - raw) / 100
+        FieldSpec('voltage', 5, tag='B', divisor=100.0),            # 01133 -> 11.33V
+        FieldSpec('current_ma', 5, tag='C', divisor=10.0),          # 00309 -> 30.9mA
+    ), optional_tags=True),  # 변위계/각도 센서를 끈 장치는 해당 필드가 빠짐 (C 명령 설정)
+    # d.dd d d d d d.ddd d d d
+    FrameSchema('C', (
+        FieldSpec('version', 4, kind='float'),
+        FieldSpec('sensor_type', 1, kind='code',
+                  choices={0: "MPU6050", 1: "ISM330DHCX", 2: "SCL3300-D01", 9: "없음"}),
+        FieldSpec('termination_relay', 1, kind='code', choices={1: "연결"}, default="끊김"),
+        FieldSpec('temperature_compensation', 1, kind='code', choices={1: "on"}, default="off"),
+        FieldSpec('displacement_status', 1, kind='code', choices={1: "정상"}, default="불량"),
+        FieldSpec('reference_voltage', 5, kind='float'),
+        FieldSpec('angle_status', 1, kind='code', choices={1: "정상"}, default="불량"),
+        FieldSpec('displacement_setting', 1, kind='code', choices={1: "on"}, default="off"),
+        FieldSpec('angle_setting', 1, kind='code', choices={1: "on"}, default="off"),
+    ), exact_length=16),
+    FrameSchema('E', (
+        FieldSpec('connection_status', 1, kind='code', choices={1: "연결"}, default="끊김"),
+    ), min_length=1, finalize=_finalize_e),
+    # F 명령만 LENGTH가 1자리 (펌웨어 버그)
+    FrameSchema('F', (FieldSpec('relay_off_time'),), length_digits=1, finalize=_finalize_f),
+    FrameSchema('G', (
+        FieldSpec('temperature_compensation', 1, kind='code', choices={1: "ON"}, default="OFF"),
+    ), min_length=1, finalize=_finalize_g),
+    FrameSchema('H', constants={'reset_status': "Reset되었습니다", 'command_type': "RESET"}),
+    FrameSchema('I', (FieldSpec('device_id', kind='str'),), finalize=_finalize_i),
+)
+
+RESPONSE_DECODERS = compile_schemas(RESPONSE_SCHEMAS)
+
+
+@dataclass(frozen=True)
+class CommandPacket:
+    """미리 만들어 둔 전송 패킷과 미리보기 정보"""
+    packet: bytes  # 그대로 write할 수 있는 패킷
+    preview: Dict[str, str]  # preview_command/preview_simple_command 형식
+
 
 class RS485Communication:
+    READ_POLL_TIMEOUT = 0.02  # 포트 read() 한 번의 최대 대기 시간 (초)
+    PACKET_CACHE_SIZE = 4096  # 캐시할 최대 패킷 수 (넘으면 비우고 다시 채움)
+
     def __init__(self, port: str = "/dev/ttyUSB0", baudrate: int = 115200, 
                  timeout: float = 1.0, stx: str = "@", etx: str = "*",
                  recv_stx: str = None, recv_etx: str = None):
@@ -28,6 +102,9 @@ class RS485Communication:
         self.RECV_STX = recv_stx or stx  # Receive STX (문자열)
         self.RECV_ETX = recv_etx or etx  # Receive ETX (문자열)
         
+        # (stx, etx, pre, query, post, 체크섬 여부) -> CommandPacket
+        self._packet_cache: Dict[tuple, CommandPacket] = {}
+        
         # 로깅 설정 (터미널 출력 제거)
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.ERROR)  # ERROR 레벨만 터미널에 출력
@@ -41,7 +118,8 @@ class RS485Communication:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=self.timeout
+                # 응답 대기는 exchange()의 deadline으로 제한하므로 read 타임아웃은 짧게
+                timeout=min(self.timeout, self.READ_POLL_TIMEOUT)
             )
             self.logger.info(f"Connected to {self.port} at {self.baudrate} baud")
             return True
@@ -85,6 +163,73 @@ class RS485Communication:
         # ASCII 2자리 16진수 문자열로 변환
         return f"{checksum:02X}"
 
+    def get_packet(self, query_string: str, prestring: str = "", poststring: str = "",
+                   use_checksum: bool = True) -> CommandPacket:
+        """
+        전송 패킷과 미리보기 정보를 반환합니다 (같은 프레이밍/질의는 캐시에서 반환).
+        
+        Args:
+            query_string: 전송할 쿼리 문자열 (메인 명령)
+            prestring: STX 다음에 올 공통 접두사 (선택적)
+            poststring: 쿼리 다음에 올 공통 접미사 (선택적)
+            use_checksum: 체크섬 포함 여부
+            
+        Returns:
+            CommandPacket: 완성된 패킷과 미리보기 딕셔너리
+        """
+        key = (self.STX, self.ETX, prestring, query_string, poststring, use_checksum)
+        cached = self._packet_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # STX + PRESTRING + query-string + POSTSTRING 결합
+        stx_and_data = self.STX + prestring + query_string + poststring
+        if use_checksum:
+            # 체크섬 계산 (STX + PRESTRING + query-string + POSTSTRING에 대해)
+            checksum_str = self.calculate_checksum(stx_and_data)
+            # 최종 패킷: STX + PRESTRING + query-string + POSTSTRING + CHECKSUM + ETX
+            full_command = stx_and_data + checksum_str + self.ETX
+        else:
+            checksum_str = 'N/A'
+            full_command = stx_and_data + self.ETX
+        command_bytes = full_command.encode('utf-8')
+        
+        preview = {
+            'stx': self.STX,
+            'prestring': prestring,
+            'query_string': query_string,
+            'poststring': poststring,
+            'etx': self.ETX,
+            'checksum': checksum_str,
+            'full_command': full_command,
+            'full_command_hex': command_bytes.hex().upper(),
+            'command_length': str(len(command_bytes))
+        }
+        if use_checksum:
+            preview['stx_and_data'] = stx_and_data
+        
+        if len(self._packet_cache) >= self.PACKET_CACHE_SIZE:
+            self._packet_cache.clear()
+        packet = CommandPacket(command_bytes, preview)
+        self._packet_cache[key] = packet
+        return packet
+    
+    def prebuild_schedule(self, queries: Sequence[str], use_checksum: bool = True) -> List[bytes]:
+        """
+        폴링할 질의 목록의 패킷을 미리 만듭니다.
+        
+        반환된 패킷은 exchange()에 바로 넘길 수 있으며, 프레이밍을 바꾸면
+        다시 만들어야 합니다.
+        
+        Args:
+            queries: 쿼리 문자열 목록
+            use_checksum: 체크섬 포함 여부
+            
+        Returns:
+            list: 질의 순서대로의 전송 패킷
+        """
+        return [self.get_packet(query, use_checksum=use_checksum).packet for query in queries]
+
     def build_simple_command(self, query_string: str, prestring: str = "", poststring: str = "") -> bytes:
         """
         STX + PRESTRING + query-string + POSTSTRING + ETX 형태의 명령 패킷 생성 (체크섬 없음)
@@ -97,10 +242,7 @@ class RS485Communication:
         Returns:
             완성된 명령 패킷 (bytes)
         """
-        # STX + PRESTRING + query-string + POSTSTRING + ETX
-        full_command = self.STX + prestring + query_string + poststring + self.ETX
-        
-        return full_command.encode('utf-8')
+        return self.get_packet(query_string, prestring, poststring, use_checksum=False).packet
 
     def build_command(self, query_string: str, prestring: str = "", poststring: str = "") -> bytes:
         """
@@ -114,16 +256,7 @@ class RS485Communication:
         Returns:
             완성된 명령 패킷 (bytes)
         """
-        # STX + PRESTRING + query-string + POSTSTRING 결합
-        stx_and_data = self.STX + prestring + query_string + poststring
-        
-        # 체크섬 계산 (STX + PRESTRING + query-string + POSTSTRING에 대해)
-        checksum_str = self.calculate_checksum(stx_and_data)
-        
-        # 최종 패킷: STX + PRESTRING + query-string + POSTSTRING + CHECKSUM + ETX
-        full_command = stx_and_data + checksum_str + self.ETX
-        
-        return full_command.encode('utf-8')
+        return self.get_packet(query_string, prestring, poststring).packet
     
     def preview_simple_command(self, query_string: str, prestring: str = "", poststring: str = "") -> Dict[str, str]:
         """
@@ -137,21 +270,8 @@ class RS485Communication:
         Returns:
             명령 정보를 담은 딕셔너리
         """
-        # STX + PRESTRING + query-string + POSTSTRING + ETX
-        full_command = self.STX + prestring + query_string + poststring + self.ETX
-        command_bytes = full_command.encode('utf-8')
-        
-        return {
-            'stx': self.STX,
-            'prestring': prestring,
-            'query_string': query_string,
-            'poststring': poststring,
-            'etx': self.ETX,
-            'checksum': 'N/A',
-            'full_command': full_command,
-            'full_command_hex': command_bytes.hex().upper(),
-            'command_length': str(len(command_bytes))
-        }
+        # 호출 측이 수정해도 캐시가 바뀌지 않도록 사본 반환
+        return dict(self.get_packet(query_string, prestring, poststring, use_checksum=False).preview)
     
     def preview_command(self, query_string: str, prestring: str = "", poststring: str = "") -> Dict[str, str]:
         """
@@ -165,97 +285,41 @@ class RS485Communication:
         Returns:
             명령 정보를 담은 딕셔너리
         """
-        # STX + PRESTRING + query-string + POSTSTRING 결합
-        stx_and_data = self.STX + prestring + query_string + poststring
-        
-        # 체크섬 계산
-        checksum_str = self.calculate_checksum(stx_and_data)
-        
-        # 최종 패킷
-        full_command = stx_and_data + checksum_str + self.ETX
-        command_bytes = full_command.encode('utf-8')
-        
-        return {
-            'stx': self.STX,
-            'prestring': prestring,
-            'query_string': query_string,
-            'poststring': poststring,
-            'etx': self.ETX,
-            'stx_and_data': stx_and_data,
-            'checksum': checksum_str,
-            'full_command': full_command,
-            'full_command_hex': command_bytes.hex().upper(),
-            'command_length': str(len(command_bytes))
-        }
+        return dict(self.get_packet(query_string, prestring, poststring).preview)
 
-    def send_simple_query(self, query_string: str) -> Optional[str]:
+    def send_simple_query(self, query_string: str, timeout: Optional[float] = None) -> Optional[str]:
         """
         간단한 데이터를 전송하고 응답 받기 (체크섬 없음)
         
         Args:
             query_string: 전송할 쿼리 문자열
+            timeout: 이 명령의 응답 대기 시간 (None이면 self.timeout)
             
         Returns:
             수신된 응답 문자열 또는 None (실패시)
         """
-        if not self.is_connected():
-            self.logger.error("Not connected to serial port")
-            return None
-
-        try:
-            # 간단한 명령 패킷 생성 (체크섬 없음)
-            command = self.build_simple_command(query_string)
-            
-            # 송신 버퍼 클리어
-            self.serial_connection.reset_output_buffer()
-            self.serial_connection.reset_input_buffer()
-            
-            # 데이터 전송
-            self.serial_connection.write(command)
-            self.logger.info(f"Sent (simple): {command.hex()}")
-            
-            # 응답 대기 개선
-            response = b""
-            start_time = time.time()
-            etx_bytes = self.ETX.encode('utf-8')
-            
-            # 수신용 ETX로 응답 대기
-            recv_etx_bytes = self.RECV_ETX.encode('utf-8')
-            
-            while time.time() - start_time < self.timeout:
-                try:
-                    # 1바이트씩 읽어서 수신 ETX까지 수집
-                    byte_data = self.serial_connection.read(1)
-                    if byte_data:
-                        response += byte_data
-                        # 수신 ETX를 찾으면 종료
-                        if response.endswith(recv_etx_bytes):
-                            break
-                    else:
-                        time.sleep(0.01)
-                except serial.SerialTimeoutException:
-                    continue
-            
-            if response:
-                self.logger.info(f"Received: {response.hex()}")
-                return self.parse_response(response)
-            else:
-                self.logger.warning("No response received")
-                return None
-                
-        except serial.SerialException as e:
-            self.logger.error(f"Serial communication error: {e}")
-            return None
-        except Exception as e:
-            self.logger.error(f"Unexpected error: {e}")
-            return None
+        return self.exchange(self.build_simple_command(query_string), timeout)
 
-    def send_query(self, query_string: str) -> Optional[str]:
+    def send_query(self, query_string: str, timeout: Optional[float] = None) -> Optional[str]:
         """
         데이터를 전송하고 응답 받기
         
         Args:
             query_string: 전송할 쿼리 문자열
+            timeout: 이 명령의 응답 대기 시간 (None이면 self.timeout)
+            
+        Returns:
+            수신된 응답 문자열 또는 None (실패시)
+        """
+        return self.exchange(self.build_command(query_string), timeout)
+
+    def exchange(self, command: bytes, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        완성된 패킷을 전송하고 수신 ETX까지 응답 받기
+        
+        Args:
+            command: 전송할 명령 패킷
+            timeout: 응답 대기 시간 (None이면 self.timeout)
             
         Returns:
             수신된 응답 문자열 또는 None (실패시)
@@ -264,42 +328,46 @@ class RS485Communication:
             self.logger.error("Not connected to serial port")
             return None
 
+        if timeout is None:
+            timeout = self.timeout
+
         try:
-            # 명령 패킷 생성
-            command = self.build_command(query_string)
-            
             # 송신 버퍼 클리어
             self.serial_connection.reset_output_buffer()
             self.serial_connection.reset_input_buffer()
             
             # 데이터 전송
+            capture_frame(TX, command)
             self.serial_connection.write(command)
-            self.logger.info(f"Sent: {command.hex()}")
-            
-            # 응답 대기 개선
-            response = b""
-            start_time = time.time()
-            etx_bytes = self.ETX.encode('utf-8')
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(f"Sent: {command.hex()}")
             
             # 수신용 ETX로 응답 대기
+            response = b""
+            deadline = time.monotonic() + timeout
             recv_etx_bytes = self.RECV_ETX.encode('utf-8')
             
-            while time.time() - start_time < self.timeout:
+            while time.monotonic() < deadline:
                 try:
-                    # 1바이트씩 읽어서 수신 ETX까지 수집
-                    byte_data = self.serial_connection.read(1)
+                    # 버퍼에 있는 만큼 읽어서 수신 ETX까지 수집
+                    # (포트 read 타임아웃이 짧아 명령별 deadline을 지킬 수 있음)
+                    byte_data = self.serial_connection.read(self.serial_connection.in_waiting or 1)
                     if byte_data:
+                        # 새로 받은 부분 (ETX가 경계에 걸친 경우 포함)에서 수신 ETX 검색
+                        search_from = max(0, len(response) - len(recv_etx_bytes) + 1)
                         response += byte_data
-                        # 수신 ETX를 찾으면 종료
-                        if response.endswith(recv_etx_bytes):
+                        end = response.find(recv_etx_bytes, search_from)
+                        # 수신 ETX를 찾으면 그 뒤의 바이트 (CR/LF, 늦은 응답, 잡음)는 버리고 종료
+                        if end >= 0:
+                            response = response[:end + len(recv_etx_bytes)]
                             break
-                    else:
-                        time.sleep(0.01)
                 except serial.SerialTimeoutException:
                     continue
             
             if response:
-                self.logger.info(f"Received: {response.hex()}")
+                capture_frame(RX, response)
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Received: {response.hex()}")
                 return self.parse_response(response)
             else:
                 self.logger.warning("No response received")
@@ -345,91 +413,47 @@ class RS485Communication:
             파싱된 데이터 딕셔너리 또는 None
         """
         try:
-            # 기본 구조 파싱
-            if not response_str.startswith(self.RECV_STX):
-                self.logger.error(f"Invalid receive STX: {response_str[:10]}")
-                return None
-            
-            if not response_str.endswith(self.RECV_ETX):
-                self.logger.error(f"Invalid receive ETX: {response_str[-10:]}")
-                return None
-            
-            # STX, ETX 제거
-            content = response_str[len(self.RECV_STX):-len(self.RECV_ETX)]
-            
-            # 최소 길이 확인 (PRE + CMD + LENGTH + CHKSUM = 최소 6자)
-            if len(content) < 6:
-                self.logger.error("Response content too short")
-                return None
-            
-            # CHKSUM (마지막 2자리) 분리
-            data_part = content[:-2]
-            checksum = content[-2:]
-            
-            # PRE는 고정 길이 (예: JW17000000 = 10자)
-            # 실제 구조: PRE(10) + CMD(1) + LENGTH(1 or 2) + data_string
-            pre = data_part[:10]  # JW17000000
-            cmd = data_part[10]   # A, C, E, F, G, H, I
-            
-            # LENGTH 파싱 (F 명령은 1자리, 다른 명령은 2자리)
-            if cmd == 'F':
-                # F 명령만 1자리 LENGTH (버그)
-                length_str = data_part[11]
-                data_start = 12
-            else:
-                # 다른 모든 명령은 2자리 LENGTH
-                length_str = data_part[11:13]
-                data_start = 13
-                
-            try:
-                data_length = int(length_str)
-                data_string = data_part[data_start:data_start+data_length]
-                
-                if len(data_string) != data_length:
-                    self.logger.error(f"Data length mismatch: expected {data_length}, got {len(data_string)}")
-                    return None
-                
-            except ValueError:
-                self.logger.error(f"Invalid length value: {length_str}")
-                return None
-            
-            result = {
-                'pre': pre,
-                'cmd': cmd,
-                'length': data_length,
-                'data_string': data_string,
-                'checksum': checksum,
-                'raw_response': response_str
-            }
-            
-            # CMD별 데이터 파싱
-            if cmd == 'A':
-                parsed_data = self.parse_cmd_a_data(data_string)
-                result['parsed_data'] = parsed_data
-            elif cmd == 'C':
-                parsed_data = self.parse_cmd_c_data(data_string)
-                result['parsed_data'] = parsed_data
-            elif cmd == 'E':
-                parsed_data = self.parse_cmd_e_data(data_string)
-                result['parsed_data'] = parsed_data
-            elif cmd == 'F':
-                parsed_data = self.parse_cmd_f_data(data_string)
-                result['parsed_data'] = parsed_data
-            elif cmd == 'G':
-                parsed_data = self.parse_cmd_g_data(data_string)
-                result['parsed_data'] = parsed_data
-            elif cmd == 'H':
-                parsed_data = self.parse_cmd_h_data(data_string)
-                result['parsed_data'] = parsed_data
-            elif cmd == 'I':
-                parsed_data = self.parse_cmd_i_data(data_string)
-                result['parsed_data'] = parsed_data
+            result = split_frame(response_str, self.RECV_STX, self.RECV_ETX, RESPONSE_DECODERS)
+        except FieldError as e:
+            self.logger.error(str(e))
+            return None
+        
+        # CMD별 데이터 파싱 (스키마가 있는 CMD만)
+        if result['cmd'] in RESPONSE_DECODERS:
+            result['parsed_data'] = self.decode_data(result['cmd'], result['data_string'])
+        
+        return result
+    
+    def parse_structured_responses(self, responses: List[str]) -> List[Optional[dict]]:
+        """
+        여러 응답을 한 번에 파싱 (캡처/배치 결과 일괄 처리용)
+        
+        Args:
+            responses: 수신된 응답 문자열 목록
             
-            return result
+        Returns:
+            입력 순서대로의 파싱 결과 목록 (실패한 항목은 None)
+        """
+        parse = self.parse_structured_response
+        return [parse(response) for response in responses]
+    
+    def decode_data(self, cmd: str, data_string: str) -> dict:
+        """
+        CMD 스키마로 data_string 파싱 (잘못된 필드는 로그를 남기고 생략)
+        
+        Args:
+            cmd: 명령 문자 (A, C, E, F, G, H, I)
+            data_string: 파싱할 데이터 문자열
             
-        except Exception as e:
-            self.logger.error(f"Error parsing structured response: {e}")
-            return None
+        Returns:
+            파싱된 데이터 딕셔너리
+        """
+        decoder = RESPONSE_DECODERS[cmd]
+        try:
+            return decoder.decode(data_string, strict=True)
+        except FieldError as e:
+            self.logger.error(f"Error parsing CMD {cmd} data: {e}")
+            return decoder.decode(data_string)
     
     def parse_cmd_a_data(self, data_string: str) -> dict:
         """
@@ -442,54 +466,7 @@ class RS485Communication:
         Returns:
             파싱된 센서 데이터
         """
-        result = {}
-        pos = 0
-        
-        try:
-            # 변위계 길이 (3 05822 -> 58.22)
-            if pos < len(data_string) and data_string[pos] == '3':
-                displacement_raw = data_string[pos+1:pos+6]  # 05822
-                displacement = float(displacement_raw) / 100.0  # 58.22
-                result['displacement'] = displacement
-                pos += 6
-            
-            # X 각도 LSB (2 32748)
-            if pos < len(data_string) and data_string[pos] == '2':
-                x_angle_raw = data_string[pos+1:pos+6]  # 32748
-                result['x_angle_lsb'] = int(x_angle_raw)
-                pos += 6
-            
-            # Y 각도 LSB (2 32910)  
-            if pos < len(data_string) and data_string[pos] == '2':
-                y_angle_raw = data_string[pos+1:pos+6]  # 32910
-                result['y_angle_lsb'] = int(y_angle_raw)
-                pos += 6
-            
-            # 온도 (1 30001 -> (32767 - 30001) / 100)
-            if pos < len(data_string) and data_string[pos] == '1':
-                temp_raw = data_string[pos+1:pos+6]  # 30001
-                temp_value = (32767 - int(temp_raw)) / 100.0  # 32767에서 빼고 100으로 나누기
-                result['temperature'] = temp_value
-                pos += 6
-            
-            # 전압 (B 01133 -> 11.33V)
-            if pos < len(data_string) and data_string[pos] == 'B':
-                voltage_raw = data_string[pos+1:pos+6]  # 01133
-                voltage = float(voltage_raw) / 100.0  # 11.33
-                result['voltage'] = voltage
-                pos += 6
-            
-            # 전류 (C 00309 -> 30.9mA)
-            if pos < len(data_string) and data_string[pos] == 'C':
-                current_raw = data_string[pos+1:pos+6]  # 00309
-                current = float(current_raw) / 10.0  # 30.9
-                result['current_ma'] = current
-                pos += 6
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing CMD A data: {e}")
-        
-        return result
+        return self.decode_data('A', data_string)
     
     def parse_cmd_c_data(self, data_string: str) -> dict:
         """
@@ -502,61 +479,7 @@ class RS485Communication:
         Returns:
             파싱된 설정 데이터
         """
-        result = {}
-        
-        try:
-            if len(data_string) != 16:
-                self.logger.error(f"CMD C data length should be 16, got {len(data_string)}")
-                return result
-            
-            # 1. 버전 (d.dd) - 처음 4자리
-            version_raw = data_string[0:4]  # 예: "1.23"
-            result['version'] = float(version_raw)
-            
-            # 2. 쪽보드 센스 종류 (d) - 5번째 문자
-            sensor_type_code = int(data_string[4])
-            sensor_types = {0: "MPU6050", 1: "ISM330DHCX", 2: "SCL3300-D01", 9: "없음"}
-            result['sensor_type'] = sensor_types.get(sensor_type_code, f"알 수 없음({sensor_type_code})")
-            result['sensor_type_code'] = sensor_type_code
-            
-            # 3. 종단저항릴레이 (d) - 6번째 문자  
-            relay_code = int(data_string[5])
-            result['termination_relay'] = "연결" if relay_code == 1 else "끊김"
-            result['termination_relay_code'] = relay_code
-            
-            # 4. 온도보상 (d) - 7번째 문자
-            temp_comp_code = int(data_string[6])
-            result['temperature_compensation'] = "on" if temp_comp_code == 1 else "off"
-            result['temperature_compensation_code'] = temp_comp_code
-            
-            # 5. 변위계기준상태 (d) - 8번째 문자
-            disp_status_code = int(data_string[7])
-            result['displacement_status'] = "정상" if disp_status_code == 1 else "불량"
-            result['displacement_status_code'] = disp_status_code
-            
-            # 6. 변위계 기준전압 (d.ddd) - 9~13번째 문자
-            voltage_raw = data_string[8:13]  # 예: "3.300"
-            result['reference_voltage'] = float(voltage_raw)
-            
-            # 7. 각도계상태 (d) - 14번째 문자
-            angle_status_code = int(data_string[13])
-            result['angle_status'] = "정상" if angle_status_code == 1 else "불량"
-            result['angle_status_code'] = angle_status_code
-            
-            # 8. 변위계 설정 (d) - 15번째 문자
-            disp_setting_code = int(data_string[14])
-            result['displacement_setting'] = "on" if disp_setting_code == 1 else "off"
-            result['displacement_setting_code'] = disp_setting_code
-            
-            # 9. 각도계 설정 (d) - 16번째 문자
-            angle_setting_code = int(data_string[15])
-            result['angle_setting'] = "on" if angle_setting_code == 1 else "off"
-            result['angle_setting_code'] = angle_setting_code
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing CMD C data: {e}")
-        
-        return result
+        return self.decode_data('C', data_string)
     
     def parse_cmd_e_data(self, data_string: str) -> dict:
         """
@@ -569,23 +492,7 @@ class RS485Communication:
         Returns:
             파싱된 연결 상태 데이터
         """
-        result = {}
-        
-        try:
-            if len(data_string) < 1:
-                self.logger.error(f"CMD E data length should be at least 1, got {len(data_string)}")
-                return result
-            
-            # 연결 상태 현재 설정 (d) - 첫 번째 문자
-            status_code = int(data_string[0])
-            result['connection_status'] = "연결" if status_code == 1 else "끊김"
-            result['connection_status_code'] = status_code
-            result['status_message'] = f"연결상태가 {result['connection_status']}으로 설정되어 있습니다"
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing CMD E data: {e}")
-        
-        return result
+        return self.decode_data('E', data_string)
     
     def parse_cmd_f_data(self, data_string: str) -> dict:
         """
@@ -598,22 +505,7 @@ class RS485Communication:
         Returns:
             파싱된 릴레이 off 시간 데이터
         """
-        result = {}
-        
-        try:
-            # 릴레이 off 시간 그대로 파싱
-            try:
-                relay_off_time = int(data_string)
-                result['relay_off_time'] = relay_off_time
-            except ValueError:
-                self.logger.error(f"Invalid relay off time: {data_string}")
-                result['relay_off_time'] = 0
-                result['relay_off_time_str'] = data_string
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing CMD F data: {e}")
-        
-        return result
+        return self.decode_data('F', data_string)
     
     def parse_cmd_g_data(self, data_string: str) -> dict:
         """
@@ -626,23 +518,7 @@ class RS485Communication:
         Returns:
             파싱된 온도보상 상태 데이터
         """
-        result = {}
-        
-        try:
-            if len(data_string) < 1:
-                self.logger.error(f"CMD G data length should be at least 1, got {len(data_string)}")
-                return result
-            
-            # 온도보상 현재 상태 (d) - 첫 번째 문자
-            temp_comp_code = int(data_string[0])
-            result['temperature_compensation'] = "ON" if temp_comp_code == 1 else "OFF"
-            result['temperature_compensation_code'] = temp_comp_code
-            result['status_message'] = f"온도보상 설정이 {result['temperature_compensation']}으로 되어있습니다"
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing CMD G data: {e}")
-        
-        return result
+        return self.decode_data('G', data_string)
     
     def parse_cmd_h_data(self, data_string: str) -> dict:
         """
@@ -655,17 +531,7 @@ class RS485Communication:
         Returns:
             파싱된 RESET 명령 데이터
         """
-        result = {}
-        
-        try:
-            # RESET 명령은 데이터가 없으므로 단순히 상태만 표시
-            result['reset_status'] = "Reset되었습니다"
-            result['command_type'] = "RESET"
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing CMD H data: {e}")
-        
-        return result
+        return self.decode_data('H', data_string)
     
     def parse_cmd_i_data(self, data_string: str) -> dict:
         """
@@ -678,26 +544,20 @@ class RS485Communication:
         Returns:
             파싱된 ID 데이터
         """
-        result = {}
-        
-        try:
-            # 10자리 ID 그대로 출력
-            result['device_id'] = data_string
-            result['id_length'] = len(data_string)
-            
-        except Exception as e:
-            self.logger.error(f"Error parsing CMD I data: {e}")
-        
-        return result
+        return self.decode_data('I', data_string)
 
     def set_stx_etx(self, stx: str, etx: str, recv_stx: str = None, recv_etx: str = None):
-        """STX와 ETX 값 변경"""
+        """STX와 ETX 값 변경 (송신 프레이밍이 바뀌면 패킷 캐시 무효화)"""
+        recv_stx = self.RECV_STX if recv_stx is None else recv_stx
+        recv_etx = self.RECV_ETX if recv_etx is None else recv_etx
+        if (stx, etx, recv_stx, recv_etx) == (self.STX, self.ETX, self.RECV_STX, self.RECV_ETX):
+            return  # 버스 워커가 명령마다 호출하므로 변경이 없으면 바로 반환
+        if (stx, etx) != (self.STX, self.ETX):
+            self._packet_cache.clear()
         self.STX = stx
         self.ETX = etx
-        if recv_stx is not None:
-            self.RECV_STX = recv_stx
-        if recv_etx is not None:
-            self.RECV_ETX = recv_etx
+        self.RECV_STX = recv_stx
+        self.RECV_ETX = recv_etx
         self.logger.info(f"STX/ETX updated: Send STX='{stx}', ETX='{etx}', Recv STX='{self.RECV_STX}', ETX='{self.RECV_ETX}'")
 
     def __enter__(self):
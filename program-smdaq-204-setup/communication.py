@@ -2,6 +2,7 @@ import socket
 import time
 from utils import calculate_checksum
 import protocol as ptcl
+from frame_capture import RX, TX, capture_frame
 
 def _normalize_command(command: str) -> str:
     clean_cmd = command.strip().replace("\n", "").replace("\r", "")
@@ -161,7 +162,9 @@ def send_command(command: str, ip: str, port: int, on_line=None, event_pump=None
             except socket.timeout:
                 pass  # 초기 메시지 없는 경우 무시
 
-            sock.sendall( (command + "\n").encode("utf-8"))
+            command_bytes = (command + "\n").encode("utf-8")
+            capture_frame(TX, command_bytes)
+            sock.sendall(command_bytes)
 
             read_timeout = socket_timeout
             if event_pump:
@@ -216,6 +219,8 @@ def send_command(command: str, ip: str, port: int, on_line=None, event_pump=None
             except:
                 pass  # 이미 연결이 끊어진 경우 무시
 
+            capture_frame(RX, response_bytes)
+
             # 응답 처리 및 유효성 검사
             if on_line and line_buffer:
                 tail = line_buffer.decode("utf-8", errors="replace").strip()
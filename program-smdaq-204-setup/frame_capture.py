@@ -0,0 +1,339 @@
+"""
+프레임 캡처/재생 모듈
+
+송신/수신 프레임을 단조 시계 기준 시각과 함께 작은 바이너리 파일에 기록하고,
+기록된 응답을 원래 시간 간격(또는 최대 속도)으로 돌려주는 재생 장치를 제공합니다.
+현장에서 받은 트래픽으로 파서와 GUI를 사무실에서 그대로 재현/성능 시험할 때 사용합니다.
+
+파일 형식:
+    헤더: b"FCAP" + 버전(1바이트)
+    레코드: 방향(1바이트, 0=송신 1=수신) + 시작 후 경과 시간(us, 8바이트)
+            + 길이(4바이트) + 페이로드 (리틀 엔디언)
+
+사용 예:
+    python frame_capture.py capture.fcap      # 캡처 파일 요약 출력
+"""
+import logging
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"FCAP"
+VERSION = 1
+TX = 0  # 송신 (PC -> 장비)
+RX = 1  # 수신 (장비 -> PC)
+
+_RECORD = struct.Struct("<BQI")
+
+
+@dataclass
+class CaptureRecord:
+    """캡처된 프레임 한 개"""
+    direction: int
+    timestamp: float  # 캡처 시작 후 경과 시간 (초)
+    payload: bytes
+
+
+class FrameCapture:
+    """프레임을 캡처 파일에 기록하는 클래스 (스레드 안전)"""
+
+    def __init__(self, path: str):
+        """
+        캡처 파일을 새로 만듭니다.
+
+        Args:
+            path: 캡처 파일 경로
+        """
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]))
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.count = 0
+
+    def record(self, direction: int, payload: bytes) -> None:
+        """
+        프레임 한 개를 기록합니다.
+
+        Args:
+            direction: TX 또는 RX
+            payload: 송수신한 바이트
+        """
+        elapsed_us = int((time.monotonic() - self._start) * 1_000_000)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD.pack(direction, elapsed_us, len(payload)))
+            self._file.write(payload)
+            self.count += 1
+
+    def close(self) -> None:
+        """캡처 파일을 닫습니다."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+# 통신 함수들이 공유하는 현재 캡처 (없으면 기록하지 않음)
+_active_capture: Optional[FrameCapture] = None
+
+
+def start_capture(path: str) -> FrameCapture:
+    """
+    프로세스 전체의 프레임 캡처를 시작합니다 (이전 캡처는 닫음).
+
+    Args:
+        path: 캡처 파일 경로
+
+    Returns:
+        FrameCapture: 시작된 캡처 객체
+    """
+    global _active_capture
+    stop_capture()
+    _active_capture = FrameCapture(path)
+    return _active_capture
+
+
+def stop_capture() -> Optional[FrameCapture]:
+    """
+    진행 중인 캡처를 종료합니다.
+
+    Returns:
+        FrameCapture: 종료된 캡처 객체 (없었으면 None)
+    """
+    global _active_capture
+    capture, _active_capture = _active_capture, None
+    if capture is not None:
+        capture.close()
+    return capture
+
+
+def is_capturing() -> bool:
+    """캡처가 진행 중인지 반환합니다."""
+    return _active_capture is not None
+
+
+def capture_frame(direction: int, payload: bytes) -> None:
+    """
+    캡처가 켜져 있으면 프레임을 기록합니다 (꺼져 있으면 아무것도 하지 않음).
+
+    Args:
+        direction: TX 또는 RX
+        payload: 송수신한 바이트
+    """
+    capture = _active_capture
+    if capture is not None and payload:
+        capture.record(direction, payload)
+
+
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """
+    캡처 파일의 레코드를 순서대로 읽습니다.
+
+    Args:
+        path: 캡처 파일 경로
+
+    Yields:
+        CaptureRecord: 프레임 레코드
+
+    Raises:
+        ValueError: 캡처 파일 형식이 아닌 경우
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"캡처 파일이 아닙니다: {path}")
+        if header[len(MAGIC)] != VERSION:
+            raise ValueError(f"지원하지 않는 캡처 버전: {header[len(MAGIC)]}")
+        while True:
+            head = f.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return
+            direction, elapsed_us, length = _RECORD.unpack(head)
+            payload = f.read(length)
+            if len(payload) < length:
+                return  # 기록 중 끊긴 마지막 레코드는 무시
+            yield CaptureRecord(direction, elapsed_us / 1_000_000, payload)
+
+
+def pair_exchanges(records: List[CaptureRecord]) -> List[Tuple[CaptureRecord, Optional[CaptureRecord]]]:
+    """
+    송신 프레임과 그 뒤의 수신 프레임을 (질의, 응답) 쌍으로 묶습니다.
+
+    Args:
+        records: read_capture로 읽은 레코드 목록
+
+    Returns:
+        list: (송신 레코드, 수신 레코드 또는 None) 목록
+    """
+    exchanges = []
+    pending: Optional[CaptureRecord] = None
+    for record in records:
+        if record.direction == TX:
+            if pending is not None:
+                exchanges.append((pending, None))
+            pending = record
+        elif pending is not None:
+            exchanges.append((pending, record))
+            pending = None
+    if pending is not None:
+        exchanges.append((pending, None))
+    return exchanges
+
+
+class ReplayDevice:
+    """
+    캡처 파일의 응답을 돌려주는 재생 장치
+
+    같은 질의가 여러 번 기록되어 있으면 기록된 순서대로 응답합니다. 기록에 없는
+    질의(또는 기록된 응답을 모두 쓴 질의)는 경고를 남기고 무응답(타임아웃)으로
+    처리합니다. 시리얼 포트(write/read),
+    communication.send_command, SMDAQServerPure.query 대신 사용할 수 있습니다.
+    """
+    READ_POLL_TIMEOUT = 0.01  # 받을 응답이 없을 때 read()가 기다리는 시간 (초)
+
+    def __init__(self, path: str, realtime: bool = True, speed: float = 1.0):
+        """
+        재생 장치를 초기화합니다.
+
+        Args:
+            path: 캡처 파일 경로
+            realtime: True면 원래 응답 지연을 재현, False면 즉시 응답
+            speed: realtime일 때 재생 배속 (2.0이면 지연 절반)
+        """
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.exchanges = pair_exchanges(list(read_capture(path)))
+        self._rx_buffer = bytearray()
+        self.is_open = True
+        self.timeout = None
+        self.logger = logging.getLogger(__name__)
+        self.rewind()
+
+    @staticmethod
+    def _key(payload: bytes) -> bytes:
+        # TCP 명령은 줄바꿈이 붙어 기록되므로 비교 시 제외
+        return payload.rstrip(b"\r\n")
+
+    def respond(self, query: bytes) -> bytes:
+        """
+        질의에 대한 기록된 응답을 반환합니다 (realtime이면 원래 지연만큼 대기).
+
+        Args:
+            query: 송신 바이트
+
+        Returns:
+            bytes: 기록된 응답 (기록에 없는 질의면 b"")
+        """
+        indices = self._by_query.get(self._key(query))
+        if not indices:
+            # 다른 질의의 응답을 돌려주면 잘못된 값이 그대로 표시되므로 무응답 처리
+            self.logger.warning(f"Replay: no recorded response for query {query!r}")
+            return b""
+        index = indices.popleft()
+
+        sent, received = self.exchanges[index]
+        if received is None:
+            return b""
+        if self.realtime and self.speed > 0:
+            time.sleep(max(0.0, received.timestamp - sent.timestamp) / self.speed)
+        return received.payload
+
+    def rewind(self) -> None:
+        """처음부터 다시 재생하도록 되돌립니다."""
+        self._by_query: Dict[bytes, Deque[int]] = defaultdict(deque)
+        for index, (query, _) in enumerate(self.exchanges):
+            self._by_query[self._key(query.payload)].append(index)
+        self._rx_buffer.clear()
+
+    # --- 시리얼 포트 호환 인터페이스 (RS485Communication.serial_connection 대체) ---
+
+    def write(self, data: bytes) -> int:
+        self._rx_buffer += self.respond(bytes(data))
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        if not self._rx_buffer:
+            # 응답이 없는 질의에서 호출 측 대기 루프가 바쁜 대기가 되지 않도록 함
+            time.sleep(self.READ_POLL_TIMEOUT)
+            return b""
+        data = bytes(self._rx_buffer[:size])
+        del self._rx_buffer[:size]
+        return data
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx_buffer)
+
+    def reset_input_buffer(self) -> None:
+        self._rx_buffer.clear()
+
+    def reset_output_buffer(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.is_open = False
+
+    # --- TCP 호환 인터페이스 ---
+
+    def send_command(self, command: str, ip: str = "", port: int = 0,
+                     on_line: Optional[Callable[[str], None]] = None, **kwargs) -> str:
+        """communication.send_command와 같은 형식으로 기록된 응답을 반환합니다."""
+        response = self.respond((command + "\n").encode("utf-8"))
+        text = response.decode("utf-8", errors="ignore").strip()
+        if on_line:
+            for line in text.splitlines():
+                if line:
+                    on_line(line)
+        return text
+
+    def query(self, command: str, timeout: Optional[float] = None,
+              on_line: Optional[Callable[[str], None]] = None, **kwargs) -> str:
+        """SMDAQServerPure.query와 같은 형식으로 기록된 응답을 반환합니다."""
+        return self.send_command(command, on_line=on_line)
+
+
+def summarize(path: str) -> str:
+    """
+    캡처 파일 요약 문자열을 만듭니다.
+
+    Args:
+        path: 캡처 파일 경로
+
+    Returns:
+        str: 프레임 수, 길이, 응답 지연 통계
+    """
+    records = list(read_capture(path))
+    exchanges = pair_exchanges(records)
+    latencies = sorted(rx.timestamp - tx.timestamp for tx, rx in exchanges if rx is not None)
+    duration = records[-1].timestamp if records else 0.0
+    lines = [
+        f"파일: {path}",
+        f"프레임: {len(records)}개 (송신 {sum(1 for r in records if r.direction == TX)}, "
+        f"수신 {sum(1 for r in records if r.direction == RX)}), 길이 {duration:.3f}초",
+        f"질의: {len(exchanges)}개, 무응답 {sum(1 for _, rx in exchanges if rx is None)}개",
+    ]
+    if latencies:
+        lines.append(f"응답 지연: 최소 {latencies[0] * 1000:.1f}ms, "
+                     f"중간 {latencies[len(latencies) // 2] * 1000:.1f}ms, "
+                     f"최대 {latencies[-1] * 1000:.1f}ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("사용법: python frame_capture.py <캡처 파일>")
+        sys.exit(2)
+    print(summarize(sys.argv[1]))
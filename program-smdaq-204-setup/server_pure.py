@@ -2,6 +2,7 @@ import socket
 import threading
 import time
 from typing import Optional, Callable
+from frame_capture import RX, TX, capture_frame
 
 def _normalize_command(command: str) -> str:
     clean_cmd = command.strip().replace("\n", "").replace("\r", "")
@@ -320,8 +321,9 @@ class SMDAQServerPure:
                 self.client_socket.settimeout(socket_timeout)
 
                 # 2. 명령 전송
-                full_command = command + '''\n'''
-                self.client_socket.sendall(full_command.encode('utf-8'))
+                full_command = (command + '''\n''').encode('utf-8')
+                capture_frame(TX, full_command)
+                self.client_socket.sendall(full_command)
                 self._update_activity()
 
                 if event_pump:
@@ -376,6 +378,7 @@ class SMDAQServerPure:
                     except socket.timeout:
                         pass
 
+                capture_frame(RX, bytes(buffer))
                 if on_line and line_buffer:
                     tail = line_buffer.decode("utf-8", errors="replace").strip()
                     if tail: